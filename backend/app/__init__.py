@@ -1 +0,0 @@
-from app.main import app
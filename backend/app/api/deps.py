@@ -1,50 +1,69 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from typing import Annotated
-from app.database import get_db
-from app.core.security import decode_access_token
+from typing import Annotated, List, Optional, Sequence, Set
+from app import database
+from app.core.security import decode_token
+from app.core.revocation import token_revocations
+from app.core.rate_limit import RateLimiter, auth_ip_limiter, auth_username_limiter
+from app.core import metrics
 from app.crud import user as user_crud
-from app.models.user import User
+from app.crud.pagination import next_cursor
+from app.schemas.auth import TokenData
 
 security = HTTPBearer()
 
 
-def get_current_user(
-    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user"""
-    token = credentials.credentials
-    username = decode_access_token(token)
-    
-    if username is None:
+def _load_revocations(seen: Set[int]):
+    # Its own short session: the dependency runs before (and without) the request's
+    with database.SessionLocal() as db:
+        return user_crud.get_revoked_users(db), user_crud.get_existing_user_ids(db, seen)
+
+
+async def get_current_user(
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)]
+) -> TokenData:
+    """Get current authenticated user from the verified token claims, without a database lookup.
+
+    Serves the sync and the async endpoints alike; only the periodic reload
+    of token revocations touches the database.
+    """
+    payload = decode_token(credentials.credentials)
+    if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = user_crud.get_user_by_username(db, username=username)
-    if user is None:
+    if token_revocations.needs_refresh():
+        await run_in_threadpool(token_revocations.refresh, _load_revocations)
+    
+    problem = token_revocations.check(payload["uid"], payload.get("ver", 0))
+    if problem == "revoked":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
+            detail="Token has been revoked",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    if not user.is_active:
+    if problem == "deactivated":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User is deactivated"
         )
     
-    return user
+    return TokenData(
+        id=payload["uid"],
+        username=payload["sub"],
+        role=payload.get("role", "user"),
+        token_version=payload.get("ver", 0)
+    )
 
 
-def get_current_admin(
-    current_user: Annotated[User, Depends(get_current_user)]
-) -> User:
+async def get_current_admin(
+    current_user: Annotated[TokenData, Depends(get_current_user)]
+) -> TokenData:
     """Check if current user is admin"""
     if current_user.role != "admin":
         raise HTTPException(
@@ -52,3 +71,53 @@ def get_current_admin(
             detail="Insufficient permissions. Admin role required."
         )
     return current_user
+
+
+def rows_response(
+    rows: List[dict],
+    columns: Sequence,
+    limit: int,
+    after: Optional[str],
+    response: Response
+) -> ORJSONResponse:
+    """A list endpoint's page of plain rows, with X-Next-Cursor when paginating by keyset.
+
+    The rows go straight to orjson, skipping response_model validation; the
+    endpoint's response_model still documents the schema.
+    """
+    if after is not None:
+        cursor = next_cursor(rows, columns, limit)
+        if cursor:
+            response.headers["X-Next-Cursor"] = cursor
+    return ORJSONResponse(rows, headers=response.headers)
+
+
+def too_many_requests(route: str, reason: str, retry_after: float = 1) -> HTTPException:
+    """429 for a shed request, counted in the metrics by route and reason"""
+    metrics.requests_shed.inc(route, reason)
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests, try again later",
+        headers={"Retry-After": str(int(retry_after))},
+    )
+
+
+async def _hit(limiter: RateLimiter, key: str) -> float:
+    if limiter.store.local:
+        return limiter.hit(key)
+    return await run_in_threadpool(limiter.hit, key)
+
+
+async def limit_auth_by_ip(request: Request) -> None:
+    """Token bucket per client address in front of /auth/*"""
+    host = request.client.host if request.client else "unknown"
+    wait = await _hit(auth_ip_limiter, host)
+    if wait:
+        raise too_many_requests(request.url.path, "ip", wait)
+
+
+async def limit_auth_by_username(username: str, route: str) -> None:
+    """Token bucket per account, against attempts on one username spread over many addresses"""
+    wait = await _hit(auth_username_limiter, username.lower())
+    if wait:
+        raise too_many_requests(route, "username", wait)
@@ -1 +1 @@
-from app.api.endpoints import auth, users, books, borrowings
+from app.api.endpoints import auth, users, books, borrowings, stats
@@ -0,0 +1,2 @@
+"""Async (AsyncSession) variants of the read-heavy endpoints, enabled with ASYNC_DB"""
+from app.api.endpoints.aio import books, borrowings
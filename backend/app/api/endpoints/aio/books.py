@@ -0,0 +1,83 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.database import get_async_db
+from app.schemas.book import Book
+from app.crud.aio import book as book_crud, catalog as catalog_crud
+from app.core.http_cache import make_etag, is_not_modified, cache_headers
+from app.config import settings
+from app.api.deps import rows_response
+
+router = APIRouter(prefix="/books", tags=["Books"])
+
+
+@router.get(
+    "/",
+    response_model=List[Book],
+    summary="Get list of books",
+    description="Get list of all books with optional search. Supports conditional GET via ETag/Last-Modified"
+)
+async def read_books_async(
+    skip: int = 0,
+    limit: int = 100,
+    search: Optional[str] = Query(None, description="Search by title or author"),
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; pass an empty value to start keyset pagination"),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    response: Response = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get list of books"""
+    catalog = await catalog_crud.get_catalog_state(db)
+    if catalog is not None:
+        etag = make_etag("books", catalog.version, skip, limit, search, after)
+        headers = cache_headers(etag, catalog.updated_at, settings.BOOKS_LIST_CACHE_CONTROL)
+        if is_not_modified(etag, catalog.updated_at, if_none_match, if_modified_since):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+    
+    try:
+        if catalog is not None:
+            books = await book_crud.get_books_cached(
+                db, catalog.version, skip=skip, limit=limit, search=search, after=after
+            )
+        else:
+            books = await book_crud.get_books(
+                db, skip=skip, limit=limit, search=search, after=after, as_rows=True
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return rows_response(books, book_crud.CURSOR_COLUMNS, limit, after, response)
+
+
+@router.get(
+    "/{book_id:int}",
+    response_model=Book,
+    summary="Get book by ID",
+    description="Get detailed book information by ID. Supports conditional GET via ETag/Last-Modified"
+)
+async def read_book_async(
+    book_id: int,
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    response: Response = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get book by ID"""
+    version = await book_crud.get_book_updated_at(db, book_id=book_id)
+    if version is not None and version.updated_at is not None:
+        etag = make_etag("book", book_id, version.updated_at.isoformat())
+        headers = cache_headers(etag, version.updated_at, settings.BOOK_DETAIL_CACHE_CONTROL)
+        if is_not_modified(etag, version.updated_at, if_none_match, if_modified_since):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        db_book = await book_crud.get_book_cached(db, book_id=book_id, updated_at=version.updated_at)
+    else:
+        db_book = await book_crud.get_book(db, book_id=book_id)
+    if db_book is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Book not found"
+        )
+    return db_book
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Annotated
+from app.database import get_async_db
+from app.schemas.borrowing import Borrowing, BorrowingWithDetails
+from app.crud.aio import borrowing as borrowing_crud
+from app.api.deps import get_current_user, rows_response
+from app.schemas.auth import TokenData
+from app.models.borrowing import BorrowingStatus
+
+router = APIRouter(prefix="/borrowings", tags=["Borrowings"])
+
+
+@router.get(
+    "/",
+    response_model=List[Borrowing],
+    summary="Get list of borrowings",
+    description="Get list of borrowings. Admin sees all, user sees only their own"
+)
+async def read_borrowings_async(
+    skip: int = 0,
+    limit: int = 100,
+    status_filter: Optional[BorrowingStatus] = Query(None, alias="status", description="Filter by status"),
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; pass an empty value to start keyset pagination"),
+    response: Response = None,
+    current_user: Annotated[TokenData, Depends(get_current_user)] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get list of borrowings"""
+    user_id = None if current_user.role == "admin" else current_user.id
+    
+    try:
+        borrowings = await borrowing_crud.get_borrowings(
+            db, 
+            skip=skip, 
+            limit=limit, 
+            user_id=user_id,
+            status=status_filter,
+            after=after,
+            as_rows=True
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return rows_response(borrowings, borrowing_crud.CURSOR_COLUMNS, limit, after, response)
+
+
+@router.get(
+    "/my",
+    response_model=List[BorrowingWithDetails],
+    summary="My borrowings",
+    description="Get list of borrowings for current user"
+)
+async def read_my_borrowings_async(
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; pass an empty value to start keyset pagination"),
+    response: Response = None,
+    current_user: Annotated[TokenData, Depends(get_current_user)] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get my borrowings"""
+    try:
+        borrowings = await borrowing_crud.get_borrowings(
+            db, 
+            skip=skip, 
+            limit=limit, 
+            user_id=current_user.id,
+            after=after,
+            with_details=True,
+            as_rows=True
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return rows_response(borrowings, borrowing_crud.CURSOR_COLUMNS, limit, after, response)
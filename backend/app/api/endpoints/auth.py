@@ -1,15 +1,36 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from datetime import timedelta
-from typing import Annotated
-from app.database import get_db
-from app.schemas.auth import Token, LoginRequest
+from fastapi.concurrency import run_in_threadpool
+from app.database import session_scope
+from app.schemas.auth import Token, LoginRequest, RefreshRequest
 from app.schemas.user import User, UserCreate
 from app.crud import user as user_crud
-from app.core.security import verify_password, create_access_token
-from app.config import settings
+from app.api.deps import limit_auth_by_ip, limit_auth_by_username, too_many_requests
+from app.core.security import (
+    HashQueueFull,
+    verify_and_update_password,
+    get_password_hash_async,
+    token_claims,
+    create_access_token,
+    create_refresh_token,
+    decode_token
+)
+
+router = APIRouter(prefix="/auth", tags=["Authentication"], dependencies=[Depends(limit_auth_by_ip)])
+
+# These handlers open short session scopes around their queries instead of
+# depending on get_db, so no session (or pool slot) is held while the request
+# waits on the password hashing pool. Requests over the rate limits, or
+# arriving while the pool's backlog is full, get 429 before any bcrypt work.
+
 
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+def issue_tokens(user) -> dict:
+    """Access and refresh tokens carrying the user's current claims"""
+    claims = token_claims(user)
+    return {
+        "access_token": create_access_token(claims),
+        "refresh_token": create_refresh_token(claims),
+        "token_type": "bearer",
+    }
 
 
 @router.post(
@@ -19,42 +40,54 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
     summary="Register new user",
     description="Create a new user account in the system"
 )
-def register(
-    user: UserCreate,
-    db: Session = Depends(get_db)
-):
+async def register(user: UserCreate):
     """Register new user"""
-    db_user = user_crud.get_user_by_username(db, username=user.username)
-    if db_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already exists"
-        )
+    async with session_scope() as db:
+        db_user = await run_in_threadpool(user_crud.get_user_by_username, db, username=user.username)
+        if db_user:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Username already exists"
+            )
 
-    db_user = user_crud.get_user_by_email(db, email=user.email)
-    if db_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already exists"
-        )
+        db_user = await run_in_threadpool(user_crud.get_user_by_email, db, email=user.email)
+        if db_user:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already exists"
+            )
     
-    return user_crud.create_user(db=db, user=user)
+    try:
+        hashed_password = await get_password_hash_async(user.password)
+    except HashQueueFull:
+        raise too_many_requests("/auth/register", "hash_queue")
+    async with session_scope() as db:
+        return await run_in_threadpool(
+            user_crud.create_user, db=db, user=user, hashed_password=hashed_password
+        )
 
 
 @router.post(
     "/login",
     response_model=Token,
     summary="Login",
-    description="Authenticate user and get JWT token"
+    description="Authenticate user and get a short-lived JWT access token and a refresh token"
 )
-def login(
-    login_data: LoginRequest,
-    db: Session = Depends(get_db)
-):
+async def login(login_data: LoginRequest):
     """Login to the system"""
-    user = user_crud.get_user_by_username(db, username=login_data.username)
+    await limit_auth_by_username(login_data.username, "/auth/login")
+    async with session_scope() as db:
+        # Closing the scope detaches `user` with its loaded attributes intact
+        user = await run_in_threadpool(user_crud.get_user_by_username, db, username=login_data.username)
     
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    valid, new_hash = False, None
+    if user:
+        try:
+            valid, new_hash = await verify_and_update_password(login_data.password, user.hashed_password)
+        except HashQueueFull:
+            raise too_many_requests("/auth/login", "hash_queue")
+    
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -67,9 +100,41 @@ def login(
             detail="User is deactivated"
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
+    if new_hash:
+        async with session_scope() as db:
+            await run_in_threadpool(user_crud.set_password_hash, db, user, new_hash)
+    
+    return issue_tokens(user)
+
+
+@router.post(
+    "/refresh",
+    response_model=Token,
+    summary="Refresh tokens",
+    description="Exchange a refresh token for a new access token (and refresh token), "
+                "unless the user's tokens have been revoked since"
+)
+async def refresh(refresh_data: RefreshRequest):
+    """Issue new tokens without the password"""
+    payload = decode_token(refresh_data.refresh_token, token_type="refresh")
+    user = None
+    if payload is not None:
+        # Unlike access tokens, refresh tokens are checked against the user's row
+        async with session_scope() as db:
+            user = await run_in_threadpool(user_crud.get_user, db, user_id=payload["uid"])
+    
+    if user is None or payload["sub"] != user.username or payload.get("ver", 0) < user.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or revoked refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User is deactivated"
+        )
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return issue_tokens(user)
+
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
+from functools import partial
 from sqlalchemy.orm import Session
 from typing import List, Optional, Annotated
-from app.database import get_db
-from app.schemas.book import Book, BookCreate, BookUpdate
-from app.crud import book as book_crud
-from app.api.deps import get_current_user, get_current_admin
-from app.models.user import User
+from app.database import get_db, get_read_db
+from app.schemas.book import Book, BookCreate, BookUpdate, BookImportResult
+from app.crud import book as book_crud, catalog as catalog_crud
+from app.core.importing import IMPORT_FORMATS, iter_rows, detect_format
+from app.core.exporting import EXPORT_MEDIA_TYPES, stream_export
+from app.core.http_cache import make_etag, is_not_modified, cache_headers
+from app.core.cache import book_cache, book_page_cache
+from app.config import settings
+from app.api.deps import get_current_user, get_current_admin, rows_response
+from app.schemas.auth import TokenData
 
 router = APIRouter(prefix="/books", tags=["Books"])
 
@@ -19,7 +26,7 @@ router = APIRouter(prefix="/books", tags=["Books"])
 )
 def create_book(
     book: BookCreate,
-    current_user: Annotated[User, Depends(get_current_admin)] = None,
+    current_user: Annotated[TokenData, Depends(get_current_admin)] = None,
     db: Session = Depends(get_db)
 ):
     """Create new book (admin only)"""
@@ -34,35 +41,134 @@ def create_book(
     return book_crud.create_book(db=db, book=book)
 
 
+@router.post(
+    "/import",
+    response_model=BookImportResult,
+    summary="Bulk import books",
+    description="Import books from a CSV (with header) or NDJSON upload in batched transactions (admin only)"
+)
+def import_books(
+    file: UploadFile = File(..., description="CSV or NDJSON file with BookCreate fields"),
+    format: Optional[str] = Query(None, description="csv or ndjson; guessed from the file name if omitted"),
+    chunk_size: int = Query(1000, ge=1, le=10000, description="Rows validated and inserted per transaction"),
+    current_user: Annotated[TokenData, Depends(get_current_admin)] = None,
+    db: Session = Depends(get_db)
+):
+    """Bulk import books (admin only)"""
+    format = format or detect_format(file.filename)
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format. Use one of: {', '.join(IMPORT_FORMATS)}"
+        )
+    
+    return book_crud.import_books(db, iter_rows(file.file, format), chunk_size=chunk_size)
+
+
 @router.get(
     "/",
     response_model=List[Book],
     summary="Get list of books",
-    description="Get list of all books with optional search"
+    description="Get list of all books with optional search. Supports conditional GET via ETag/Last-Modified"
 )
 def read_books(
     skip: int = 0,
     limit: int = 100,
     search: Optional[str] = Query(None, description="Search by title or author"),
-    db: Session = Depends(get_db)
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; pass an empty value to start keyset pagination"),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    response: Response = None,
+    db: Session = Depends(get_read_db)
 ):
     """Get list of books"""
-    books = book_crud.get_books(db, skip=skip, limit=limit, search=search)
-    return books
+    catalog = catalog_crud.get_catalog_state(db)
+    if catalog is not None:
+        etag = make_etag("books", catalog.version, skip, limit, search, after)
+        headers = cache_headers(etag, catalog.updated_at, settings.BOOKS_LIST_CACHE_CONTROL)
+        if is_not_modified(etag, catalog.updated_at, if_none_match, if_modified_since):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+    
+    try:
+        if catalog is not None:
+            books = book_crud.get_books_cached(
+                db, catalog.version, skip=skip, limit=limit, search=search, after=after
+            )
+        else:
+            books = book_crud.get_books(
+                db, skip=skip, limit=limit, search=search, after=after, as_rows=True
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return rows_response(books, book_crud.CURSOR_COLUMNS, limit, after, response)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Export catalog",
+    description="Stream the whole catalog (optionally filtered by search) as CSV or NDJSON (admin only)"
+)
+def export_books(
+    format: str = Query("csv", description="csv or ndjson"),
+    search: Optional[str] = Query(None, description="Search by title or author"),
+    current_user: Annotated[TokenData, Depends(get_current_admin)] = None
+):
+    """Export catalog (admin only)"""
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format. Use one of: {', '.join(EXPORT_MEDIA_TYPES)}"
+        )
+    
+    return StreamingResponse(
+        stream_export(partial(book_crud.export_books, search=search), format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="books.{format}"'}
+    )
+
+
+@router.get(
+    "/cache/stats",
+    summary="Catalog cache statistics",
+    description="Hit/miss counters and hit ratio per cache tier for book and search-page lookups (admin only)"
+)
+def read_cache_stats(
+    current_user: Annotated[TokenData, Depends(get_current_admin)] = None
+):
+    """Get catalog cache statistics (admin only)"""
+    return {
+        "book": book_cache.stats(),
+        "page": book_page_cache.stats()
+    }
 
 
 @router.get(
     "/{book_id}",
     response_model=Book,
     summary="Get book by ID",
-    description="Get detailed book information by ID"
+    description="Get detailed book information by ID. Supports conditional GET via ETag/Last-Modified"
 )
 def read_book(
     book_id: int,
-    db: Session = Depends(get_db)
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    response: Response = None,
+    db: Session = Depends(get_read_db)
 ):
     """Get book by ID"""
-    db_book = book_crud.get_book(db, book_id=book_id)
+    version = book_crud.get_book_updated_at(db, book_id=book_id)
+    if version is not None and version.updated_at is not None:
+        etag = make_etag("book", book_id, version.updated_at.isoformat())
+        headers = cache_headers(etag, version.updated_at, settings.BOOK_DETAIL_CACHE_CONTROL)
+        if is_not_modified(etag, version.updated_at, if_none_match, if_modified_since):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        db_book = book_crud.get_book_cached(db, book_id=book_id, updated_at=version.updated_at)
+    else:
+        db_book = book_crud.get_book(db, book_id=book_id)
     if db_book is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -80,7 +186,7 @@ def read_book(
 def update_book(
     book_id: int,
     book: BookUpdate,
-    current_user: Annotated[User, Depends(get_current_admin)] = None,
+    current_user: Annotated[TokenData, Depends(get_current_admin)] = None,
     db: Session = Depends(get_db)
 ):
     """Update book (admin only)"""
@@ -109,7 +215,7 @@ def update_book(
 )
 def delete_book(
     book_id: int,
-    current_user: Annotated[User, Depends(get_current_admin)] = None,
+    current_user: Annotated[TokenData, Depends(get_current_admin)] = None,
     db: Session = Depends(get_db)
 ):
     """Delete book (admin only)"""
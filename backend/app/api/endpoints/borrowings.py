@@ -1,12 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
+from functools import partial
 from sqlalchemy.orm import Session
 from typing import List, Optional, Annotated
 from datetime import date
-from app.database import get_db
-from app.schemas.borrowing import Borrowing, BorrowingCreate, BorrowingUpdate, BorrowingWithDetails
+from app.database import get_db, get_read_db
+from app.schemas.borrowing import (
+    Borrowing,
+    BorrowingCreate,
+    BorrowingUpdate,
+    BorrowingWithDetails,
+    BorrowingBatchCreate,
+    BorrowingBatchReturn,
+    BorrowingBatchResult
+)
 from app.crud import borrowing as borrowing_crud
-from app.api.deps import get_current_user, get_current_admin
-from app.models.user import User
+from app.core.exporting import EXPORT_MEDIA_TYPES, stream_export
+from app.api.deps import get_current_user, get_current_admin, rows_response
+from app.schemas.auth import TokenData
 from app.models.borrowing import BorrowingStatus
 
 router = APIRouter(prefix="/borrowings", tags=["Borrowings"])
@@ -21,7 +32,7 @@ router = APIRouter(prefix="/borrowings", tags=["Borrowings"])
 )
 def create_borrowing(
     borrowing: BorrowingCreate,
-    current_user: Annotated[User, Depends(get_current_user)] = None,
+    current_user: Annotated[TokenData, Depends(get_current_user)] = None,
     db: Session = Depends(get_db)
 ):
     """Borrow a book"""
@@ -38,6 +49,62 @@ def create_borrowing(
     return db_borrowing
 
 
+@router.post(
+    "/batch",
+    response_model=BorrowingBatchResult,
+    summary="Borrow several books",
+    description="Borrow a stack of books in one transaction. Atomic batches (default) are all-or-nothing "
+                "and fail with 400 listing the books that could not be borrowed"
+)
+def create_borrowings(
+    batch: BorrowingBatchCreate,
+    current_user: Annotated[TokenData, Depends(get_current_user)] = None,
+    db: Session = Depends(get_db)
+):
+    """Borrow several books"""
+    result = borrowing_crud.create_borrowings(
+        db,
+        book_ids=batch.book_ids,
+        borrow_date=batch.borrow_date,
+        user_id=current_user.id,
+        atomic=batch.atomic
+    )
+    if batch.atomic and result.failed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=[item.model_dump(exclude_none=True) for item in result.items if item.error]
+        )
+    return result
+
+
+@router.post(
+    "/batch/return",
+    response_model=BorrowingBatchResult,
+    summary="Return several books",
+    description="Return several borrowings in one transaction. Users can only return their own. "
+                "Atomic batches (default) are all-or-nothing and fail with 400 listing the failures"
+)
+def return_borrowings(
+    batch: BorrowingBatchReturn,
+    current_user: Annotated[TokenData, Depends(get_current_user)] = None,
+    db: Session = Depends(get_db)
+):
+    """Return several books"""
+    result = borrowing_crud.return_borrowings(
+        db,
+        borrowing_ids=batch.borrowing_ids,
+        user_id=None if current_user.role == "admin" else current_user.id,
+        return_date=batch.return_date,
+        atomic=batch.atomic
+    )
+    if batch.atomic and result.failed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=[item.model_dump(exclude_none=True) for item in result.items if item.error]
+        )
+    return result
+
+
 @router.get(
     "/",
     response_model=List[Borrowing],
@@ -48,20 +115,28 @@ def read_borrowings(
     skip: int = 0,
     limit: int = 100,
     status_filter: Optional[BorrowingStatus] = Query(None, alias="status", description="Filter by status"),
-    current_user: Annotated[User, Depends(get_current_user)] = None,
-    db: Session = Depends(get_db)
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; pass an empty value to start keyset pagination"),
+    response: Response = None,
+    current_user: Annotated[TokenData, Depends(get_current_user)] = None,
+    db: Session = Depends(get_read_db)
 ):
     """Get list of borrowings"""
     user_id = None if current_user.role == "admin" else current_user.id
     
-    borrowings = borrowing_crud.get_borrowings(
-        db, 
-        skip=skip, 
-        limit=limit, 
-        user_id=user_id,
-        status=status_filter
-    )
-    return borrowings
+    try:
+        borrowings = borrowing_crud.get_borrowings(
+            db, 
+            skip=skip, 
+            limit=limit, 
+            user_id=user_id,
+            status=status_filter,
+            after=after,
+            as_rows=True
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return rows_response(borrowings, borrowing_crud.CURSOR_COLUMNS, limit, after, response)
 
 
 @router.get(
@@ -73,17 +148,87 @@ def read_borrowings(
 def read_my_borrowings(
     skip: int = 0,
     limit: int = 100,
-    current_user: Annotated[User, Depends(get_current_user)] = None,
-    db: Session = Depends(get_db)
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; pass an empty value to start keyset pagination"),
+    response: Response = None,
+    current_user: Annotated[TokenData, Depends(get_current_user)] = None,
+    db: Session = Depends(get_read_db)
 ):
     """Get my borrowings"""
-    borrowings = borrowing_crud.get_borrowings(
-        db, 
-        skip=skip, 
-        limit=limit, 
-        user_id=current_user.id
+    try:
+        borrowings = borrowing_crud.get_borrowings(
+            db, 
+            skip=skip, 
+            limit=limit, 
+            user_id=current_user.id,
+            after=after,
+            with_details=True,
+            as_rows=True
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return rows_response(borrowings, borrowing_crud.CURSOR_COLUMNS, limit, after, response)
+
+
+@router.get(
+    "/overdue",
+    response_model=List[BorrowingWithDetails],
+    summary="Overdue borrowings",
+    description="Loans past their due date as of the last overdue check, longest overdue first (admin only)"
+)
+def read_overdue_borrowings(
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; pass an empty value to start keyset pagination"),
+    response: Response = None,
+    current_user: Annotated[TokenData, Depends(get_current_admin)] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Get overdue borrowings (admin only)"""
+    try:
+        borrowings = borrowing_crud.get_overdue_borrowings(db, skip=skip, limit=limit, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return rows_response(borrowings, borrowing_crud.OVERDUE_CURSOR_COLUMNS, limit, after, response)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Export borrowings",
+    description="Stream borrowing history with book and user details as CSV or NDJSON (admin only)"
+)
+def export_borrowings(
+    format: str = Query("csv", description="csv or ndjson"),
+    date_from: Optional[date] = Query(None, description="Earliest borrow date (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Latest borrow date (inclusive)"),
+    status_filter: Optional[BorrowingStatus] = Query(None, alias="status", description="Filter by status"),
+    current_user: Annotated[TokenData, Depends(get_current_admin)] = None
+):
+    """Export borrowings (admin only)"""
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format. Use one of: {', '.join(EXPORT_MEDIA_TYPES)}"
+        )
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from must not be after date_to"
+        )
+    
+    fetch = partial(
+        borrowing_crud.export_borrowings,
+        date_from=date_from,
+        date_to=date_to,
+        status=status_filter
+    )
+    return StreamingResponse(
+        stream_export(fetch, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="borrowings.{format}"'}
     )
-    return borrowings
 
 
 @router.get(
@@ -94,8 +239,8 @@ def read_my_borrowings(
 )
 def read_borrowing(
     borrowing_id: int,
-    current_user: Annotated[User, Depends(get_current_user)] = None,
-    db: Session = Depends(get_db)
+    current_user: Annotated[TokenData, Depends(get_current_user)] = None,
+    db: Session = Depends(get_read_db)
 ):
     """Get borrowing by ID"""
     db_borrowing = borrowing_crud.get_borrowing(db, borrowing_id=borrowing_id)
@@ -118,12 +263,12 @@ def read_borrowing(
     "/{borrowing_id}",
     response_model=Borrowing,
     summary="Update borrowing",
-    description="Update borrowing - return book or change return date"
+    description="Update borrowing - return book, change return date or, for admins, the due date"
 )
 def update_borrowing(
     borrowing_id: int,
     borrowing: BorrowingUpdate,
-    current_user: Annotated[User, Depends(get_current_user)] = None,
+    current_user: Annotated[TokenData, Depends(get_current_user)] = None,
     db: Session = Depends(get_db)
 ):
     """Update borrowing (return book)"""
@@ -139,12 +284,25 @@ def update_borrowing(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access forbidden"
         )
+    if borrowing.due_date is not None and current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can change the due date"
+        )
+    if borrowing.status is not None and borrowing.status != BorrowingStatus.RETURNED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only 'returned' can be set; open loans become overdue on their own"
+        )
     
-    updated_borrowing = borrowing_crud.update_borrowing(
-        db, 
-        borrowing_id=borrowing_id, 
-        borrowing=borrowing
-    )
+    try:
+        updated_borrowing = borrowing_crud.update_borrowing(
+            db, 
+            borrowing_id=borrowing_id, 
+            borrowing=borrowing
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return updated_borrowing
 
 
@@ -156,7 +314,7 @@ def update_borrowing(
 )
 def delete_borrowing(
     borrowing_id: int,
-    current_user: Annotated[User, Depends(get_current_admin)] = None,
+    current_user: Annotated[TokenData, Depends(get_current_admin)] = None,
     db: Session = Depends(get_db)
 ):
     """Delete borrowing (admin only)"""
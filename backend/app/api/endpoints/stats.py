@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import Optional, Annotated
+from datetime import date, timedelta
+from app.database import get_read_db
+from app.schemas.stats import CirculationStats
+from app.crud import stats as stats_crud
+from app.api.deps import get_current_admin
+from app.schemas.auth import TokenData
+
+router = APIRouter(prefix="/stats", tags=["Statistics"])
+
+
+@router.get(
+    "/",
+    response_model=CirculationStats,
+    summary="Circulation statistics",
+    description="Books out now, borrows and returns per day, most borrowed titles and active borrowers "
+                "for a date range (default: last 30 days). Admin only"
+)
+def read_circulation_stats(
+    date_from: Optional[date] = Query(None, description="First day (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Last day (inclusive), defaults to today"),
+    top: int = Query(10, ge=1, le=100, description="Number of most borrowed titles"),
+    current_user: Annotated[TokenData, Depends(get_current_admin)] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Get circulation statistics (admin only)"""
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from must not be after date_to"
+        )
+    
+    return stats_crud.get_circulation_stats(db, date_from=date_from, date_to=date_to, top=top)
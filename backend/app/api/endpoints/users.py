@@ -1,11 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import List, Annotated
-from app.database import get_db
+from typing import List, Optional, Annotated
+from app.database import get_db, get_read_db
 from app.schemas.user import User, UserUpdate
 from app.crud import user as user_crud
-from app.api.deps import get_current_user, get_current_admin
-from app.models.user import User as UserModel
+from app.api.deps import get_current_user, get_current_admin, rows_response
+from app.schemas.auth import TokenData
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -17,10 +17,17 @@ router = APIRouter(prefix="/users", tags=["Users"])
     description="Get information about authenticated user"
 )
 def read_current_user(
-    current_user: Annotated[UserModel, Depends(get_current_user)]
+    current_user: Annotated[TokenData, Depends(get_current_user)],
+    db: Session = Depends(get_read_db)
 ):
     """Get current user information"""
-    return current_user
+    db_user = user_crud.get_user(db, user_id=current_user.id)
+    if db_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return db_user
 
 
 @router.get(
@@ -32,12 +39,18 @@ def read_current_user(
 def read_users(
     skip: int = 0,
     limit: int = 100,
-    current_user: Annotated[UserModel, Depends(get_current_admin)] = None,
-    db: Session = Depends(get_db)
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; pass an empty value to start keyset pagination"),
+    response: Response = None,
+    current_user: Annotated[TokenData, Depends(get_current_admin)] = None,
+    db: Session = Depends(get_read_db)
 ):
     """Get list of users (admin only)"""
-    users = user_crud.get_users(db, skip=skip, limit=limit)
-    return users
+    try:
+        users = user_crud.get_users(db, skip=skip, limit=limit, after=after, as_rows=True)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return rows_response(users, user_crud.CURSOR_COLUMNS, limit, after, response)
 
 
 @router.get(
@@ -48,8 +61,8 @@ def read_users(
 )
 def read_user(
     user_id: int,
-    current_user: Annotated[UserModel, Depends(get_current_admin)] = None,
-    db: Session = Depends(get_db)
+    current_user: Annotated[TokenData, Depends(get_current_admin)] = None,
+    db: Session = Depends(get_read_db)
 ):
     """Get user by ID (admin only)"""
     db_user = user_crud.get_user(db, user_id=user_id)
@@ -70,7 +83,7 @@ def read_user(
 def update_user(
     user_id: int,
     user: UserUpdate,
-    current_user: Annotated[UserModel, Depends(get_current_admin)] = None,
+    current_user: Annotated[TokenData, Depends(get_current_admin)] = None,
     db: Session = Depends(get_db)
 ):
     """Update user (admin only)"""
@@ -91,7 +104,7 @@ def update_user(
 )
 def delete_user(
     user_id: int,
-    current_user: Annotated[UserModel, Depends(get_current_admin)] = None,
+    current_user: Annotated[TokenData, Depends(get_current_admin)] = None,
     db: Session = Depends(get_db)
 ):
     """Delete user (admin only)"""
@@ -1,15 +1,105 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Access tokens are checked without the database, so keep them short; refresh tokens renew them
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # How stale a worker's view of revoked tokens (and deactivated users) may get
+    TOKEN_REVOCATION_REFRESH_SECONDS: float = 5
     DATABASE_URL: str = "sqlite:///./library.db"
+    # Read replicas for read-only endpoints, as a JSON list (e.g. ["sqlite:///./replica.db"]);
+    # after a client's request commits, its reads stay on the primary for READ_YOUR_WRITES_SECONDS
+    DATABASE_REPLICA_URLS: List[str] = []
+    READ_YOUR_WRITES_SECONDS: float = 10
+    ASYNC_DB: bool = False
+    # Connection pool; keep size + overflow >= the request threadpool (40 by default)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 30
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # PostgreSQL aborts statements running longer than this (0 keeps the server's setting)
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    # Connections each worker opens at startup, so the first requests do not pay for connecting
+    DB_POOL_PREFILL: int = 4
+    # Create missing tables on startup (single-process development only: workers race on the
+    # DDL). Deployments run `python bootstrap.py` once before starting the workers instead
+    DB_INIT_ON_STARTUP: bool = False
+    # Loans are due this many days after the borrow date
+    LOAN_PERIOD_DAYS: int = 14
+    # How often each worker runs the overdue job (0 disables it, e.g. when cron runs mark_overdue.py)
+    OVERDUE_CHECK_INTERVAL_SECONDS: float = 3600
+    # SQLite connection pragmas
+    SQLITE_JOURNAL_MODE: str = "wal"
+    SQLITE_SYNCHRONOUS: str = "normal"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE: int = -64000  # negative = KiB
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    # Catalog read cache; CACHE_BACKEND_URL (redis://... or memory://) adds a shared second tier
+    CACHE_BACKEND_URL: Optional[str] = None
+    BOOK_CACHE_SIZE: int = 4096
+    BOOK_PAGE_CACHE_SIZE: int = 512
+    BOOK_CACHE_TTL_SECONDS: float = 300
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    # Password hashes running or waiting on the hashing pool; logins and registrations
+    # beyond that are refused at once with 429 rather than queued behind the backlog
+    PASSWORD_HASH_QUEUE_SIZE: int = 16
+    # Token buckets on /auth/*: a burst, refilled per minute (a burst of 0 disables the limit)
+    AUTH_RATE_LIMIT_IP_BURST: int = 20
+    AUTH_RATE_LIMIT_IP_PER_MINUTE: float = 60
+    AUTH_RATE_LIMIT_USERNAME_BURST: int = 5
+    AUTH_RATE_LIMIT_USERNAME_PER_MINUTE: float = 10
+    # memory:// (per worker, the default) or redis://... to share the buckets between workers
+    RATE_LIMIT_STORE_URL: Optional[str] = None
+    # Cache-Control sent with the ETag/Last-Modified of catalog reads
+    BOOKS_LIST_CACHE_CONTROL: str = "public, no-cache"
+    BOOK_DETAIL_CACHE_CONTROL: str = "public, no-cache"
+    # Per-route request and SQL metrics, served on /metrics for Prometheus
+    METRICS_ENABLED: bool = True
+    # SQL diagnostics, all off at 0: log statements slower than SQL_SLOW_QUERY_MS, statement
+    # shapes repeated SQL_N_PLUS_ONE_THRESHOLD times in one request, and requests running more
+    # than SQL_QUERY_BUDGET statements (raising QueryBudgetExceeded with SQL_QUERY_BUDGET_RAISE)
+    SQL_SLOW_QUERY_MS: float = 0
+    SQL_N_PLUS_ONE_THRESHOLD: int = 0
+    SQL_QUERY_BUDGET: int = 0
+    SQL_QUERY_BUDGET_RAISE: bool = False
     
     class Config:
         env_file = ".env"
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """Settings from the environment and .env, read on first use"""
+    return Settings()
+
+
+class Lazy:
+    """Stands in for what `factory()` returns, calling it on every attribute access.
+
+    With a cached factory the object is built on first use rather than when
+    the module holding it is imported, so importing the app reads no settings.
+    """
+
+    __slots__ = ("_factory",)
+
+    def __init__(self, factory):
+        object.__setattr__(self, "_factory", factory)
+
+    def __getattr__(self, name: str):
+        return getattr(self._factory(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._factory(), name, value)
+
+    def __len__(self) -> int:
+        return len(self._factory())
+
+
+settings = Lazy(get_settings)
@@ -1,7 +1,11 @@
 from app.core.security import (
     verify_password,
     get_password_hash,
+    verify_and_update_password,
+    get_password_hash_async,
+    token_claims,
     create_access_token,
-    decode_access_token
+    create_refresh_token,
+    decode_token
 )
 from app.core.permissions import require_admin, require_active_user
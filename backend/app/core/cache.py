@@ -0,0 +1,229 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List, Optional
+from pydantic import TypeAdapter
+from app.config import Lazy, settings
+from app.schemas.book import Book
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire `ttl` seconds after being set"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return cached value or None if missing/expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value, evicting the least recently used entry when full"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheBackend:
+    """Out-of-process cache shared by all workers; values are opaque bytes"""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class InMemoryBackend(CacheBackend):
+    """Process-local stand-in for a shared cache server (development and tests)"""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._data.pop(key, None)
+                return None
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class RedisBackend(CacheBackend):
+    """Redis-backed shared cache; needs the optional `redis` package"""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND_URL=redis://... requires the 'redis' package") from e
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._client.set(key, value, px=int(ttl * 1000))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+
+def create_backend(url: Optional[str]) -> Optional[CacheBackend]:
+    """Build the shared cache backend named by CACHE_BACKEND_URL (None disables it)"""
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return InMemoryBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported cache backend: {url}")
+
+
+class TwoTierCache:
+    """Read-through cache: in-process LRU (L1) in front of an optional shared backend (L2).
+
+    Values are stored as-is in L1 and as JSON produced by `adapter` in L2.
+    A failing L2 is logged and treated as a miss so it never fails a request.
+    """
+
+    def __init__(self, name: str, adapter: TypeAdapter, maxsize: int, ttl: float,
+                 backend: Optional[CacheBackend] = None):
+        self.name = name
+        self.adapter = adapter
+        self.ttl = ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.backend = backend
+        self.backend_hits = 0
+        self.backend_misses = 0
+        self.backend_errors = 0
+
+    def _key(self, key: tuple) -> str:
+        return ":".join(str(part) for part in (self.name, *key))
+
+    def get(self, key: tuple) -> Optional[Any]:
+        """Return the cached value from the nearest tier, or None"""
+        value = self.local.get(key)
+        if value is not None or self.backend is None:
+            return value
+
+        try:
+            raw = self.backend.get(self._key(key))
+        except Exception:
+            logger.warning("cache backend get failed", exc_info=True)
+            self.backend_errors += 1
+            return None
+        if raw is None:
+            self.backend_misses += 1
+            return None
+        self.backend_hits += 1
+        value = self.adapter.validate_json(raw)
+        self.local.set(key, value)
+        return value
+
+    def set(self, key: tuple, value: Any) -> None:
+        """Store value in both tiers"""
+        self.local.set(key, value)
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(self._key(key), self.adapter.dump_json(value), self.ttl)
+        except Exception:
+            logger.warning("cache backend set failed", exc_info=True)
+            self.backend_errors += 1
+
+    def invalidate(self, key: tuple) -> None:
+        """Drop an entry from both tiers"""
+        self.local.invalidate(key)
+        if self.backend is not None:
+            try:
+                self.backend.delete(self._key(key))
+            except Exception:
+                logger.warning("cache backend delete failed", exc_info=True)
+                self.backend_errors += 1
+
+    def stats(self) -> dict:
+        """Hit/miss counters and hit ratio per tier"""
+        def tier(hits: int, misses: int) -> dict:
+            total = hits + misses
+            return {"hits": hits, "misses": misses, "hit_ratio": hits / total if total else 0.0}
+
+        stats = {"l1": {**tier(self.local.hits, self.local.misses), "size": len(self.local)}}
+        if self.backend is not None:
+            stats["l2"] = {**tier(self.backend_hits, self.backend_misses), "errors": self.backend_errors}
+        return stats
+
+
+# Catalog reads: book responses and pages of plain book rows. Keys carry the book's updated_at / the catalog version, so any
+# book write or availability change makes older entries unreachable at once,
+# in every worker; TTL and LRU size only bound memory.
+@lru_cache
+def get_shared_backend() -> Optional[CacheBackend]:
+    return create_backend(settings.CACHE_BACKEND_URL)
+
+
+@lru_cache
+def get_book_cache() -> TwoTierCache:
+    return TwoTierCache(
+        "book", TypeAdapter(Book),
+        maxsize=settings.BOOK_CACHE_SIZE, ttl=settings.BOOK_CACHE_TTL_SECONDS, backend=get_shared_backend()
+    )
+
+
+@lru_cache
+def get_book_page_cache() -> TwoTierCache:
+    return TwoTierCache(
+        "books", TypeAdapter(List[Dict[str, Any]]),
+        maxsize=settings.BOOK_PAGE_CACHE_SIZE, ttl=settings.BOOK_CACHE_TTL_SECONDS, backend=get_shared_backend()
+    )
+
+
+book_cache = Lazy(get_book_cache)
+book_page_cache = Lazy(get_book_page_cache)
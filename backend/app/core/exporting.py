@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Callable, Iterator
+from sqlalchemy import Result
+from sqlalchemy.orm import Session
+from app.database import read_session
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def csv_chunks(result: Result) -> Iterator[str]:
+    """Render a result as CSV, one chunk per fetched batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(result.keys())
+    for batch in result.partitions():
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def ndjson_chunks(result: Result) -> Iterator[str]:
+    """Render a result as newline-delimited JSON, one chunk per fetched batch"""
+    keys = list(result.keys())
+    for batch in result.partitions():
+        yield "".join(
+            json.dumps(dict(zip(keys, row)), default=_json_default) + "\n" for row in batch
+        )
+
+
+def stream_export(fetch: Callable[[Session], Result], format: str) -> Iterator[str]:
+    """Run `fetch` in a dedicated session and yield the rendered export.
+
+    The request's own session is closed before a streaming body is sent, so
+    the generator owns its session for as long as the client keeps reading.
+    Exports read from a replica when there are any.
+    """
+    render = csv_chunks if format == "csv" else ndjson_chunks
+    db = read_session()
+    try:
+        result = fetch(db)
+        try:
+            yield from render(result)
+        finally:
+            result.close()
+    finally:
+        db.close()
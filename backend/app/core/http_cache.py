@@ -0,0 +1,65 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag derived from the values that determine a response body"""
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything is stored in UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    """Format a datetime for the Last-Modified header"""
+    return format_datetime(_as_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def modified_since(if_modified_since: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """False if the resource has not changed since the If-Modified-Since date"""
+    if not if_modified_since or last_modified is None:
+        return True
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return True
+    return _as_utc(last_modified).replace(microsecond=0) > _as_utc(since)
+
+
+def is_not_modified(
+    etag: str,
+    last_modified: Optional[datetime],
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str]
+) -> bool:
+    """Whether a conditional GET can be answered with 304 (If-None-Match wins when present)"""
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if if_modified_since:
+        return not modified_since(if_modified_since, last_modified)
+    return False
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime], cache_control: str) -> dict:
+    """Validator and caching headers shared by 200 and 304 responses"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
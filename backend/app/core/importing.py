@@ -0,0 +1,48 @@
+import csv
+import io
+import json
+from typing import IO, Iterator, Union
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+def _until_decode_error(rows: Iterator[Union[dict, Exception]]) -> Iterator[Union[dict, Exception]]:
+    """Pass rows through; if the file turns out not to be UTF-8, yield that as an error and stop"""
+    try:
+        yield from rows
+    except UnicodeDecodeError:
+        yield ValueError("File is not valid UTF-8 text; the rest of it was not read")
+
+
+def iter_csv_rows(stream: IO[bytes]) -> Iterator[dict]:
+    """Yield rows of a UTF-8 CSV file with a header line; empty cells are left out"""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    for row in csv.DictReader(text):
+        yield {key: value for key, value in row.items() if key and value not in ("", None)}
+
+
+def iter_ndjson_rows(stream: IO[bytes]) -> Iterator[Union[dict, Exception]]:
+    """Yield one object per non-empty line; unparsable lines are yielded as errors"""
+    for line in io.TextIOWrapper(stream, encoding="utf-8-sig"):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"Invalid JSON: {e}")
+            continue
+        yield row if isinstance(row, dict) else ValueError("Row is not a JSON object")
+
+
+def iter_rows(stream: IO[bytes], format: str) -> Iterator[Union[dict, Exception]]:
+    """Stream rows from an uploaded file in the given format"""
+    if format == "csv":
+        return _until_decode_error(iter_csv_rows(stream))
+    if format == "ndjson":
+        return _until_decode_error(iter_ndjson_rows(stream))
+    raise ValueError(f"Unsupported import format: {format}")
+
+
+def detect_format(filename: str) -> str:
+    """Guess import format from a file name (defaults to CSV)"""
+    return "ndjson" if filename and filename.lower().endswith((".ndjson", ".jsonl")) else "csv"
@@ -0,0 +1,232 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Seconds; from a cached 304 to a large export page
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Requests that matched no route share one label so scanners cannot blow up cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """A named metric with fixed label names; values are kept per label combination"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in values
+        ]
+
+
+class Gauge(Counter):
+    """Value that goes up and down"""
+
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with their sum and count"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, *labels) -> None:
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(
+                (labels, (list(counts), total, count)) for labels, (counts, total, count) in self._values.items()
+            )
+        lines = []
+        for labels, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(self.labelnames, labels, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            formatted = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{formatted} {_format_value(total)}")
+            lines.append(f"{self.name}_count{formatted} {count}")
+        return lines
+
+
+REGISTRY: List[Metric] = []
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+requests_total = Counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")
+)
+request_duration = Histogram(
+    "http_request_duration_seconds", "Time until the last byte of the response was sent", ("method", "route")
+)
+requests_in_progress = Gauge(
+    "http_requests_in_progress", "Requests currently being handled", ("method",)
+)
+requests_shed = Counter(
+    "http_requests_shed_total", "Requests refused with 429 by rate limits or admission control", ("route", "reason")
+)
+hash_queue = Gauge(
+    "password_hash_queue", "Password hashes running or waiting on the hashing pool"
+)
+request_queries = Histogram(
+    "http_request_db_queries", "SQL statements executed per request", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS
+)
+request_query_duration = Histogram(
+    "http_request_db_query_seconds", "Time per request spent executing SQL statements", ("method", "route")
+)
+
+
+class QueryStats:
+    """SQL statements executed on behalf of one request"""
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Set by the middleware for each request. Threadpool workers (sync endpoints)
+# and AsyncSession.run_sync run with a copy of the request's context, so the
+# engine events below find the same QueryStats object.
+current_queries: ContextVar[Optional[QueryStats]] = ContextVar("current_queries", default=None)
+
+
+# The start time lives on the statement's execution context, which is discarded
+# with it; after_cursor_execute does not fire for a failed statement.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_started
+    stats = current_queries.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attribute each SQL statement's count and time to the request running it"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route request metrics.
+
+    Unlike BaseHTTPMiddleware it does not buffer or re-wrap responses, so
+    streaming exports pass straight through and are timed to their last byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        queries = QueryStats()
+        token = current_queries.set(queries)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        requests_in_progress.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            requests_in_progress.dec(method)
+            current_queries.reset(token)
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            route = getattr(route, "path", UNMATCHED_ROUTE)
+            requests_total.inc(method, route, status)
+            request_duration.observe(elapsed, method, route)
+            request_queries.observe(queries.count, method, route)
+            request_query_duration.observe(queries.seconds, method, route)
@@ -0,0 +1,32 @@
+import asyncio
+import logging
+import anyio
+from app import database
+from app.crud import borrowing as borrowing_crud
+
+logger = logging.getLogger(__name__)
+
+
+def _mark_overdue() -> int:
+    db = database.SessionLocal()
+    try:
+        return borrowing_crud.mark_overdue(db)
+    finally:
+        db.close()
+
+
+async def mark_overdue_periodically(interval_seconds: float) -> None:
+    """Run the overdue check every `interval_seconds` for as long as the worker lives.
+
+    Each worker runs it; the watermark in crud.borrowing.mark_overdue lets
+    only one of them do the work on a given day. A failed run is logged and
+    retried at the next interval.
+    """
+    while True:
+        try:
+            marked = await anyio.to_thread.run_sync(_mark_overdue)
+            if marked:
+                logger.info("marked %d borrowings overdue", marked)
+        except Exception:
+            logger.warning("overdue check failed", exc_info=True)
+        await asyncio.sleep(interval_seconds)
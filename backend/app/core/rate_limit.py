@@ -0,0 +1,147 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+from app.config import Lazy, settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitStore:
+    """Token buckets keyed by string. Out-of-process stores share them between workers"""
+
+    # Local stores are called on the event loop; remote ones from the threadpool
+    local = True
+
+    def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        """Take one token from the bucket; 0 if there was one, else seconds until there will be"""
+        raise NotImplementedError
+
+
+class InMemoryStore(RateLimitStore):
+    """Per-process buckets, oldest dropped beyond `maxsize` keys (a dropped bucket is simply full again)"""
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [capacity, now]
+                while len(self._buckets) > self.maxsize:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * refill_per_second)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / refill_per_second
+
+
+# KEYS[1] bucket; ARGV capacity, refill per second. Redis's own clock keeps workers consistent
+REDIS_TAKE = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(bucket[1]) or capacity
+local at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - at) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisStore(RateLimitStore):
+    """Buckets in Redis, updated atomically by a Lua script; needs the optional `redis` package"""
+
+    local = False
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_STORE_URL=redis://... requires the 'redis' package") from e
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(REDIS_TAKE)
+
+    def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        return float(self._take(keys=[f"ratelimit:{key}"], args=[capacity, refill_per_second]))
+
+
+def create_store(url: Optional[str]) -> RateLimitStore:
+    """Build the bucket store named by RATE_LIMIT_STORE_URL (per-process memory by default)"""
+    if not url or url.startswith("memory://"):
+        return InMemoryStore()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(url)
+    raise ValueError(f"Unsupported rate limit store: {url}")
+
+
+class RateLimiter:
+    """Allow `burst` requests per key at once, refilled at `per_minute`; a burst of 0 disables it"""
+
+    def __init__(self, name: str, burst: int, per_minute: float, store: RateLimitStore):
+        self.name = name
+        self.burst = burst
+        self.refill_per_second = per_minute / 60
+        self.store = store
+
+    @property
+    def enabled(self) -> bool:
+        return self.burst > 0 and self.refill_per_second > 0
+
+    def hit(self, key: str) -> float:
+        """Count a request; 0 if allowed, else whole seconds to wait (for Retry-After).
+
+        A failing store is logged and lets the request through.
+        """
+        if not self.enabled:
+            return 0.0
+        try:
+            wait = self.store.take(f"{self.name}:{key}", self.burst, self.refill_per_second)
+        except Exception:
+            logger.warning("rate limit store failed", exc_info=True)
+            return 0.0
+        return float(math.ceil(wait)) if wait > 0 else 0.0
+
+
+@lru_cache
+def get_store() -> RateLimitStore:
+    return create_store(settings.RATE_LIMIT_STORE_URL)
+
+
+@lru_cache
+def get_auth_ip_limiter() -> RateLimiter:
+    return RateLimiter(
+        "auth-ip", settings.AUTH_RATE_LIMIT_IP_BURST, settings.AUTH_RATE_LIMIT_IP_PER_MINUTE, get_store()
+    )
+
+
+@lru_cache
+def get_auth_username_limiter() -> RateLimiter:
+    return RateLimiter(
+        "auth-user", settings.AUTH_RATE_LIMIT_USERNAME_BURST, settings.AUTH_RATE_LIMIT_USERNAME_PER_MINUTE,
+        get_store()
+    )
+
+
+auth_ip_limiter = Lazy(get_auth_ip_limiter)
+auth_username_limiter = Lazy(get_auth_username_limiter)
@@ -0,0 +1,40 @@
+import math
+import time
+from starlette.datastructures import MutableHeaders
+from app.database import PrimaryWrites, primary_writes, READ_PRIMARY_COOKIE
+
+
+class ReadYourWritesMiddleware:
+    """Pins a client's reads to the primary for a while after one of its requests commits.
+
+    Replicas lag the primary, so a client reading right after its own write
+    could miss it. The cookie carries the time until which get_read_db skips
+    the replicas for this client; being in the cookie, it holds across
+    workers without shared state.
+    """
+
+    def __init__(self, app, seconds: float):
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        writes = PrimaryWrites()
+        token = primary_writes.set(writes)
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and writes.committed:
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{READ_PRIMARY_COOKIE}={time.time() + self.seconds:.3f}; "
+                    f"Max-Age={math.ceil(self.seconds)}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            primary_writes.reset(token)
@@ -0,0 +1,102 @@
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+from app.config import Lazy, settings
+
+RevocationLoader = Callable[[Set[int]], Tuple[Iterable[Tuple[int, int, bool]], Set[int]]]
+
+
+class TokenRevocations:
+    """What a worker needs to reject tokens without a database lookup per request.
+
+    Only exceptional users are held: those whose token_version was ever
+    bumped, deactivated users and deleted users. A token is good if its
+    version is not below the user's current one (unlisted users are at 0)
+    and the user is neither deactivated nor deleted.
+
+    crud.user updates the structure in its own worker at once; `refresh`
+    reloads it from the database every `refresh_seconds` to pick up changes
+    made through other workers. Deletions leave no row to reload, so the ids
+    seen in tokens since the last refresh are checked for existence.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._versions: Dict[int, int] = {}
+        self._inactive: Set[int] = set()
+        self._deleted: Set[int] = set()
+        self._seen: Set[int] = set()
+        self._refreshed_at = float("-inf")
+        self._refreshing = threading.Lock()
+
+    def check(self, user_id: int, token_version: int) -> Optional[str]:
+        """None if a token with these claims is still good, else why not: "revoked" or "deactivated" """
+        self._seen.add(user_id)
+        if user_id in self._deleted:
+            return "revoked"
+        if user_id in self._inactive:
+            return "deactivated"
+        if token_version < self._versions.get(user_id, 0):
+            return "revoked"
+        return None
+
+    def loaded(self) -> bool:
+        """Whether a load from the database has succeeded yet"""
+        return self._refreshed_at != float("-inf")
+
+    def needs_refresh(self) -> bool:
+        return time.monotonic() - self._refreshed_at >= self.refresh_seconds
+
+    def refresh(self, load: RevocationLoader) -> None:
+        """Reload through `load(seen_ids) -> ((id, token_version, is_active) rows of exceptional users, existing ids)`.
+
+        Only one thread reloads at a time; others keep using the current
+        snapshot meanwhile. Until the first load has succeeded there is no
+        snapshot to fall back on, so callers wait for it (and a failing load
+        raises rather than letting tokens through unchecked).
+        """
+        loaded = self.loaded()
+        if not self._refreshing.acquire(blocking=not loaded):
+            return
+        try:
+            if not loaded and self.loaded():
+                # Another thread finished the first load while this one waited
+                return
+            seen, self._seen = self._seen, set()
+            rows, existing = load(seen)
+            versions, inactive = {}, set()
+            for user_id, token_version, is_active in rows:
+                if token_version:
+                    versions[user_id] = token_version
+                if not is_active:
+                    inactive.add(user_id)
+            self._versions, self._inactive = versions, inactive
+            # User ids are never reused, so a deleted id stays deleted
+            self._deleted |= seen - existing
+            self._refreshed_at = time.monotonic()
+        finally:
+            self._refreshing.release()
+
+    def update(self, user_id: int, token_version: int, is_active: bool) -> None:
+        """Record a user's new token version and status (called after the change is committed)"""
+        if token_version:
+            self._versions[user_id] = token_version
+        if is_active:
+            self._inactive.discard(user_id)
+        else:
+            self._inactive.add(user_id)
+
+    def delete(self, user_id: int) -> None:
+        self._deleted.add(user_id)
+
+    def __len__(self) -> int:
+        return len(self._versions) + len(self._inactive) + len(self._deleted)
+
+
+@lru_cache
+def get_token_revocations() -> TokenRevocations:
+    return TokenRevocations(settings.TOKEN_REVOCATION_REFRESH_SECONDS)
+
+
+token_revocations = Lazy(get_token_revocations)
@@ -1,40 +1,140 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
+from functools import lru_cache
+from typing import Optional, Tuple
 from passlib.context import CryptContext
-from app.config import settings
+from app.config import Lazy, settings
+from app.core import metrics
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@lru_cache
+def get_pwd_context() -> CryptContext:
+    # Hashes with a different cost than BCRYPT_ROUNDS are flagged for rehash on login
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+    )
+
+
+@lru_cache
+def get_hash_executor() -> ThreadPoolExecutor:
+    # bcrypt releases the GIL, so a small dedicated pool caps hashing CPU without
+    # tying up the request threadpool shared with catalog reads
+    return ThreadPoolExecutor(
+        max_workers=settings.PASSWORD_HASH_WORKERS,
+        thread_name_prefix="password-hash"
+    )
+
+
+class HashQueueFull(Exception):
+    """PASSWORD_HASH_QUEUE_SIZE hashes are already running or waiting on the hashing pool"""
+
+
+class HashAdmission:
+    """Bounds the hashing pool's backlog so a burst of logins is shed instead of queued.
+
+    Only the async hashing functions pass through it; they run on the event
+    loop thread, so a plain counter suffices.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.pending = 0
+
+    @contextmanager
+    def admit(self):
+        if self.pending >= self.limit:
+            raise HashQueueFull()
+        self.pending += 1
+        metrics.hash_queue.inc()
+        try:
+            yield
+        finally:
+            self.pending -= 1
+            metrics.hash_queue.dec()
+
+
+@lru_cache
+def get_hash_admission() -> HashAdmission:
+    return HashAdmission(settings.PASSWORD_HASH_QUEUE_SIZE)
+
+
+hash_admission = Lazy(get_hash_admission)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_hash_executor().submit(get_pwd_context().verify, plain_password, hashed_password).result()
 
 
 def get_password_hash(password: str) -> str:
     """Hash password"""
-    return pwd_context.hash(password)
+    return get_hash_executor().submit(get_pwd_context().hash, password).result()
 
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create JWT token"""
+async def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify password on the hashing pool; returns a new hash if the stored one needs upgrading.
+
+    Raises HashQueueFull when the pool's backlog is at its limit.
+    """
+    loop = asyncio.get_running_loop()
+    with hash_admission.admit():
+        return await loop.run_in_executor(
+            get_hash_executor(), get_pwd_context().verify_and_update, plain_password, hashed_password
+        )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash password on the hashing pool without blocking the event loop (raises HashQueueFull like above)"""
+    loop = asyncio.get_running_loop()
+    with hash_admission.admit():
+        return await loop.run_in_executor(get_hash_executor(), get_pwd_context().hash, password)
+
+
+def token_claims(user) -> dict:
+    """Claims identifying a user in their tokens: username, id, role and token version"""
+    return {"sub": user.username, "uid": user.id, "role": user.role, "ver": user.token_version}
+
+
+def _encode_token(data: dict, token_type: str, expires_delta: timedelta) -> str:
+    # jose loads its cryptography backend on import (~100ms); scripts importing the models skip it
+    from jose import jwt
+
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
-
-
-def decode_access_token(token: str) -> Optional[str]:
-    """Decode JWT token"""
+    to_encode.update({"exp": datetime.utcnow() + expires_delta, "type": token_type})
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """Create JWT access token (pass token_claims(user) as `data`)"""
+    if expires_delta is None:
+        expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return _encode_token(data, "access", expires_delta)
+
+
+def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """Create long-lived JWT that can only be exchanged for new tokens at /auth/refresh"""
+    if expires_delta is None:
+        expires_delta = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    return _encode_token(data, "refresh", expires_delta)
+
+
+def decode_token(token: str, token_type: str = "access") -> Optional[dict]:
+    """Verified claims of a JWT of the given type; None if invalid, expired or of another type"""
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        return username
     except JWTError:
         return None
+    if payload.get("type") != token_type or not isinstance(payload.get("uid"), int) or "sub" not in payload:
+        return None
+    return payload
+
@@ -0,0 +1,136 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Runs of bound parameters, as rendered for expanding IN lists and multi-row VALUES
+_PARAMETER_RUN = re.compile(r"(\?|%\(\w+\)s|\$\d+|:\w+)(\s*,\s*(\?|%\(\w+\)s|\$\d+|:\w+))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(Exception):
+    """A request (or `query_budget` block) ran more SQL statements than allowed"""
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with whitespace and IN-list lengths normalized, so repeats of one query compare equal"""
+    return _PARAMETER_RUN.sub("?, ...", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryLog:
+    """SQL statements executed within one request or `query_budget` block"""
+
+    def __init__(self, label: str = "", scope: Optional[dict] = None, slow_query_ms: float = 0):
+        self._label = label
+        self.scope = scope
+        self.slow_query_ms = slow_query_ms
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    @property
+    def label(self) -> str:
+        if self.scope is not None:
+            # The router stores the matched route in the scope once it has picked one
+            route = self.scope.get("route")
+            return f"{self.scope['method']} {getattr(route, 'path', self.scope['path'])}"
+        return self._label
+
+    def repeated(self, threshold: int) -> list:
+        """(count, shape) of statements run at least `threshold` times, most frequent first"""
+        return [(count, shape) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+# Set per request by SQLDebugMiddleware (or by query_budget); threadpool
+# workers and AsyncSession.run_sync see the same QueryLog object.
+current_log: ContextVar[Optional[QueryLog]] = ContextVar("current_log", default=None)
+
+
+# Kept on the execution context rather than the connection: after_cursor_execute
+# does not fire for a failed statement, so nothing would pop it.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_log.get() is not None:
+        context._sql_debug_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    log = current_log.get()
+    started = getattr(context, "_sql_debug_started", None)
+    if log is None or started is None:
+        return
+    elapsed = time.perf_counter() - started
+    log.count += 1
+    log.seconds += elapsed
+    log.shapes[statement_shape(statement)] += 1
+    if log.slow_query_ms and elapsed * 1000 >= log.slow_query_ms:
+        logger.warning("slow query (%.1fms) in %s: %s %r", elapsed * 1000, log.label, statement, parameters)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Record statements on this engine into the current QueryLog, if any"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def check_log(log: QueryLog, n_plus_one_threshold: int = 0, budget: int = 0, raise_on_budget: bool = False) -> None:
+    """Warn about repeated statement shapes, and warn (or raise) when the statement count is over budget"""
+    if n_plus_one_threshold:
+        for count, shape in log.repeated(n_plus_one_threshold):
+            logger.warning("possible N+1 in %s: %d x %s", log.label, count, shape)
+    if budget and log.count > budget:
+        message = f"{log.label} ran {log.count} SQL statements, budget is {budget}"
+        if raise_on_budget:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = "query_budget", n_plus_one_threshold: int = 0):
+    """Raise QueryBudgetExceeded if the block runs more than `max_queries` statements.
+
+    For tests and scripts calling crud functions directly; the engine must
+    have been passed to instrument_engine.
+    """
+    log = QueryLog(label)
+    token = current_log.set(log)
+    try:
+        yield log
+    finally:
+        current_log.reset(token)
+    check_log(log, n_plus_one_threshold, max_queries, raise_on_budget=True)
+
+
+class SQLDebugMiddleware:
+    """Pure ASGI middleware logging slow statements, repeated statements (N+1) and requests over a query budget.
+
+    With raise_on_budget the QueryBudgetExceeded escapes the app after the
+    response is sent, so the test client re-raises it and the test fails.
+    """
+
+    def __init__(self, app, slow_query_ms: float = 0, n_plus_one_threshold: int = 0,
+                 query_budget: int = 0, raise_on_budget: bool = False):
+        self.app = app
+        self.slow_query_ms = slow_query_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.query_budget = query_budget
+        self.raise_on_budget = raise_on_budget
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log = QueryLog(scope=scope, slow_query_ms=self.slow_query_ms)
+        token = current_log.set(log)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_log.reset(token)
+        check_log(log, self.n_plus_one_threshold, self.query_budget, self.raise_on_budget)
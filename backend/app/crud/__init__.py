@@ -1 +1 @@
-from app.crud import user, book, borrowing
+from app.crud import user, book, borrowing, catalog, stats
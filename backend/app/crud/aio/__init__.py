@@ -0,0 +1 @@
+from app.crud.aio import user, book, borrowing, catalog
@@ -0,0 +1,16 @@
+from functools import wraps
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def async_variant(func):
+    """Wrap a sync crud function so it runs on an AsyncSession.
+
+    The function body executes via AsyncSession.run_sync, so queries and
+    loading rules stay defined once in the sync crud modules.
+    """
+    @wraps(func)
+    async def wrapper(db: AsyncSession, *args, **kwargs):
+        return await db.run_sync(func, *args, **kwargs)
+
+    wrapper.__doc__ = f"Async variant of {func.__module__}.{func.__name__}"
+    return wrapper
@@ -0,0 +1,14 @@
+from app.crud import book
+from app.crud.aio.base import async_variant
+
+CURSOR_COLUMNS = book.CURSOR_COLUMNS
+
+get_book = async_variant(book.get_book)
+get_book_updated_at = async_variant(book.get_book_updated_at)
+get_book_by_isbn = async_variant(book.get_book_by_isbn)
+get_books = async_variant(book.get_books)
+get_book_cached = async_variant(book.get_book_cached)
+get_books_cached = async_variant(book.get_books_cached)
+create_book = async_variant(book.create_book)
+update_book = async_variant(book.update_book)
+delete_book = async_variant(book.delete_book)
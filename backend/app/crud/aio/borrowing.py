@@ -0,0 +1,10 @@
+from app.crud import borrowing
+from app.crud.aio.base import async_variant
+
+CURSOR_COLUMNS = borrowing.CURSOR_COLUMNS
+
+get_borrowing = async_variant(borrowing.get_borrowing)
+get_borrowings = async_variant(borrowing.get_borrowings)
+create_borrowing = async_variant(borrowing.create_borrowing)
+update_borrowing = async_variant(borrowing.update_borrowing)
+delete_borrowing = async_variant(borrowing.delete_borrowing)
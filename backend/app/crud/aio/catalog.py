@@ -0,0 +1,4 @@
+from app.crud import catalog
+from app.crud.aio.base import async_variant
+
+get_catalog_state = async_variant(catalog.get_catalog_state)
@@ -0,0 +1,15 @@
+from app.crud import user
+from app.crud.aio.base import async_variant
+
+CURSOR_COLUMNS = user.CURSOR_COLUMNS
+
+get_user = async_variant(user.get_user)
+get_user_by_username = async_variant(user.get_user_by_username)
+get_user_by_email = async_variant(user.get_user_by_email)
+get_users = async_variant(user.get_users)
+# Pass hashed_password (from core.security.get_password_hash_async) to create_user,
+# otherwise bcrypt blocks the event loop; update_user still hashes new passwords inline
+create_user = async_variant(user.create_user)
+update_user = async_variant(user.update_user)
+set_password_hash = async_variant(user.set_password_hash)
+delete_user = async_variant(user.delete_user)
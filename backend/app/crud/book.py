@@ -1,7 +1,23 @@
-from sqlalchemy.orm import Session
-from typing import Optional, List
-from app.models.book import Book
-from app.schemas.book import BookCreate, BookUpdate
+import re
+from itertools import islice
+from pydantic import ValidationError
+from sqlalchemy import func, literal_column, insert, select, Result, Row
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, Query
+from typing import Optional, List, Iterable, Union
+from app.models.book import Book, books_fts, search_config, search_document
+from app.schemas.book import Book as BookSchema, BookCreate, BookUpdate, BookImportResult, BookImportError
+from app.crud.pagination import paginate_after
+from app.crud.catalog import bump_catalog_version
+from app.core.cache import book_cache, book_page_cache
+
+CURSOR_COLUMNS = (Book.title, Book.id)
+
+# Columns of the Book response schema, for list endpoints that serialize plain rows
+ROW_COLUMNS = tuple(getattr(Book, name) for name in BookSchema.model_fields)
+
+# Only the first errors are returned in detail so a bad file cannot grow the report unbounded
+MAX_IMPORT_ERRORS = 1000
 
 
 def get_book(db: Session, book_id: int) -> Optional[Book]:
@@ -9,6 +25,27 @@ def get_book(db: Session, book_id: int) -> Optional[Book]:
     return db.query(Book).filter(Book.id == book_id).first()
 
 
+def get_book_updated_at(db: Session, book_id: int) -> Optional[Row]:
+    """Get only the book's updated_at (None if the book does not exist), without loading it"""
+    return db.execute(select(Book.updated_at).where(Book.id == book_id)).first()
+
+
+def get_book_cached(db: Session, book_id: int, updated_at) -> Optional[BookSchema]:
+    """Get book by ID as a response model, read through the book cache.
+
+    `updated_at` comes from get_book_updated_at, so a changed book misses.
+    """
+    key = (book_id, updated_at.isoformat())
+    book = book_cache.get(key)
+    if book is None:
+        db_book = get_book(db, book_id)
+        if db_book is None:
+            return None
+        book = BookSchema.model_validate(db_book)
+        book_cache.set(key, book)
+    return book
+
+
 def get_book_by_isbn(db: Session, isbn: str) -> Optional[Book]:
     """Get book by ISBN"""
     return db.query(Book).filter(Book.isbn == isbn).first()
@@ -18,18 +55,94 @@ def get_books(
     db: Session, 
     skip: int = 0, 
     limit: int = 100,
-    search: Optional[str] = None
-) -> List[Book]:
-    """Get list of books with optional search"""
-    query = db.query(Book)
+    search: Optional[str] = None,
+    after: Optional[str] = None,
+    as_rows: bool = False
+) -> Union[List[Book], List[dict]]:
+    """Get list of books with optional search.
+
+    Passing `after` (a cursor, or "" for the first page) switches to keyset
+    pagination ordered by title; search results are then not ranked.
+    `as_rows` selects only ROW_COLUMNS and returns plain dicts instead of
+    ORM objects.
+    """
+    query = db.query(*ROW_COLUMNS) if as_rows else db.query(Book)
     
     if search:
-        query = query.filter(
-            (Book.title.contains(search)) | 
-            (Book.author.contains(search))
+        query = search_books(db, query, search, ranked=after is None)
+    
+    if after is not None:
+        query = paginate_after(query, CURSOR_COLUMNS, after, limit)
+    else:
+        query = query.offset(skip).limit(limit)
+    
+    return [row._asdict() for row in query] if as_rows else query.all()
+
+
+def get_books_cached(
+    db: Session,
+    catalog_version: int,
+    skip: int = 0,
+    limit: int = 100,
+    search: Optional[str] = None,
+    after: Optional[str] = None
+) -> List[dict]:
+    """get_books as plain rows, read through the page cache keyed by catalog version"""
+    key = (catalog_version, skip, limit, search, after)
+    books = book_page_cache.get(key)
+    if books is None:
+        books = get_books(db, skip=skip, limit=limit, search=search, after=after, as_rows=True)
+        book_page_cache.set(key, books)
+    return books
+
+
+def search_books(db: Session, query: Query, search: str, ranked: bool = True) -> Query:
+    """Filter (and optionally rank) a book query by title/author using the full-text index"""
+    terms = re.findall(r"\w+", search)
+    dialect = db.get_bind().dialect.name
+
+    # Every term is matched as a prefix so search-as-you-type keeps working
+    if terms and dialect == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        query = (
+            query.join(books_fts, books_fts.c.rowid == Book.id)
+            .filter(literal_column("books_fts").match(match))
         )
+        return query.order_by(books_fts.c.rank, Book.id) if ranked else query
+
+    if terms and dialect == "postgresql":
+        tsquery = func.to_tsquery(search_config, " & ".join(f"{term}:*" for term in terms))
+        query = query.filter(search_document.op("@@")(tsquery))
+        if ranked:
+            query = query.order_by(func.ts_rank(search_document, tsquery).desc(), Book.id)
+        return query
+
+    return query.filter(
+        (Book.title.contains(search)) | 
+        (Book.author.contains(search))
+    )
+
+
+def export_books(db: Session, search: Optional[str] = None, batch_size: int = 1000) -> Result:
+    """Stream the catalog (optionally filtered by search) in batches from a server-side cursor"""
+    query = db.query(
+        Book.id,
+        Book.title,
+        Book.author,
+        Book.isbn,
+        Book.published_year,
+        Book.quantity,
+        Book.available,
+        Book.created_at
+    )
+    
+    if search:
+        query = search_books(db, query, search, ranked=False)
     
-    return query.offset(skip).limit(limit).all()
+    return db.execute(
+        query.order_by(Book.id).statement,
+        execution_options={"stream_results": True, "yield_per": batch_size}
+    )
 
 
 def create_book(db: Session, book: BookCreate) -> Book:
@@ -43,11 +156,108 @@ def create_book(db: Session, book: BookCreate) -> Book:
         available=book.quantity
     )
     db.add(db_book)
+    db.flush()
+    bump_catalog_version(db)
     db.commit()
-    db.refresh(db_book)
     return db_book
 
 
+def import_books(
+    db: Session,
+    rows: Iterable[Union[dict, Exception]],
+    chunk_size: int = 1000
+) -> BookImportResult:
+    """Bulk insert books from an iterable of raw rows, committing once per chunk.
+
+    Rows are validated against BookCreate; ISBNs already in the catalog or
+    repeated in the upload are skipped. Parse failures may be passed in as
+    Exception instances so they are reported against their row number.
+    Errors are listed in row order.
+    """
+    result = BookImportResult()
+    rows = enumerate(rows, start=1)
+    chunk_errors = []
+
+    def report(row_number: int, error: str, isbn: Optional[str] = None, skipped: bool = False):
+        if skipped:
+            result.skipped += 1
+        else:
+            result.failed += 1
+        chunk_errors.append(BookImportError(row=row_number, isbn=isbn, error=error))
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        chunk_errors.clear()
+
+        valid = []
+        for row_number, row in chunk:
+            if isinstance(row, Exception):
+                report(row_number, str(row))
+                continue
+            try:
+                book = BookCreate.model_validate(row)
+            except ValidationError as e:
+                report(row_number, "; ".join(
+                    f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+                ))
+                continue
+            valid.append((row_number, book))
+
+        # Earlier chunks are already committed, so one query per chunk covers them too
+        isbns = [book.isbn for _, book in valid if book.isbn]
+        existing = set()
+        if isbns:
+            existing = {isbn for (isbn,) in db.query(Book.isbn).filter(Book.isbn.in_(isbns))}
+
+        seen_isbns = set()
+        values = []
+        for row_number, book in valid:
+            if book.isbn and (book.isbn in existing or book.isbn in seen_isbns):
+                report(row_number, "Book with this ISBN already exists", isbn=book.isbn, skipped=True)
+                continue
+            if book.isbn:
+                seen_isbns.add(book.isbn)
+            values.append({**book.model_dump(), "available": book.quantity})
+
+        if values:
+            # Rows whose ISBN another import inserted meanwhile are skipped by the database
+            inserted = db.execute(_insert_ignoring_isbn_conflicts(db), values).all()
+            bump_catalog_version(db)
+            db.commit()
+            result.created += len(inserted)
+            if len(inserted) < len(values):
+                inserted_isbns = {isbn for (isbn,) in inserted}
+                for row_number, book in valid:
+                    if book.isbn in seen_isbns and book.isbn not in inserted_isbns:
+                        seen_isbns.discard(book.isbn)
+                        report(row_number, "Book with this ISBN already exists", isbn=book.isbn, skipped=True)
+
+        chunk_errors.sort(key=lambda error: error.row)
+        result.errors.extend(chunk_errors[:MAX_IMPORT_ERRORS - len(result.errors)])
+
+    return result
+
+
+def _insert_ignoring_isbn_conflicts(db: Session):
+    """Core INSERT for books that skips rows whose ISBN was inserted concurrently.
+
+    Targets the Table rather than the mapped class so the rows go through a
+    plain executemany instead of ORM bulk-insert bookkeeping. Returns the
+    ISBN of each row actually inserted.
+    """
+    table = Book.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = postgresql.insert(table).on_conflict_do_nothing(index_elements=["isbn"])
+    elif dialect == "sqlite":
+        statement = sqlite.insert(table).on_conflict_do_nothing(index_elements=["isbn"])
+    else:
+        statement = insert(table)
+    return statement.returning(table.c.isbn)
+
+
 def update_book(db: Session, book_id: int, book: BookUpdate) -> Optional[Book]:
     """Update book data"""
     db_book = get_book(db, book_id)
@@ -59,8 +269,9 @@ def update_book(db: Session, book_id: int, book: BookUpdate) -> Optional[Book]:
     for key, value in update_data.items():
         setattr(db_book, key, value)
     
+    db.flush()
+    bump_catalog_version(db)
     db.commit()
-    db.refresh(db_book)
     return db_book
 
 
@@ -71,5 +282,7 @@ def delete_book(db: Session, book_id: int) -> bool:
         return False
     
     db.delete(db_book)
+    db.flush()
+    bump_catalog_version(db)
     db.commit()
     return True
@@ -1,14 +1,73 @@
-from sqlalchemy.orm import Session
-from typing import Optional, List
-from datetime import date
-from app.models.borrowing import Borrowing, BorrowingStatus
+from collections import Counter
+from sqlalchemy import case, select, update, Result
+from sqlalchemy.orm import Session, Query, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Dict, Optional, List, Set, Union
+from datetime import date, timedelta
+from app.config import settings
+from app.models.borrowing import Borrowing, BorrowingStatus, OPEN_STATUSES
 from app.models.book import Book
-from app.schemas.borrowing import BorrowingCreate, BorrowingUpdate
+from app.models.catalog import utcnow
+from app.models.overdue import OverdueScan, OVERDUE_SCAN_ID
+from app.models.user import User
+from app.schemas.borrowing import (
+    Borrowing as BorrowingSchema,
+    BorrowingCreate,
+    BorrowingUpdate,
+    BorrowingBatchItem,
+    BorrowingBatchResult
+)
+from app.crud.pagination import paginate_after
+from app.crud.catalog import bump_catalog_version
+from app.crud import stats as stats_crud
 
+CURSOR_COLUMNS = (Borrowing.borrow_date, Borrowing.id)
+OVERDUE_CURSOR_COLUMNS = (Borrowing.due_date, Borrowing.id)
 
-def get_borrowing(db: Session, borrowing_id: int) -> Optional[Borrowing]:
-    """Get borrowing by ID"""
-    return db.query(Borrowing).filter(Borrowing.id == borrowing_id).first()
+_overdue_scan = OverdueScan.__table__
+
+# Columns of the Borrowing response schema, plus the BorrowingWithDetails extras
+# joined from books and users, for list endpoints that serialize plain rows
+ROW_COLUMNS = tuple(getattr(Borrowing, name) for name in BorrowingSchema.model_fields)
+DETAIL_COLUMNS = (
+    User.username.label("user_username"),
+    Book.title.label("book_title"),
+    Book.author.label("book_author"),
+    Book.isbn.label("book_isbn")
+)
+
+
+def due_date_for(borrow_date: date) -> date:
+    """Due date of a loan starting on `borrow_date`"""
+    return borrow_date + timedelta(days=settings.LOAN_PERIOD_DAYS)
+
+
+def open_status(due_date: Optional[date], today: Optional[date] = None) -> BorrowingStatus:
+    """Status of a loan that is not returned: overdue once its due date has passed"""
+    if due_date is not None and due_date < (today or date.today()):
+        return BorrowingStatus.OVERDUE
+    return BorrowingStatus.BORROWED
+
+
+def _rows_with_details(db: Session) -> Query:
+    return (
+        db.query(*ROW_COLUMNS, *DETAIL_COLUMNS)
+        .select_from(Borrowing)
+        .outerjoin(Book, Borrowing.book_id == Book.id)
+        .outerjoin(User, Borrowing.user_id == User.id)
+    )
+
+
+def get_borrowing(db: Session, borrowing_id: int, for_update: bool = False) -> Optional[Borrowing]:
+    """Get borrowing by ID.
+
+    `for_update` locks the row on databases that support it and reloads it
+    into an object the session already holds, which may be stale by then.
+    """
+    query = db.query(Borrowing).filter(Borrowing.id == borrowing_id)
+    if for_update:
+        query = query.with_for_update().populate_existing()
+    return query.first()
 
 
 def get_borrowings(
@@ -16,17 +75,184 @@ def get_borrowings(
     skip: int = 0, 
     limit: int = 100,
     user_id: Optional[int] = None,
-    status: Optional[str] = None
-) -> List[Borrowing]:
-    """Get list of borrowings with filtering"""
-    query = db.query(Borrowing)
+    status: Optional[str] = None,
+    after: Optional[str] = None,
+    with_details: bool = False,
+    as_rows: bool = False
+) -> Union[List[Borrowing], List[dict]]:
+    """Get list of borrowings with filtering (keyset pagination by borrow date when `after` is given).
+
+    `with_details` joins the book and user in the same SELECT, for responses
+    that read the association proxies (BorrowingWithDetails). `as_rows`
+    selects only ROW_COLUMNS (and DETAIL_COLUMNS) and returns plain dicts.
+    """
+    if as_rows and with_details:
+        query = _rows_with_details(db)
+    elif as_rows:
+        query = db.query(*ROW_COLUMNS)
+    else:
+        query = db.query(Borrowing)
+    
+    if with_details and not as_rows:
+        query = query.options(joinedload(Borrowing.book), joinedload(Borrowing.user))
     
     if user_id:
         query = query.filter(Borrowing.user_id == user_id)
     if status:
         query = query.filter(Borrowing.status == status)
     
-    return query.offset(skip).limit(limit).all()
+    if after is not None:
+        query = paginate_after(query, CURSOR_COLUMNS, after, limit)
+    else:
+        query = query.offset(skip).limit(limit)
+    
+    return [row._asdict() for row in query] if as_rows else query.all()
+
+
+def get_overdue_borrowings(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = None
+) -> List[dict]:
+    """Overdue loans with book and user details as plain rows, longest overdue first.
+
+    The (status, due_date) index serves both the filter and the order, so a
+    page is an index seek. A loan falling due shows up after the overdue
+    job's next run.
+    """
+    query = _rows_with_details(db).filter(Borrowing.status == BorrowingStatus.OVERDUE)
+    if after is not None:
+        query = paginate_after(query, OVERDUE_CURSOR_COLUMNS, after, limit)
+    else:
+        query = query.order_by(*OVERDUE_CURSOR_COLUMNS).offset(skip).limit(limit)
+    return [row._asdict() for row in query]
+
+
+def export_borrowings(
+    db: Session,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = None,
+    batch_size: int = 1000
+) -> Result:
+    """Stream borrowings joined with their book and user as flat rows.
+
+    Rows are fetched `batch_size` at a time from a server-side cursor (where
+    the driver has one), so memory stays flat however large the history is.
+    """
+    query = (
+        select(
+            Borrowing.id,
+            Borrowing.user_id,
+            User.username.label("user_username"),
+            Borrowing.book_id,
+            Book.title.label("book_title"),
+            Book.author.label("book_author"),
+            Book.isbn.label("book_isbn"),
+            Borrowing.borrow_date,
+            Borrowing.due_date,
+            Borrowing.return_date,
+            Borrowing.status,
+            Borrowing.created_at
+        )
+        .join(Book, Borrowing.book_id == Book.id)
+        .join(User, Borrowing.user_id == User.id)
+    )
+    
+    if date_from:
+        query = query.where(Borrowing.borrow_date >= date_from)
+    if date_to:
+        query = query.where(Borrowing.borrow_date <= date_to)
+    if status:
+        query = query.where(Borrowing.status == status)
+    
+    return db.execute(
+        query.order_by(*CURSOR_COLUMNS),
+        execution_options={"stream_results": True, "yield_per": batch_size}
+    )
+
+
+def _claim_copies(db: Session, counts: Dict[int, int]) -> Set[int]:
+    """Atomically take counts[book_id] available copies of each book; returns the books that had enough.
+
+    One conditional UPDATE covers every book, so a batch costs one
+    statement however many titles it borrows.
+    """
+    if not counts:
+        return set()
+    wanted = case(counts, value=Book.id)
+    claimed = db.execute(
+        update(Book)
+        .where(Book.id.in_(counts), Book.available >= wanted)
+        .values(available=Book.available - wanted)
+        .returning(Book.id),
+        execution_options={"synchronize_session": False}
+    )
+    return set(claimed.scalars())
+
+
+def _claim_copy(db: Session, book_id: int, count: int = 1) -> bool:
+    """Atomically take `count` available copies of a book; False if not enough are left"""
+    return book_id in _claim_copies(db, {book_id: count})
+
+
+def _close_loans(
+    db: Session,
+    loans: List[Borrowing],
+    return_date: Optional[date] = None
+) -> List[Borrowing]:
+    """Atomically mark open loans returned (on `return_date`, if given) and put their copies back.
+
+    The conditional UPDATE makes concurrent returns/deletes of the same loan
+    release the copy exactly once; it returns the loans this call closed.
+    Their books get their copies back in one grouped UPDATE. The caller
+    bumps the catalog version before committing (see _commit_catalog_change).
+    """
+    if not loans:
+        return []
+    values = {"status": BorrowingStatus.RETURNED}
+    if return_date is not None:
+        values["return_date"] = return_date
+    closed_ids = set(db.execute(
+        update(Borrowing)
+        .where(Borrowing.id.in_([loan.id for loan in loans]), Borrowing.status.in_(OPEN_STATUSES))
+        .values(**values)
+        .returning(Borrowing.id),
+        execution_options={"synchronize_session": False}
+    ).scalars())
+    closed = [loan for loan in loans if loan.id in closed_ids]
+    if not closed:
+        return []
+
+    # Mirror the UPDATE on the loaded loans, which are not reloaded after commit
+    for loan in closed:
+        for key, value in values.items():
+            set_committed_value(loan, key, value)
+    copies = Counter(loan.book_id for loan in closed)
+    db.execute(
+        update(Book)
+        .where(Book.id.in_(copies))
+        .values(available=Book.available + case(copies, value=Book.id)),
+        execution_options={"synchronize_session": False}
+    )
+    return closed
+
+
+def _close_loan(db: Session, db_borrowing: Borrowing) -> bool:
+    """Atomically mark an open loan returned and put its copy back (see _close_loans)"""
+    return bool(_close_loans(db, [db_borrowing]))
+
+
+def _commit_catalog_change(db: Session) -> None:
+    """Commit a transaction that changed books' availability.
+
+    The catalog_state row is locked from its bump until the commit, so the
+    pending INSERTs go out first and the bump is the last statement.
+    """
+    db.flush()
+    bump_catalog_version(db)
+    db.commit()
 
 
 def create_borrowing(
@@ -35,62 +261,241 @@ def create_borrowing(
     user_id: int
 ) -> Optional[Borrowing]:
     """Create new borrowing (borrow a book)"""
-    book = db.query(Book).filter(Book.id == borrowing.book_id).first()
-    if not book or book.available <= 0:
+    if not _claim_copy(db, borrowing.book_id):
+        db.rollback()
         return None
 
+    due_date = due_date_for(borrowing.borrow_date)
     db_borrowing = Borrowing(
         user_id=user_id,
         book_id=borrowing.book_id,
         borrow_date=borrowing.borrow_date,
-        status=BorrowingStatus.BORROWED
+        due_date=due_date,
+        # A backdated loan may be overdue already; the overdue job only looks at newly due ones
+        status=open_status(due_date)
     )
-
-    book.available -= 1
     
     db.add(db_borrowing)
-    db.commit()
-    db.refresh(db_borrowing)
+    stats_crud.record_borrow(db, db_borrowing)
+    _commit_catalog_change(db)
     return db_borrowing
 
 
+def create_borrowings(
+    db: Session,
+    book_ids: List[int],
+    borrow_date: date,
+    user_id: int,
+    atomic: bool = True
+) -> BorrowingBatchResult:
+    """Borrow several books in one transaction.
+
+    All books are looked up in one query and their copies are claimed with
+    a single conditional UPDATE. With `atomic` any failure rolls the whole
+    batch back; otherwise the books that could be borrowed are.
+    """
+    available = dict(db.query(Book.id, Book.available).filter(Book.id.in_(set(book_ids))).all())
+
+    wanted = {}
+    for book_id, count in Counter(book_ids).items():
+        take = count if atomic else min(count, available.get(book_id, 0))
+        if book_id in available and take > 0:
+            wanted[book_id] = take
+    claimed = _claim_copies(db, wanted)
+    granted = {book_id: wanted[book_id] if book_id in claimed else 0 for book_id in available}
+
+    result = BorrowingBatchResult()
+    created = []
+    due_date = due_date_for(borrow_date)
+    for book_id in book_ids:
+        if book_id not in available:
+            result.items.append(BorrowingBatchItem(book_id=book_id, error="Book not found"))
+        elif not granted[book_id]:
+            result.items.append(BorrowingBatchItem(book_id=book_id, error="Book is not available"))
+        else:
+            granted[book_id] -= 1
+            db_borrowing = Borrowing(
+                user_id=user_id,
+                book_id=book_id,
+                borrow_date=borrow_date,
+                due_date=due_date,
+                status=open_status(due_date)
+            )
+            db.add(db_borrowing)
+            created.append(db_borrowing)
+            result.items.append(BorrowingBatchItem(book_id=book_id))
+
+    stats_crud.record_borrows(db, created)
+    return _finish_batch(db, result, created, atomic)
+
+
+def return_borrowings(
+    db: Session,
+    borrowing_ids: List[int],
+    user_id: Optional[int] = None,
+    return_date: Optional[date] = None,
+    atomic: bool = True
+) -> BorrowingBatchResult:
+    """Return several borrowings in one transaction (`user_id` restricts them to one patron).
+
+    The loans are loaded in one query and closed together: one UPDATE for
+    the loans and one for their books' copies. With `atomic` any failure
+    rolls the whole batch back; otherwise the borrowings that could be
+    returned are.
+    """
+    return_date = return_date or date.today()
+    loans = {
+        loan.id: loan
+        for loan in db.query(Borrowing)
+        .filter(Borrowing.id.in_(set(borrowing_ids)))
+        .with_for_update()
+        .populate_existing()
+    }
+    allowed = [
+        loan for loan in loans.values() if user_id is None or loan.user_id == user_id
+    ]
+    closed = set(_close_loans(db, allowed, return_date))
+
+    result = BorrowingBatchResult()
+    returned = []
+    for borrowing_id in borrowing_ids:
+        loan = loans.get(borrowing_id)
+        if loan is None:
+            error = "Borrowing not found"
+        elif user_id is not None and loan.user_id != user_id:
+            error = "Access forbidden"
+        elif loan in returned or loan not in closed:
+            error = "Borrowing is already returned"
+        else:
+            error = None
+            returned.append(loan)
+        result.items.append(BorrowingBatchItem(borrowing_id=borrowing_id, error=error))
+
+    stats_crud.record_returns(db, returned, return_date)
+    return _finish_batch(db, result, returned, atomic)
+
+
+def _finish_batch(
+    db: Session,
+    result: BorrowingBatchResult,
+    changed: List[Borrowing],
+    atomic: bool
+) -> BorrowingBatchResult:
+    """Commit (or, for a failed atomic batch, roll back) and attach the changed borrowings"""
+    result.failed = sum(1 for item in result.items if item.error)
+    if atomic and result.failed:
+        db.rollback()
+        return result
+
+    if changed:
+        _commit_catalog_change(db)
+    else:
+        db.commit()
+
+    # New rows got their ids and created_at from INSERT ... RETURNING; nothing to reload
+    changed_rows = iter(changed)
+    for item in result.items:
+        if not item.error:
+            item.borrowing = BorrowingSchema.model_validate(next(changed_rows))
+    result.succeeded = len(changed)
+    return result
+
+
 def update_borrowing(
     db: Session, 
     borrowing_id: int, 
     borrowing: BorrowingUpdate
 ) -> Optional[Borrowing]:
-    """Update borrowing (return book)"""
-    db_borrowing = get_borrowing(db, borrowing_id)
+    """Update borrowing (return book).
+
+    Raises ValueError when asked to return a loan that is already returned,
+    e.g. by a concurrent request; nothing is changed then.
+    """
+    db_borrowing = get_borrowing(db, borrowing_id, for_update=True)
     if not db_borrowing:
         return None
     
     update_data = borrowing.model_dump(exclude_unset=True)
+    old_return_date = db_borrowing.return_date
+    # Open loans' status follows their due date; only a return is set explicitly
+    new_status = update_data.pop("status", None)
 
-    if "status" in update_data and update_data["status"] == BorrowingStatus.RETURNED:
-        if db_borrowing.status != BorrowingStatus.RETURNED:
-            book = db.query(Book).filter(Book.id == db_borrowing.book_id).first()
-            if book:
-                book.available += 1
+    returned = new_status == BorrowingStatus.RETURNED
+    if returned:
+        if not _close_loan(db, db_borrowing):
+            db.rollback()
+            raise ValueError("Borrowing is already returned")
+        if update_data.get("return_date") is None:
+            update_data["return_date"] = date.today()
+        stats_crud.record_return(db, db_borrowing, update_data["return_date"])
+    elif (
+        db_borrowing.status == BorrowingStatus.RETURNED
+        and update_data.get("return_date", old_return_date) != old_return_date
+    ):
+        # Moving the date of an earlier return moves it between days
+        if old_return_date:
+            stats_crud.record_return(db, db_borrowing, old_return_date, delta=-1)
+        if update_data["return_date"]:
+            stats_crud.record_return(db, db_borrowing, update_data["return_date"])
     
     for key, value in update_data.items():
         setattr(db_borrowing, key, value)
+    if "due_date" in update_data and db_borrowing.status in OPEN_STATUSES:
+        db_borrowing.status = open_status(db_borrowing.due_date)
     
-    db.commit()
-    db.refresh(db_borrowing)
+    if returned:
+        _commit_catalog_change(db)
+    else:
+        db.commit()
     return db_borrowing
 
 
 def delete_borrowing(db: Session, borrowing_id: int) -> bool:
     """Delete borrowing"""
-    db_borrowing = get_borrowing(db, borrowing_id)
+    db_borrowing = get_borrowing(db, borrowing_id, for_update=True)
     if not db_borrowing:
         return False
 
-    if db_borrowing.status == BorrowingStatus.BORROWED:
-        book = db.query(Book).filter(Book.id == db_borrowing.book_id).first()
-        if book:
-            book.available += 1
+    released = _close_loan(db, db_borrowing)
+    if not released and db_borrowing.return_date:
+        stats_crud.record_return(db, db_borrowing, db_borrowing.return_date, delta=-1)
+    stats_crud.record_borrow(db, db_borrowing, delta=-1)
     
     db.delete(db_borrowing)
-    db.commit()
+    if released:
+        _commit_catalog_change(db)
+    else:
+        db.commit()
     return True
+
+
+def mark_overdue(db: Session, today: Optional[date] = None) -> int:
+    """Mark open loans that fell due since the last run as overdue; returns how many were marked.
+
+    The watermark row holds the day of the last run, so a run only visits
+    loans due between then and `today`, by a range seek on the
+    (status, due_date) index. Loans created or renewed with a past due date
+    are marked when written. Runs racing in several workers claim the
+    watermark with a compare-and-set; the losers do nothing.
+    """
+    today = today or date.today()
+    previous = db.execute(
+        select(_overdue_scan.c.due_before).where(_overdue_scan.c.id == OVERDUE_SCAN_ID)
+    ).scalar()
+    if previous is not None and previous >= today:
+        return 0
+
+    claim = update(_overdue_scan).where(_overdue_scan.c.id == OVERDUE_SCAN_ID)
+    claim = claim.where(
+        _overdue_scan.c.due_before.is_(None) if previous is None else _overdue_scan.c.due_before == previous
+    )
+    if not db.execute(claim.values(due_before=today, updated_at=utcnow())).rowcount:
+        db.rollback()
+        return 0
+
+    query = db.query(Borrowing).filter(Borrowing.status == BorrowingStatus.BORROWED, Borrowing.due_date < today)
+    if previous is not None:
+        query = query.filter(Borrowing.due_date >= previous)
+    marked = query.update({Borrowing.status: BorrowingStatus.OVERDUE}, synchronize_session=False)
+    db.commit()
+    return marked
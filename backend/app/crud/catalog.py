@@ -0,0 +1,26 @@
+from sqlalchemy import select, update, Row
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.models.catalog import CatalogState, CATALOG_STATE_ID, utcnow
+
+_state = CatalogState.__table__
+
+
+def get_catalog_state(db: Session) -> Optional[Row]:
+    """Get (version, updated_at) of the catalog with a plain Core query"""
+    return db.execute(
+        select(_state.c.version, _state.c.updated_at).where(_state.c.id == CATALOG_STATE_ID)
+    ).first()
+
+
+def bump_catalog_version(db: Session) -> None:
+    """Mark the catalog as changed; call inside the transaction that changes it.
+
+    The row stays locked until that transaction commits, so call it as the
+    last statement before commit.
+    """
+    db.execute(
+        update(_state)
+        .where(_state.c.id == CATALOG_STATE_ID)
+        .values(version=_state.c.version + 1, updated_at=utcnow())
+    )
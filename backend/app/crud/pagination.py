@@ -0,0 +1,59 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Optional, List, Mapping, Sequence
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Encode sort key values into an opaque cursor token"""
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values],
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> List:
+    """Decode a cursor token back into typed sort key values"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+
+    decoded = []
+    for column, value in zip(columns, values):
+        python_type = column.type.python_type
+        try:
+            if python_type in (date, datetime):
+                value = python_type.fromisoformat(value)
+            elif not isinstance(value, python_type):
+                raise TypeError
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+        decoded.append(value)
+    return decoded
+
+
+def paginate_after(query: Query, columns: Sequence, after: str, limit: int) -> Query:
+    """Order by the sort key and seek past the cursor (empty cursor starts at the beginning)"""
+    query = query.order_by(*columns)
+    if after:
+        values = decode_cursor(after, columns)
+        query = query.filter(tuple_(*columns) > tuple_(*values))
+    return query.limit(limit)
+
+
+def next_cursor(rows: Sequence, columns: Sequence, limit: int) -> Optional[str]:
+    """Cursor for the page after `rows` (objects or dicts), or None when this was the last page"""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    if isinstance(last, Mapping):
+        return encode_cursor([last[column.key] for column in columns])
+    return encode_cursor([getattr(last, column.key) for column in columns])
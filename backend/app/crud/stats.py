@@ -0,0 +1,192 @@
+from sqlalchemy import select, update, insert, delete, func, literal, union_all, or_, Connection, Table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from typing import Iterable, List, Union
+from datetime import date
+from app.models.book import Book
+from app.models.borrowing import Borrowing, BorrowingStatus, OPEN_STATUSES
+from app.models.stats import DailyCirculation, DailyBookStats, DailyUserStats
+from app.schemas.stats import CirculationStats, DailyCount, TopBook
+
+_circulation = DailyCirculation.__table__
+_book_stats = DailyBookStats.__table__
+_user_stats = DailyUserStats.__table__
+
+
+def _add_counts(db: Session, table: Table, rows: List[dict]) -> None:
+    """Add to summary rows, creating them if needed (upsert where the database supports it).
+
+    Each row holds its key columns plus `borrows`/`returns` deltas; all of
+    them go out as one executemany of a single statement.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        upsert = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(table)
+        keys = [column for column in rows[0] if column not in ("borrows", "returns")]
+        db.execute(
+            upsert.on_conflict_do_update(
+                index_elements=keys,
+                set_={
+                    "borrows": table.c.borrows + upsert.excluded.borrows,
+                    "returns": table.c.returns + upsert.excluded.returns
+                }
+            ),
+            rows
+        )
+        return
+
+    for row in rows:
+        condition = [
+            table.c[column] == value for column, value in row.items() if column not in ("borrows", "returns")
+        ]
+        increments = {"borrows": table.c.borrows + row["borrows"], "returns": table.c.returns + row["returns"]}
+        if not db.execute(update(table).where(*condition).values(**increments)).rowcount:
+            db.execute(insert(table).values(**row))
+
+
+def _record(db: Session, events: Iterable[tuple]) -> None:
+    """Add (book_id, user_id, day, borrows, returns) events to the three summary tables.
+
+    Events for the same summary row are added up first, so a batch costs one
+    upsert per table however many borrowings it touched.
+    """
+    totals = ({}, {}, {})
+    for book_id, user_id, day, borrows, returns in events:
+        for counts, key in zip(totals, ((day,), (day, book_id), (day, user_id))):
+            previous = counts.get(key, (0, 0))
+            counts[key] = (previous[0] + borrows, previous[1] + returns)
+
+    # Always the same table and row order, so concurrent transactions lock rows consistently
+    for table, keys, counts in zip(
+        (_circulation, _book_stats, _user_stats),
+        (("day",), ("day", "book_id"), ("day", "user_id")),
+        totals
+    ):
+        if counts:
+            _add_counts(db, table, [
+                {**dict(zip(keys, key)), "borrows": borrows, "returns": returns}
+                for key, (borrows, returns) in sorted(counts.items())
+            ])
+
+
+def record_borrow(db: Session, borrowing: Borrowing, delta: int = 1) -> None:
+    """Count a borrow on its borrow date (delta=-1 when the borrowing is deleted)"""
+    record_borrows(db, [borrowing], delta)
+
+
+def record_borrows(db: Session, borrowings: Iterable[Borrowing], delta: int = 1) -> None:
+    """Count several borrows at once, each on its borrow date"""
+    _record(db, ((b.book_id, b.user_id, b.borrow_date, delta, 0) for b in borrowings))
+
+
+def record_return(db: Session, borrowing: Borrowing, return_date: date, delta: int = 1) -> None:
+    """Count a return on its return date (delta=-1 to take it back)"""
+    record_returns(db, [borrowing], return_date, delta)
+
+
+def record_returns(db: Session, borrowings: Iterable[Borrowing], return_date: date, delta: int = 1) -> None:
+    """Count several returns at once on the same return date"""
+    _record(db, ((b.book_id, b.user_id, return_date, 0, delta) for b in borrowings))
+
+
+def get_circulation_stats(db: Session, date_from: date, date_to: date, top: int = 10) -> CirculationStats:
+    """Library-wide numbers for a date range, read from the summary tables"""
+    daily = [
+        DailyCount(day=row.day, borrows=row.borrows, returns=row.returns)
+        for row in db.execute(
+            select(_circulation.c.day, _circulation.c.borrows, _circulation.c.returns)
+            .where(
+                _circulation.c.day.between(date_from, date_to),
+                # Rows whose events were all deleted again stay behind as zeros
+                or_(_circulation.c.borrows != 0, _circulation.c.returns != 0)
+            )
+            .order_by(_circulation.c.day)
+        )
+    ]
+
+    # Rank by id first and join the few winners to books afterwards
+    borrowed = func.sum(_book_stats.c.borrows).label("borrows")
+    ranked = (
+        select(_book_stats.c.book_id, borrowed)
+        .where(_book_stats.c.day.between(date_from, date_to))
+        .group_by(_book_stats.c.book_id)
+        .having(borrowed > 0)
+        .order_by(borrowed.desc(), _book_stats.c.book_id)
+        .limit(top)
+        .subquery()
+    )
+    top_books = [
+        TopBook(book_id=row.book_id, title=row.title, author=row.author, borrows=row.borrows)
+        for row in db.execute(
+            select(ranked.c.book_id, Book.title, Book.author, ranked.c.borrows)
+            .outerjoin(Book, Book.id == ranked.c.book_id)
+            .order_by(ranked.c.borrows.desc(), ranked.c.book_id)
+        )
+    ]
+
+    active_borrowers = db.execute(
+        select(func.count(func.distinct(_user_stats.c.user_id)))
+        .where(_user_stats.c.day.between(date_from, date_to), _user_stats.c.borrows > 0)
+    ).scalar()
+
+    # Open loans are counted straight from borrowings; the (status, borrow_date) index covers it.
+    # Overdue is as of the overdue job's last run
+    books_out = db.execute(
+        select(func.count()).select_from(Borrowing).where(Borrowing.status.in_(OPEN_STATUSES))
+    ).scalar()
+    books_overdue = db.execute(
+        select(func.count()).select_from(Borrowing).where(Borrowing.status == BorrowingStatus.OVERDUE)
+    ).scalar()
+
+    return CirculationStats(
+        date_from=date_from,
+        date_to=date_to,
+        books_out=books_out,
+        books_overdue=books_overdue,
+        borrows=sum(day.borrows for day in daily),
+        returns=sum(day.returns for day in daily),
+        active_borrowers=active_borrowers,
+        daily=daily,
+        top_books=top_books
+    )
+
+
+def rebuild_stats(db: Session) -> None:
+    """Recompute every summary table from the borrowings table in one transaction"""
+    fill_summaries(db)
+    db.commit()
+
+
+def fill_summaries(connection: Union[Session, Connection]) -> None:
+    """Replace the summary tables' rows with counts from the borrowings table, without committing.
+
+    Takes a session or a plain connection, so migrations can backfill with it.
+    """
+    borrows = select(
+        Borrowing.borrow_date.label("day"),
+        Borrowing.book_id,
+        Borrowing.user_id,
+        literal(1).label("borrows"),
+        literal(0).label("returns")
+    )
+    returns = select(
+        Borrowing.return_date.label("day"),
+        Borrowing.book_id,
+        Borrowing.user_id,
+        literal(0).label("borrows"),
+        literal(1).label("returns")
+    ).where(Borrowing.status == BorrowingStatus.RETURNED, Borrowing.return_date.isnot(None))
+    events = union_all(borrows, returns).subquery()
+
+    for table, keys in (
+        (_circulation, [events.c.day]),
+        (_book_stats, [events.c.day, events.c.book_id]),
+        (_user_stats, [events.c.day, events.c.user_id]),
+    ):
+        connection.execute(delete(table))
+        connection.execute(
+            insert(table).from_select(
+                [key.name for key in keys] + ["borrows", "returns"],
+                select(*keys, func.sum(events.c.borrows), func.sum(events.c.returns)).group_by(*keys)
+            )
+        )
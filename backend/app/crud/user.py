@@ -1,8 +1,15 @@
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Set, Tuple, Union
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
 from app.core.security import get_password_hash
+from app.core.revocation import token_revocations
+from app.crud.pagination import paginate_after
+
+CURSOR_COLUMNS = (User.username, User.id)
+
+# Columns of the User response schema (no password hash), for the fast list endpoint
+ROW_COLUMNS = tuple(getattr(User, name) for name in UserSchema.model_fields)
 
 
 def get_user(db: Session, user_id: int) -> Optional[User]:
@@ -20,14 +27,49 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-    """Get list of users"""
-    return db.query(User).offset(skip).limit(limit).all()
+def get_revoked_users(db: Session) -> List[Tuple[int, int, bool]]:
+    """(id, token_version, is_active) of users whose tokens may have been revoked"""
+    return [
+        tuple(row) for row in
+        db.query(User.id, User.token_version, User.is_active)
+        .filter((User.token_version > 0) | (User.is_active.is_(False)))
+    ]
+
+
+def get_existing_user_ids(db: Session, user_ids: Set[int], chunk_size: int = 500) -> Set[int]:
+    """Which of `user_ids` still exist"""
+    ids = sorted(user_ids)
+    existing = set()
+    for start in range(0, len(ids), chunk_size):
+        existing.update(
+            row.id for row in db.query(User.id).filter(User.id.in_(ids[start:start + chunk_size]))
+        )
+    return existing
+
+
+def get_users(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = None,
+    as_rows: bool = False
+) -> Union[List[User], List[dict]]:
+    """Get list of users (keyset pagination by username when `after` is given).
 
+    `as_rows` selects only ROW_COLUMNS and returns plain dicts.
+    """
+    query = db.query(*ROW_COLUMNS) if as_rows else db.query(User)
+    if after is not None:
+        query = paginate_after(query, CURSOR_COLUMNS, after, limit)
+    else:
+        query = query.offset(skip).limit(limit)
+    return [row._asdict() for row in query] if as_rows else query.all()
 
-def create_user(db: Session, user: UserCreate) -> User:
-    """Create new user"""
-    hashed_password = get_password_hash(user.password)
+
+def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None) -> User:
+    """Create new user (pass `hashed_password` if it was already computed)"""
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -37,12 +79,11 @@ def create_user(db: Session, user: UserCreate) -> User:
     )
     db.add(db_user)
     db.commit()
-    db.refresh(db_user)
     return db_user
 
 
 def update_user(db: Session, user_id: int, user: UserUpdate) -> Optional[User]:
-    """Update user data"""
+    """Update user data; a new password, role or active status revokes the user's tokens"""
     db_user = get_user(db, user_id)
     if not db_user:
         return None
@@ -52,14 +93,28 @@ def update_user(db: Session, user_id: int, user: UserUpdate) -> Optional[User]:
     if "password" in update_data:
         update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
     
+    revoke = "hashed_password" in update_data or any(
+        key in update_data and update_data[key] != getattr(db_user, key) for key in ("role", "is_active")
+    )
+    
     for key, value in update_data.items():
         setattr(db_user, key, value)
+    if revoke:
+        db_user.token_version = User.token_version + 1
     
     db.commit()
-    db.refresh(db_user)
+    if revoke:
+        # The SQL increment left token_version unloaded; this reads back the committed value
+        token_revocations.update(db_user.id, db_user.token_version, db_user.is_active)
     return db_user
 
 
+def set_password_hash(db: Session, db_user: User, hashed_password: str) -> None:
+    """Replace stored password hash (used for transparent rehash on login)"""
+    db.query(User).filter(User.id == db_user.id).update({"hashed_password": hashed_password})
+    db.commit()
+
+
 def delete_user(db: Session, user_id: int) -> bool:
     """Delete user"""
     db_user = get_user(db, user_id)
@@ -68,4 +123,5 @@ def delete_user(db: Session, user_id: int) -> bool:
     
     db.delete(db_user)
     db.commit()
+    token_revocations.delete(user_id)
     return True
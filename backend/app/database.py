@@ -1,22 +1,304 @@
-from sqlalchemy import create_engine
+import itertools
+import time
+import anyio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL, 
-    connect_args={"check_same_thread": False}  # Needed for SQLite
-)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def postgresql_session_settings(replica: bool = False) -> dict:
+    """Server settings applied to every PostgreSQL connection"""
+    server_settings = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        server_settings["statement_timeout"] = str(int(settings.DB_STATEMENT_TIMEOUT_MS))
+    if replica:
+        server_settings["default_transaction_read_only"] = "on"
+    return server_settings
+
+
+def engine_options(url: str, is_async: bool = False, replica: bool = False) -> dict:
+    """Per-dialect keyword arguments for create_engine"""
+    url = make_url(url)
+    options = {}
+
+    if url.get_backend_name() == "postgresql":
+        server_settings = postgresql_session_settings(replica)
+        if server_settings and is_async:
+            options["connect_args"] = {"server_settings": server_settings}
+        elif server_settings:
+            # libpq passes them as command-line options to the server
+            options["connect_args"] = {
+                "options": " ".join(f"-c {name}={value}" for name, value in server_settings.items())
+            }
+
+    if url.get_backend_name() == "sqlite":
+        if not is_async:
+            options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            # In-memory databases use a single-connection pool without sizing options
+            return options
+        if is_async:
+            # aiosqlite defaults to NullPool, which reconnects (and re-runs pragmas) per checkout
+            options["poolclass"] = AsyncAdaptedQueuePool
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    return options
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply performance pragmas to every new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.close()
+
+
+def set_sqlite_query_only(dbapi_connection, connection_record):
+    """Make a replica connection refuse writes, so one routed there by mistake fails loudly"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+def create_database_engine(url: str, replica: bool = False):
+    """Engine with the pool options and SQLite pragmas for `url`"""
+    new_engine = create_engine(url, **engine_options(url, replica=replica))
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine, "connect", set_sqlite_pragmas)
+        if replica:
+            event.listen(new_engine, "connect", set_sqlite_query_only)
+    return new_engine
+
+
+class PrimarySession(Session):
+    """Session on the primary database (see _record_primary_write)"""
+
+
+class Databases:
+    """Engines and session factories for the primary, its read replicas and the async stack"""
+
+    def __init__(self):
+        self.engine = create_database_engine(settings.DATABASE_URL)
+        # Objects keep their state after commit instead of reloading it with a SELECT on
+        # next access: generated keys and server defaults already come back through
+        # INSERT ... RETURNING, and sessions live for one request
+        self.SessionLocal = sessionmaker(
+            autocommit=False, autoflush=False, expire_on_commit=False, bind=self.engine, class_=PrimarySession
+        )
+
+        # Read replicas, taken in turn by read-only endpoints (see get_read_db)
+        self.replica_engines = [
+            create_database_engine(url, replica=True) for url in settings.DATABASE_REPLICA_URLS
+        ]
+        self.ReplicaSessionLocals = [
+            sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=replica)
+            for replica in self.replica_engines
+        ]
+
+        # Request sessions are capped at the pool's capacity. Otherwise threadpool
+        # threads park waiting for a connection while the sessions holding them wait
+        # for a free thread to serialize their response, and the app deadlocks.
+        # Each replica has a pool, and so a cap, of its own.
+        self.session_slots = anyio.Semaphore(settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+        self.replica_slots = [
+            anyio.Semaphore(settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW) for _ in self.replica_engines
+        ]
+
+        self.async_engine = None
+        self.AsyncSessionLocal = None
+        if settings.ASYNC_DB:
+            from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+            async_url = async_database_url(settings.DATABASE_URL)
+            self.async_engine = create_async_engine(async_url, **engine_options(async_url, is_async=True))
+            if self.async_engine.dialect.name == "sqlite":
+                event.listen(self.async_engine.sync_engine, "connect", set_sqlite_pragmas)
+            # Objects must stay readable after commit: lazy refreshes cannot run outside the greenlet
+            self.AsyncSessionLocal = async_sessionmaker(self.async_engine, autoflush=False, expire_on_commit=False)
+
+
+@lru_cache
+def get_databases() -> Databases:
+    """The process's engines, created on first use rather than when this module is imported"""
+    return Databases()
+
+
+def __getattr__(name: str):
+    # `from app.database import engine, SessionLocal` etc. still work; they build the engines then
+    if name in ("engine", "SessionLocal", "replica_engines", "ReplicaSessionLocals", "async_engine", "AsyncSessionLocal"):
+        return getattr(get_databases(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_replica_turn = itertools.count()
+
+
+def sync_engines() -> list:
+    """The primary engine followed by every replica's"""
+    databases = get_databases()
+    return [databases.engine, *databases.replica_engines]
 
 Base = declarative_base()
 
 
-def get_db():
-    """Database session generator"""
-    db = SessionLocal()
+def init_db() -> None:
+    """Create missing tables, the SQLite search index and the catalog and overdue job state rows.
+
+    Only creates what is missing; schema changes to existing databases go
+    through Alembic (`alembic upgrade head`).
+    """
+    import app.models  # noqa: F401  (registers every table on Base.metadata)
+    from app.models.book import create_search_index
+    from app.models.catalog import create_catalog_state
+    from app.models.overdue import create_overdue_scan
+
+    engine = get_databases().engine
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        create_search_index(connection)
+        create_catalog_state(connection)
+        create_overdue_scan(connection)
+
+
+def schema_exists() -> bool:
+    """Whether the database has been bootstrapped (the app's tables exist)"""
+    with get_databases().engine.connect() as connection:
+        return inspect(connection).has_table("users")
+
+
+def prefill_count(pool, count: int) -> int:
+    """How many connections to open up front: at most the pool's steady-state size"""
+    return min(count, pool.size()) if isinstance(pool, QueuePool) else 0
+
+
+def prefill_pool(count: int) -> None:
+    """Open pooled connections (running the SQLite pragmas) before the first request needs them"""
+    for each in sync_engines():
+        connections = [each.connect() for _ in range(prefill_count(each.pool, count))]
+        for connection in connections:
+            connection.close()
+
+
+def _next_replica() -> Optional[int]:
+    replicas = len(get_databases().replica_engines)
+    return next(_replica_turn) % replicas if replicas else None
+
+
+@asynccontextmanager
+async def session_scope(replica: bool = False):
+    """Open a session once a pool slot is free; closes it on a worker thread.
+
+    Closing returns the connection to the pool, which rolls it back: a round
+    trip to the server that must not block the event loop. With `replica`,
+    the session reads from the next read replica in turn (from the primary
+    when there are none).
+    """
+    databases = get_databases()
+    turn = _next_replica() if replica else None
+    if turn is None:
+        factory, slots = databases.SessionLocal, databases.session_slots
+    else:
+        factory, slots = databases.ReplicaSessionLocals[turn], databases.replica_slots[turn]
+    async with slots:
+        db = factory()
+        try:
+            yield db
+        finally:
+            await anyio.to_thread.run_sync(db.close)
+
+
+def read_session() -> Session:
+    """Session on the next read replica (the primary without replicas) for reads outside a request"""
+    databases = get_databases()
+    turn = _next_replica()
+    return databases.SessionLocal() if turn is None else databases.ReplicaSessionLocals[turn]()
+
+
+class PrimaryWrites:
+    """Whether the current request committed on the primary"""
+
+    def __init__(self):
+        self.committed = False
+
+
+# Set per request by app.core.replicas.ReadYourWritesMiddleware; sync endpoints run in
+# a copy of the request's context, so they flag the same object
+primary_writes: ContextVar[Optional[PrimaryWrites]] = ContextVar("primary_writes", default=None)
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _record_primary_write(session) -> None:
+    writes = primary_writes.get()
+    if writes is not None:
+        writes.committed = True
+
+
+# Set by ReadYourWritesMiddleware: until the time it holds, the client's reads skip the replicas
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+
+def reads_own_writes(request: Request) -> bool:
+    """Whether the client committed recently enough that replicas may not have its writes yet"""
     try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_db():
+    """Database session generator"""
+    async with session_scope() as db:
+        yield db
+
+
+async def get_read_db(request: Request):
+    """Session for read-only endpoints: on a replica, unless the client needs to read its own writes"""
+    async with session_scope(replica=not reads_own_writes(request)) as db:
+        yield db
+
+
+def async_database_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its asyncio counterpart"""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)).render_as_string(
+        hide_password=False
+    )
+
+
+async def prefill_async_pool(count: int) -> None:
+    """Async counterpart of prefill_pool (requires ASYNC_DB=true)"""
+    async_engine = get_databases().async_engine
+    connections = [
+        await async_engine.connect() for _ in range(prefill_count(async_engine.sync_engine.pool, count))
+    ]
+    for connection in connections:
+        await connection.close()
+
+
+async def get_async_db():
+    """Async database session generator (requires ASYNC_DB=true)"""
+    async with get_databases().AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
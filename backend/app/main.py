@@ -1,14 +1,19 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from functools import lru_cache
+import anyio
+from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
-from app.api.endpoints import auth, users, books, borrowings
-from app.models import User, Book, Borrowing
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import configure_mappers
+from app.config import get_settings
+from app import database
+from app.core import metrics, sql_debug
+from app.core.overdue import mark_overdue_periodically
+from app.core.replicas import ReadYourWritesMiddleware
+from app.api.endpoints import auth, users, books, borrowings, stats
 
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(
-    title="Library Management System",
-    description="""
+DESCRIPTION = """
     ## Library System for Managing Books and Borrowings
     
     ### Features:
@@ -16,7 +21,7 @@ app = FastAPI(
     * **Authentication** - user registration and login
     * **User Management** - CRUD operations (admin only)
     * **Book Management** - full CRUD for book catalog
-    * **Borrowing Management** - borrow and return books
+    * **Borrowing Management** - borrow and return books, with due dates and overdue tracking
     
     ### User Roles:
     
@@ -34,52 +39,64 @@ app = FastAPI(
     
     On first run, you need to create an admin manually through the database
     or change user role after registration.
-    """,
-    version="1.0.0",
-    contact={
-        "name": "Developer",
-        "email": "admin@library.com",
+    """
+
+OPENAPI_TAGS = [
+    {
+        "name": "Authentication",
+        "description": "Registration and login operations",
     },
-    license_info={
-        "name": "MIT",
+    {
+        "name": "Users",
+        "description": "User management",
     },
-    openapi_tags=[
-        {
-            "name": "Authentication",
-            "description": "Registration and login operations",
-        },
-        {
-            "name": "Users",
-            "description": "User management",
-        },
-        {
-            "name": "Books",
-            "description": "Book catalog management - full CRUD",
-        },
-        {
-            "name": "Borrowings",
-            "description": "Book borrowing management - borrow and return",
-        },
-    ],
-)
+    {
+        "name": "Books",
+        "description": "Book catalog management - full CRUD",
+    },
+    {
+        "name": "Borrowings",
+        "description": "Book borrowing management - borrow and return",
+    },
+    {
+        "name": "Statistics",
+        "description": "Circulation statistics (admin only)",
+    },
+]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Get a worker ready before it accepts requests; release its connections on shutdown"""
+    settings = get_settings()
+    if settings.DB_INIT_ON_STARTUP:
+        await anyio.to_thread.run_sync(database.init_db)
+    elif not await anyio.to_thread.run_sync(database.schema_exists):
+        raise RuntimeError("Database has no tables; run `python bootstrap.py` before starting the app")
+    # Mapper configuration otherwise runs inside the first request to query the ORM (~25ms)
+    await anyio.to_thread.run_sync(configure_mappers)
+    await anyio.to_thread.run_sync(database.prefill_pool, settings.DB_POOL_PREFILL)
+    if database.async_engine is not None:
+        await database.prefill_async_pool(settings.DB_POOL_PREFILL)
+    overdue_check = None
+    if settings.OVERDUE_CHECK_INTERVAL_SECONDS > 0:
+        overdue_check = asyncio.create_task(mark_overdue_periodically(settings.OVERDUE_CHECK_INTERVAL_SECONDS))
+    yield
+    if overdue_check is not None:
+        overdue_check.cancel()
+        with suppress(asyncio.CancelledError):
+            await overdue_check
+    for engine in database.sync_engines():
+        engine.dispose()
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-app.include_router(auth.router)
-app.include_router(users.router)
-app.include_router(books.router)
-app.include_router(borrowings.router)
+router = APIRouter(tags=["Root"])
 
 
-@app.get(
+@router.get(
     "/",
-    tags=["Root"],
     summary="Root endpoint",
     description="API health check"
 )
@@ -92,9 +109,8 @@ def read_root():
     }
 
 
-@app.get(
+@router.get(
     "/health",
-    tags=["Root"],
     summary="Health check",
     description="Check server health"
 )
@@ -103,6 +119,107 @@ def health_check():
     return {"status": "healthy"}
 
 
+metrics_router = APIRouter(tags=["Root"])
+
+
+@metrics_router.get(
+    "/metrics",
+    summary="Metrics",
+    description="Per-route request counts, latency histograms, in-flight requests and SQL statements "
+                "per request, in the Prometheus text format",
+    response_class=PlainTextResponse
+)
+def read_metrics():
+    """Prometheus metrics of this worker process"""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+def create_app() -> FastAPI:
+    """Build the application from the current settings.
+
+    Touches neither the database nor the network; the lifespan does that
+    once the server starts (`uvicorn --factory app.main:create_app`).
+    """
+    settings = get_settings()
+    app = FastAPI(
+        title="Library Management System",
+        description=DESCRIPTION,
+        version="1.0.0",
+        contact={
+            "name": "Developer",
+            "email": "admin@library.com",
+        },
+        license_info={
+            "name": "MIT",
+        },
+        openapi_tags=OPENAPI_TAGS,
+        lifespan=lifespan,
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
+    )
+
+    if settings.DATABASE_REPLICA_URLS:
+        app.add_middleware(ReadYourWritesMiddleware, seconds=settings.READ_YOUR_WRITES_SECONDS)
+
+    if settings.METRICS_ENABLED:
+        for engine in database.sync_engines():
+            metrics.instrument_engine(engine)
+        if database.async_engine is not None:
+            metrics.instrument_engine(database.async_engine.sync_engine)
+        # Added last so it is outermost and times everything, CORS included
+        app.add_middleware(metrics.MetricsMiddleware)
+
+    if settings.SQL_SLOW_QUERY_MS or settings.SQL_N_PLUS_ONE_THRESHOLD or settings.SQL_QUERY_BUDGET:
+        for engine in database.sync_engines():
+            sql_debug.instrument_engine(engine)
+        if database.async_engine is not None:
+            sql_debug.instrument_engine(database.async_engine.sync_engine)
+        app.add_middleware(
+            sql_debug.SQLDebugMiddleware,
+            slow_query_ms=settings.SQL_SLOW_QUERY_MS,
+            n_plus_one_threshold=settings.SQL_N_PLUS_ONE_THRESHOLD,
+            query_budget=settings.SQL_QUERY_BUDGET,
+            raise_on_budget=settings.SQL_QUERY_BUDGET_RAISE
+        )
+
+    if settings.ASYNC_DB:
+        # Registered first so these async read routes take precedence over the sync ones
+        from app.api.endpoints import aio
+
+        app.include_router(aio.books.router)
+        app.include_router(aio.borrowings.router)
+
+    app.include_router(auth.router)
+    app.include_router(users.router)
+    app.include_router(books.router)
+    app.include_router(borrowings.router)
+    app.include_router(stats.router)
+    app.include_router(router)
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics_router)
+    return app
+
+
+@lru_cache
+def get_app() -> FastAPI:
+    return create_app()
+
+
+def __getattr__(name: str):
+    # `uvicorn app.main:app` and `from app.main import app` build the app on first
+    # access, so merely importing this module reads no settings
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(create_app(), host="0.0.0.0", port=8000)
@@ -1,3 +1,6 @@
 from app.models.user import User, UserRole
 from app.models.book import Book
 from app.models.borrowing import Borrowing, BorrowingStatus
+from app.models.catalog import CatalogState
+from app.models.overdue import OverdueScan
+from app.models.stats import DailyCirculation, DailyBookStats, DailyUserStats
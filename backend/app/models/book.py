@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index, MetaData, Table, literal_column, text
+from sqlalchemy.dialects import postgresql  # noqa: F401  (registers to_tsvector before search_document uses it)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.models.catalog import utcnow
 
 
 class Book(Base):
@@ -15,5 +17,72 @@ class Book(Base):
     quantity = Column(Integer, default=1)
     available = Column(Integer, default=1)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set in Python so it has sub-second precision on every backend; used for ETags
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
 
     borrowings = relationship("Borrowing", back_populates="book", cascade="all, delete-orphan")
+
+
+# Full-text search document for PostgreSQL. Queries must use this exact
+# expression so the planner can match it against the GIN index below.
+# Literals are rendered inline so prepared statements still match the index.
+search_config = literal_column("'simple'")
+search_document = func.to_tsvector(
+    search_config,
+    func.coalesce(Book.__table__.c.title, literal_column("''"))
+    .concat(literal_column("' '"))
+    .concat(func.coalesce(Book.__table__.c.author, literal_column("''")))
+)
+
+Index("ix_books_search", search_document, postgresql_using="gin").ddl_if(dialect="postgresql")
+
+# SQLite FTS5 index over title/author. It is an external-content table, so the
+# text lives only in `books`; triggers keep the index in sync on every write.
+books_fts = Table(
+    "books_fts",
+    MetaData(),
+    Column("rowid", Integer),
+    Column("rank"),
+)
+
+_SQLITE_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+        title, author,
+        content='books', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+        INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author) VALUES ('delete', old.id, old.title, old.author);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, author ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author) VALUES ('delete', old.id, old.title, old.author);
+        INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author);
+    END
+    """,
+]
+
+
+def create_search_index(connection) -> None:
+    """Create the SQLite FTS5 index and sync triggers, backfilling existing rows"""
+    if connection.dialect.name != "sqlite":
+        return
+
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'books_fts'")
+    ).first()
+    if exists:
+        return
+
+    for statement in _SQLITE_FTS_DDL:
+        connection.execute(text(statement))
+    connection.execute(text("INSERT INTO books_fts(books_fts) VALUES ('rebuild')"))
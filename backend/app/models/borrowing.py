@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -8,16 +8,32 @@ import enum
 
 class BorrowingStatus(str, enum.Enum):
     BORROWED = "borrowed"
+    OVERDUE = "overdue"
     RETURNED = "returned"
 
 
+# Loans not returned yet; the overdue job moves them from BORROWED to OVERDUE once past due
+OPEN_STATUSES = (BorrowingStatus.BORROWED, BorrowingStatus.OVERDUE)
+
+
 class Borrowing(Base):
     __tablename__ = "borrowings"
+    __table_args__ = (
+        # "My borrowings" and per-user filters; user deletes cascade through user_id
+        Index("ix_borrowings_user_status_date", "user_id", "status", "borrow_date"),
+        # Admin status filter, in keyset (borrow_date) order
+        Index("ix_borrowings_status_date", "status", "borrow_date"),
+        # Open loans per book; book deletes cascade through book_id
+        Index("ix_borrowings_book_status", "book_id", "status"),
+        # Overdue job (borrowed, due in a date range) and the overdue list (overdue, by due date)
+        Index("ix_borrowings_status_due", "status", "due_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     book_id = Column(Integer, ForeignKey("books.id"), nullable=False)
-    borrow_date = Column(Date, nullable=False)
+    borrow_date = Column(Date, nullable=False, index=True)
+    due_date = Column(Date, nullable=True)
     return_date = Column(Date, nullable=True)
     status = Column(String, default=BorrowingStatus.BORROWED)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, DateTime, select
+from app.database import Base
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class CatalogState(Base):
+    """Single-row counter bumped in the same transaction as any catalog change"""
+    __tablename__ = "catalog_state"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+
+
+CATALOG_STATE_ID = 1
+
+
+def create_catalog_state(connection) -> None:
+    """Insert the catalog state row if it does not exist yet"""
+    table = CatalogState.__table__
+    exists = connection.execute(select(table.c.id).where(table.c.id == CATALOG_STATE_ID)).first()
+    if not exists:
+        connection.execute(table.insert().values(id=CATALOG_STATE_ID, version=0, updated_at=utcnow()))
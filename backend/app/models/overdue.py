@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, Date, DateTime, select
+from app.database import Base
+
+
+class OverdueScan(Base):
+    """Single-row watermark of the overdue job: open loans due before `due_before` have been marked"""
+    __tablename__ = "overdue_scan"
+
+    id = Column(Integer, primary_key=True)
+    # NULL until the first run, which then checks every open loan
+    due_before = Column(Date, nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+
+OVERDUE_SCAN_ID = 1
+
+
+def create_overdue_scan(connection) -> None:
+    """Insert the overdue job's watermark row if it does not exist yet"""
+    table = OverdueScan.__table__
+    exists = connection.execute(select(table.c.id).where(table.c.id == OVERDUE_SCAN_ID)).first()
+    if not exists:
+        connection.execute(table.insert().values(id=OVERDUE_SCAN_ID))
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, Date
+from app.database import Base
+
+# Circulation summaries maintained by crud.stats in the same transaction as
+# each borrow/return/delete. Book and user ids are not foreign keys: the
+# history is kept when a book or user is deleted.
+
+
+class DailyCirculation(Base):
+    __tablename__ = "daily_circulation"
+
+    day = Column(Date, primary_key=True)
+    borrows = Column(Integer, nullable=False, default=0)
+    returns = Column(Integer, nullable=False, default=0)
+
+
+class DailyBookStats(Base):
+    __tablename__ = "daily_book_stats"
+
+    day = Column(Date, primary_key=True)
+    book_id = Column(Integer, primary_key=True, index=True)
+    borrows = Column(Integer, nullable=False, default=0)
+    returns = Column(Integer, nullable=False, default=0)
+
+
+class DailyUserStats(Base):
+    __tablename__ = "daily_user_stats"
+
+    day = Column(Date, primary_key=True)
+    user_id = Column(Integer, primary_key=True, index=True)
+    borrows = Column(Integer, nullable=False, default=0)
+    returns = Column(Integer, nullable=False, default=0)
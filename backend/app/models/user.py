@@ -12,6 +12,8 @@ class UserRole(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    # Tokens identify their user by id: SQLite must not hand a deleted user's id to a new one
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True, nullable=False)
@@ -20,6 +22,8 @@ class User(Base):
     full_name = Column(String)
     role = Column(String, default=UserRole.USER)
     is_active = Column(Boolean, default=True)
+    # Bumped to revoke every token issued so far (password, role or active status changed)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     borrowings = relationship("Borrowing", back_populates="user", cascade="all, delete-orphan")
@@ -1,4 +1,13 @@
 from app.schemas.user import User, UserCreate, UserUpdate, UserInDB
-from app.schemas.book import Book, BookCreate, BookUpdate, BookInDB
-from app.schemas.borrowing import Borrowing, BorrowingCreate, BorrowingUpdate, BorrowingWithDetails
-from app.schemas.auth import Token, TokenData, LoginRequest
+from app.schemas.book import Book, BookCreate, BookUpdate, BookInDB, BookImportResult
+from app.schemas.borrowing import (
+    Borrowing,
+    BorrowingCreate,
+    BorrowingUpdate,
+    BorrowingWithDetails,
+    BorrowingBatchCreate,
+    BorrowingBatchReturn,
+    BorrowingBatchResult
+)
+from app.schemas.auth import Token, TokenData, LoginRequest, RefreshRequest
+from app.schemas.stats import CirculationStats, DailyCount, TopBook
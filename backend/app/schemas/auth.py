@@ -5,12 +5,21 @@ from typing import Optional
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
 
 
 class TokenData(BaseModel):
-    username: Optional[str] = None
+    """The caller, as stated by the verified claims of their access token"""
+    id: int
+    username: str
+    role: str
+    token_version: int = 0
 
 
 class LoginRequest(BaseModel):
     username: str
     password: str
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
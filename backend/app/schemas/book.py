@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 
@@ -28,6 +28,7 @@ class BookInDB(BookBase):
     id: int
     available: int
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -35,3 +36,16 @@ class BookInDB(BookBase):
 
 class Book(BookInDB):
     pass
+
+
+class BookImportError(BaseModel):
+    row: int
+    isbn: Optional[str] = None
+    error: str
+
+
+class BookImportResult(BaseModel):
+    created: int = 0
+    skipped: int = 0
+    failed: int = 0
+    errors: List[BookImportError] = []
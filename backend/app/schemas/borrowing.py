@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Optional, List
 from datetime import datetime, date
 from app.models.borrowing import BorrowingStatus
 
@@ -15,12 +15,14 @@ class BorrowingCreate(BorrowingBase):
 
 class BorrowingUpdate(BaseModel):
     return_date: Optional[date] = None
-    status: Optional[BorrowingStatus] = None
+    status: Optional[BorrowingStatus] = Field(None, description="Only 'returned' can be set; open loans become overdue on their own")
+    due_date: Optional[date] = Field(None, description="New due date, e.g. to renew a loan (admin only)")
 
 
 class BorrowingInDB(BorrowingBase):
     id: int
     user_id: int
+    due_date: Optional[date] = None
     return_date: Optional[date] = None
     status: str
     created_at: datetime
@@ -37,4 +39,28 @@ class BorrowingWithDetails(Borrowing):
     user_username: Optional[str] = None
     book_title: Optional[str] = None
     book_author: Optional[str] = None
-    book_isbn: Optional[str] = None
\ No newline at end of file
+    book_isbn: Optional[str] = None
+
+class BorrowingBatchCreate(BaseModel):
+    book_ids: List[int] = Field(..., min_length=1, max_length=100)
+    borrow_date: date
+    atomic: bool = Field(True, description="All-or-nothing: if any book cannot be borrowed, nothing is")
+
+
+class BorrowingBatchReturn(BaseModel):
+    borrowing_ids: List[int] = Field(..., min_length=1, max_length=100)
+    return_date: Optional[date] = None
+    atomic: bool = Field(True, description="All-or-nothing: if any borrowing cannot be returned, nothing is")
+
+
+class BorrowingBatchItem(BaseModel):
+    book_id: Optional[int] = None
+    borrowing_id: Optional[int] = None
+    borrowing: Optional[Borrowing] = None
+    error: Optional[str] = None
+
+
+class BorrowingBatchResult(BaseModel):
+    succeeded: int = 0
+    failed: int = 0
+    items: List[BorrowingBatchItem] = []
@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+
+
+class DailyCount(BaseModel):
+    day: date
+    borrows: int
+    returns: int
+
+
+class TopBook(BaseModel):
+    book_id: int
+    title: Optional[str] = None
+    author: Optional[str] = None
+    borrows: int
+
+
+class CirculationStats(BaseModel):
+    date_from: date
+    date_to: date
+    books_out: int
+    books_overdue: int
+    borrows: int
+    returns: int
+    active_borrowers: int
+    daily: List[DailyCount]
+    top_books: List[TopBook]
@@ -19,6 +19,7 @@ class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     full_name: Optional[str] = None
     password: Optional[str] = Field(None, min_length=6)
+    role: Optional[UserRole] = None
     is_active: Optional[bool] = None
 
 
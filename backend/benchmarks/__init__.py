@@ -0,0 +1,4 @@
+"""
+Performance benchmarks for the library backend
+Usage: python -m benchmarks.<name> --help
+"""
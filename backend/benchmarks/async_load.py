@@ -0,0 +1,99 @@
+"""
+Compare requests/sec and tail latency of the sync and async database stacks
+Usage: python -m benchmarks.async_load [--clients 200] [--seconds 5]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+from benchmarks.common import configure_database, report
+
+
+async def client_loop(client, headers, seconds: float, samples: list, errors: list) -> None:
+    """Alternate catalog and my-borrowings reads until the deadline"""
+    deadline = time.perf_counter() + seconds
+    paths = ["/books/?limit=20", "/borrowings/my?limit=20"]
+    i = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get(paths[i % 2], headers=headers)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+        samples.append(time.perf_counter() - start)
+        i += 1
+
+
+async def run_mode(args) -> None:
+    import httpx
+    from app.main import app
+    from app.config import settings
+    from app.database import SessionLocal
+    from app.core.security import create_access_token, token_claims
+    from app.crud import book as book_crud, borrowing as borrowing_crud
+    from app.models.user import User
+    from app.schemas.book import BookCreate
+    from app.schemas.borrowing import BorrowingCreate
+
+    db = SessionLocal()
+    try:
+        user = User(username="load", email="load@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        for i in range(200):
+            book = book_crud.create_book(db, BookCreate(title=f"Book {i}", author="Author", quantity=2))
+            if i < 20:
+                borrowing_crud.create_borrowing(
+                    db, BorrowingCreate(book_id=book.id, borrow_date=date.today() - timedelta(days=i)),
+                    user_id=user.id
+                )
+        headers = {"Authorization": f"Bearer {create_access_token(token_claims(user))}"}
+    finally:
+        db.close()
+
+    samples, errors = [], []
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(client_loop(client, headers, args.seconds, samples, errors) for _ in range(args.clients))
+        )
+        elapsed = time.perf_counter() - started
+
+    label = "async (AsyncSession)" if settings.ASYNC_DB else "sync (threadpool)"
+    print(f"   {label}: {len(samples) / elapsed:.0f} req/s, {len(errors)} errors")
+    report(label, samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--mode", choices=["sync", "async"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        os.environ["ASYNC_DB"] = "true" if args.mode == "async" else "false"
+        configure_database()
+        from app.database import init_db
+
+        init_db()
+        asyncio.run(run_mode(args))
+        return
+
+    # Settings are read at import time, so each stack runs in a fresh interpreter
+    print(f"{args.clients} concurrent clients for {args.seconds}s:")
+    for mode in ("sync", "async"):
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.async_load", "--mode", mode,
+             "--clients", str(args.clients), "--seconds", str(args.seconds)],
+            check=True
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Desk throughput: checking out and returning a stack of books per-item vs with the batch endpoints
+Usage: python -m benchmarks.batch_borrow [--desks 8] [--stack 5] [--seconds 5]
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from benchmarks.common import configure_database, report
+
+
+async def per_item_visit(client, headers, book_ids) -> None:
+    today = date.today().isoformat()
+    borrowing_ids = []
+    for book_id in book_ids:
+        response = await client.post("/borrowings/", json={"book_id": book_id, "borrow_date": today}, headers=headers)
+        assert response.status_code == 201, response.text
+        borrowing_ids.append(response.json()["id"])
+    for borrowing_id in borrowing_ids:
+        response = await client.put(f"/borrowings/{borrowing_id}", json={"status": "returned"}, headers=headers)
+        assert response.status_code == 200, response.text
+
+
+async def batch_visit(client, headers, book_ids) -> None:
+    response = await client.post(
+        "/borrowings/batch", json={"book_ids": book_ids, "borrow_date": date.today().isoformat()}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    borrowing_ids = [item["borrowing"]["id"] for item in response.json()["items"]]
+    response = await client.post("/borrowings/batch/return", json={"borrowing_ids": borrowing_ids}, headers=headers)
+    assert response.status_code == 200, response.text
+
+
+async def run(args) -> None:
+    import httpx
+    from app.main import app
+    from app.database import SessionLocal
+    from app.core.security import create_access_token, token_claims
+    from app.crud import book as book_crud
+    from app.models.user import User
+    from app.schemas.book import BookCreate
+
+    db = SessionLocal()
+    try:
+        desks = []
+        for desk in range(args.desks):
+            user = User(username=f"desk{desk}", email=f"desk{desk}@example.com", hashed_password="x")
+            db.add(user)
+            db.commit()
+            # Each desk circulates its own titles, so the comparison measures request overhead, not contention
+            book_ids = [
+                book_crud.create_book(db, BookCreate(title=f"Desk {desk} book {i}", author="Author", quantity=1)).id
+                for i in range(args.stack)
+            ]
+            desks.append(({"Authorization": f"Bearer {create_access_token(token_claims(user))}"}, book_ids))
+    finally:
+        db.close()
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=True)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, visit in (("per-item", per_item_visit), ("batch", batch_visit)):
+            samples = []
+            deadline = time.perf_counter() + args.seconds
+
+            async def desk_loop(headers, book_ids):
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    await visit(client, headers, book_ids)
+                    samples.append(time.perf_counter() - start)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(desk_loop(headers, book_ids) for headers, book_ids in desks))
+            elapsed = time.perf_counter() - started
+            print(f"   {label:<9} {len(samples) / elapsed:7.1f} visits/s "
+                  f"({len(samples) * args.stack / elapsed:7.1f} books checked out and back in per second)")
+            report(f"{label} visit latency", samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--desks", type=int, default=8)
+    parser.add_argument("--stack", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    configure_database()
+    from app.database import init_db
+
+    init_db()
+    print(f"{args.desks} desks, {args.stack} books per visit, {args.seconds}s per mode:")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
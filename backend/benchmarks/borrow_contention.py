@@ -0,0 +1,128 @@
+"""
+Stress borrow/return on a single popular title from many threads
+Usage: python -m benchmarks.borrow_contention [--threads 16] [--copies 50] [--seconds 5]
+"""
+
+import argparse
+import threading
+import time
+from datetime import date
+
+from benchmarks.common import configure_database
+
+
+def run_threads(count: int, target) -> None:
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--copies", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    configure_database()
+
+    from app.database import SessionLocal, engine, Base
+    from app.crud import book as book_crud, borrowing as borrowing_crud
+    from app.models.book import Book
+    from app.models.user import User
+    from app.schemas.book import BookCreate
+    from app.schemas.borrowing import BorrowingCreate, BorrowingUpdate
+    from app.models.borrowing import BorrowingStatus
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(username="bench", email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    book_id = book_crud.create_book(
+        db, BookCreate(title="Popular Title", author="Author", quantity=args.copies)
+    ).id
+    db.close()
+
+    request = BorrowingCreate(book_id=book_id, borrow_date=date.today())
+    lock = threading.Lock()
+
+    # Phase 1: everyone races for the copies; exactly `copies` borrows may succeed
+    attempts_per_thread = args.copies // args.threads + 5
+    results = {"ok": 0, "rejected": 0, "errors": 0}
+
+    def race():
+        session = SessionLocal()
+        try:
+            for _ in range(attempts_per_thread):
+                try:
+                    ok = borrowing_crud.create_borrowing(session, request, user_id=user_id)
+                except Exception:
+                    session.rollback()
+                    key = "errors"
+                else:
+                    key = "ok" if ok else "rejected"
+                with lock:
+                    results[key] += 1
+        finally:
+            session.close()
+
+    run_threads(args.threads, race)
+
+    db = SessionLocal()
+    available = db.query(Book.available).filter(Book.id == book_id).scalar()
+    db.close()
+    print(f"Race for {args.copies} copies with {args.threads} threads:")
+    print(f"   succeeded={results['ok']} rejected={results['rejected']} errors={results['errors']}")
+    print(f"   available after race: {available}")
+    assert results["ok"] == args.copies and available == 0, "oversold or lost copies!"
+
+    # Phase 2: borrow/return throughput under contention
+    db = SessionLocal()
+    for borrowing in borrowing_crud.get_borrowings(db, limit=args.copies, user_id=user_id):
+        borrowing_crud.update_borrowing(
+            db, borrowing.id, BorrowingUpdate(status=BorrowingStatus.RETURNED, return_date=date.today())
+        )
+    db.close()
+
+    counts = {"cycles": 0, "rejected": 0, "errors": 0}
+    deadline = time.perf_counter() + args.seconds
+
+    def churn():
+        session = SessionLocal()
+        try:
+            while time.perf_counter() < deadline:
+                try:
+                    borrowing = borrowing_crud.create_borrowing(session, request, user_id=user_id)
+                    if borrowing is None:
+                        key = "rejected"
+                    else:
+                        borrowing_crud.update_borrowing(
+                            session, borrowing.id, BorrowingUpdate(status=BorrowingStatus.RETURNED)
+                        )
+                        key = "cycles"
+                except Exception:
+                    session.rollback()
+                    key = "errors"
+                with lock:
+                    counts[key] += 1
+        finally:
+            session.close()
+
+    run_threads(args.threads, churn)
+
+    db = SessionLocal()
+    available = db.query(Book.available).filter(Book.id == book_id).scalar()
+    db.close()
+    print(f"\nBorrow+return churn for {args.seconds}s:")
+    print(f"   cycles={counts['cycles']} ({counts['cycles'] / args.seconds:.0f}/s) "
+          f"rejected={counts['rejected']} errors={counts['errors']}")
+    print(f"   available after churn: {available} (expected {args.copies})")
+    assert available == args.copies, "availability drifted!"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Cold start of a multi-worker deployment: import time, time until every worker is ready, first requests
+Usage: python -m benchmarks.cold_start [--workers 4] [--repeat 3]
+
+Each configuration starts `uvicorn --workers N` from scratch, waits for
+every worker to log "Application startup complete" (or "failed"), then
+times the first catalog requests. The last configuration has each worker
+create the schema on a fresh database (DB_INIT_ON_STARTUP), as the app did
+at import before bootstrap.py existed, to show the workers racing on DDL.
+"""
+
+import argparse
+import os
+import queue
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.common import configure_database
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_time(env: dict) -> float:
+    """Seconds to import app.main in a fresh interpreter"""
+    code = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+    child = subprocess.run(
+        [sys.executable, "-c", code], env=env, cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    )
+    return float(child.stdout.splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def boot(env: dict, workers: int, timeout: float = 120) -> dict:
+    """Start uvicorn, wait for every worker's startup, time the first requests, stop it"""
+    import httpx
+
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers)],
+        env=env, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    lines = queue.Queue()
+    threading.Thread(target=lambda: [lines.put(line) for line in server.stderr], daemon=True).start()
+
+    ready = failed = 0
+    errors = []
+    try:
+        while ready + failed < workers and time.perf_counter() - started < timeout:
+            try:
+                line = lines.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if "Application startup complete" in line:
+                ready += 1
+            elif "Application startup failed" in line:
+                failed += 1
+            elif "Error" in line and not line.startswith(" "):
+                errors.append(line.strip())
+        all_ready = time.perf_counter() - started
+
+        first_requests = []
+        if ready:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+                for _ in range(workers * 2):
+                    request_started = time.perf_counter()
+                    client.get("/books/", params={"limit": 20})
+                    first_requests.append((time.perf_counter() - request_started) * 1000)
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        "ready": ready,
+        "failed": failed,
+        "seconds": all_ready,
+        "first_requests_ms": first_requests,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = configure_database()
+    from benchmarks.datagen import generate
+    from bootstrap import bootstrap
+
+    bootstrap()
+    generate(users=1000, books=10000, borrowings=50000)
+
+    env = dict(os.environ)
+    imports = [import_time(env) for _ in range(args.repeat)]
+    print(f"import app.main: median {statistics.median(imports):.2f}s of {args.repeat} (no database access)")
+
+    fresh = os.path.join(os.path.dirname(path), "fresh-{}.db")
+    configurations = {
+        "bootstrapped, no prefill": lambda i: {"DB_POOL_PREFILL": "0"},
+        "bootstrapped, prefill 4": lambda i: {"DB_POOL_PREFILL": "4"},
+        "fresh db, init on startup": lambda i: {
+            "DB_INIT_ON_STARTUP": "true", "DATABASE_URL": f"sqlite:///{fresh.format(i)}"
+        },
+    }
+    print(f"{args.workers} workers, {args.repeat} boots each:")
+    for name, overrides in configurations.items():
+        boots = [boot({**env, **overrides(i)}, args.workers) for i in range(args.repeat)]
+        seconds = statistics.median(b["seconds"] for b in boots)
+        firsts = [b["first_requests_ms"][0] for b in boots if b["first_requests_ms"]]
+        laters = [ms for b in boots for ms in b["first_requests_ms"][1:]]
+        failed = sum(b["failed"] for b in boots)
+        print(
+            f"   {name:<28} all workers ready {seconds:5.2f}s   "
+            f"first request {statistics.median(firsts) if firsts else float('nan'):6.1f}ms   "
+            f"next {statistics.median(laters) if laters else float('nan'):6.1f}ms   "
+            f"{failed}/{args.workers * args.repeat} workers failed to start"
+        )
+        for error in sorted({e for b in boots for e in b["errors"]})[:3]:
+            print(f"   {'':<28} {error[:120]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Shared helpers for benchmark scripts
+"""
+
+import os
+import statistics
+import tempfile
+import time
+
+
+def configure_database(path: str = None) -> str:
+    """Point the app at a SQLite file (a scratch one by default) or a database URL; must run before importing app"""
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="nextread-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = path if "://" in path else f"sqlite:///{path}"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-not-for-production")
+    return path
+
+
+def auth_headers(username: str) -> dict:
+    """Bearer header with an access token for an existing user, as /auth/login would issue"""
+    from app.database import SessionLocal
+    from app.core.security import create_access_token, token_claims
+    from app.crud import user as user_crud
+
+    with SessionLocal() as db:
+        user = user_crud.get_user_by_username(db, username)
+        return {"Authorization": f"Bearer {create_access_token(token_claims(user))}"}
+
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def timed(func, *args, **kwargs):
+    """Run func and return (elapsed seconds, result)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def summarize(samples) -> dict:
+    """Count, mean and percentiles of latency samples, in milliseconds"""
+    ms = [s * 1000 for s in samples]
+    return {
+        "n": len(ms),
+        "mean": statistics.mean(ms),
+        "p50": percentile(ms, 50),
+        "p95": percentile(ms, 95),
+        "p99": percentile(ms, 99),
+    }
+
+
+def report(label: str, samples) -> None:
+    """Print latency summary in milliseconds"""
+    summary = summarize(samples)
+    print(
+        f"   {label:<28} n={summary['n']:<6} mean={summary['mean']:8.2f}ms "
+        f"p50={summary['p50']:8.2f}ms p95={summary['p95']:8.2f}ms "
+        f"p99={summary['p99']:8.2f}ms"
+    )
@@ -0,0 +1,252 @@
+"""
+Generate a production-scale synthetic library: users, a catalog and a borrowing history
+Usage: python -m benchmarks.datagen [--users 100000] [--books 200000] [--borrowings 2000000] [--database PATH|URL]
+
+Rows go in as executemany batches of plain dicts, one transaction per chunk,
+so millions of borrowings take seconds rather than hours. Borrowings are
+skewed toward popular titles (Zipf) and active readers, open loans never
+exceed a book's copies, and `available` and the statistics tables are
+brought in line afterwards.
+
+Users are reader0..readerN-1 (reader0 is an admin), all with the password
+DEFAULT_PASSWORD, so scenarios can log in as anyone. Run the API against the
+result with DATABASE_URL=sqlite:///PATH. --database also takes the URL of an
+empty PostgreSQL database.
+"""
+
+import argparse
+import os
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from itertools import accumulate
+
+from benchmarks.common import configure_database
+
+DEFAULT_PASSWORD = "benchmark-password"
+
+SYLLABLES = "ka lo mi ren tor al vey sun dra bel quin ost mar eth lin gar zo pha wen dil".split()
+WORDS = sorted({a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES[:8]})
+NAMES = (
+    "Harper Orwell Austen Fitzgerald Rowling Salinger Tolkien Shelley Bronte "
+    "Dickens Tolstoy Kafka Woolf Hemingway Steinbeck Atwood Morrison Ishiguro"
+).split()
+
+
+def zipf_weights(count: int, skew: float) -> list:
+    """Cumulative Zipf weights for ranks 1..count, for random.choices(cum_weights=...)"""
+    return list(accumulate(1 / rank ** skew for rank in range(1, count + 1)))
+
+
+def chunks(count: int, chunk_size: int):
+    """(start, stop) ranges covering 0..count"""
+    for start in range(0, count, chunk_size):
+        yield start, min(start + chunk_size, count)
+
+
+@contextmanager
+def without_indexes(engine, table):
+    """Drop a table's secondary indexes for a bulk load and build each once afterwards"""
+    with engine.begin() as conn:
+        for index in table.indexes:
+            index.drop(conn)
+    yield
+    with engine.begin() as conn:
+        for index in table.indexes:
+            index.create(conn)
+
+
+@contextmanager
+def without_search_index(engine):
+    """Drop the SQLite full-text index and its triggers for a bulk load, then rebuild it in one pass"""
+    from sqlalchemy import text
+    from app.models.book import create_search_index
+
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            for trigger in ("books_fts_ai", "books_fts_ad", "books_fts_au"):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+            conn.execute(text("DROP TABLE IF EXISTS books_fts"))
+    yield
+    with engine.begin() as conn:
+        create_search_index(conn)
+
+
+def generate_users(engine, count: int, rng: random.Random, chunk_size: int = 50000) -> None:
+    """Bulk insert reader0..reader{count-1}; every user shares one password hash"""
+    from app.core.security import get_password_hash
+    from app.models.user import User
+
+    hashed_password = get_password_hash(DEFAULT_PASSWORD)
+    for start, stop in chunks(count, chunk_size):
+        with engine.begin() as conn:
+            conn.execute(User.__table__.insert(), [
+                {
+                    "username": f"reader{i}",
+                    "email": f"reader{i}@example.com",
+                    "hashed_password": hashed_password,
+                    "full_name": f"{rng.choice(NAMES)} {rng.choice(NAMES)}",
+                    "role": "admin" if i == 0 else "user",
+                    "is_active": True,
+                }
+                for i in range(start, stop)
+            ])
+
+
+def generate_books(engine, count: int, rng: random.Random, chunk_size: int = 50000) -> list:
+    """Bulk insert a catalog of made-up titles; returns each book's quantity (index = id - 1)"""
+    from app.models.book import Book
+
+    quantities = []
+    for start, stop in chunks(count, chunk_size):
+        rows = []
+        for i in range(start, stop):
+            quantity = rng.choice((1, 1, 2, 3, 5))
+            quantities.append(quantity)
+            rows.append({
+                "title": " ".join(
+                    WORDS[min(int(rng.paretovariate(1.2)) - 1, len(WORDS) - 1)]
+                    if rng.random() < 0.3 else rng.choice(WORDS)
+                    for _ in range(rng.randint(2, 5))
+                ).title(),
+                "author": f"{rng.choice(NAMES)} {rng.choice(NAMES)}",
+                "isbn": f"bench-{i}",
+                "published_year": rng.randint(1800, 2024),
+                "quantity": quantity,
+                "available": quantity,
+            })
+        with engine.begin() as conn:
+            conn.execute(Book.__table__.insert(), rows)
+    return quantities
+
+
+def generate_borrowings(
+    engine,
+    count: int,
+    users: int,
+    quantities: list,
+    rng: random.Random,
+    days: int = 3650,
+    skew: float = 1.1,
+    chunk_size: int = 50000
+) -> None:
+    """Bulk insert a borrowing history ending today, skewed toward popular books and readers.
+
+    Loans older than the loan period are returned; recent ones stay open
+    while the book has copies left, overdue once past their due date.
+    `available` is updated to match.
+    """
+    from sqlalchemy import bindparam
+    from app.config import settings
+    from app.models.book import Book
+    from app.models.borrowing import Borrowing
+
+    # Popularity rank -> id, shuffled so popular titles are spread over the catalog
+    book_ids = list(range(1, len(quantities) + 1))
+    rng.shuffle(book_ids)
+    book_weights = zipf_weights(len(book_ids), skew)
+    user_ids = list(range(1, users + 1))
+    rng.shuffle(user_ids)
+    user_weights = zipf_weights(len(user_ids), skew / 2)
+
+    today = date.today()
+    first_day = today - timedelta(days=days)
+    open_loans = {}
+    for start, stop in chunks(count, chunk_size):
+        size = stop - start
+        picked_books = rng.choices(book_ids, cum_weights=book_weights, k=size)
+        picked_users = rng.choices(user_ids, cum_weights=user_weights, k=size)
+        rows = []
+        for book_id, user_id in zip(picked_books, picked_users):
+            borrowed = first_day + timedelta(days=rng.randrange(days + 1))
+            due = borrowed + timedelta(days=settings.LOAN_PERIOD_DAYS)
+            returned = borrowed + timedelta(days=rng.randint(1, 30))
+            is_open = (returned > today or rng.random() < 0.01) and open_loans.get(book_id, 0) < quantities[book_id - 1]
+            if is_open:
+                open_loans[book_id] = open_loans.get(book_id, 0) + 1
+            rows.append({
+                "user_id": user_id,
+                "book_id": book_id,
+                "borrow_date": borrowed,
+                "due_date": due,
+                "return_date": None if is_open else min(returned, today),
+                "status": ("overdue" if due < today else "borrowed") if is_open else "returned",
+            })
+        with engine.begin() as conn:
+            conn.execute(Borrowing.__table__.insert(), rows)
+
+    with engine.begin() as conn:
+        table = Book.__table__
+        conn.execute(
+            table.update()
+            .where(table.c.id == bindparam("book_id"))
+            .values(available=table.c.quantity - bindparam("open_loans")),
+            [{"book_id": book_id, "open_loans": loans} for book_id, loans in open_loans.items()]
+        )
+
+
+def generate(
+    users: int,
+    books: int,
+    borrowings: int,
+    seed: int = 42,
+    skew: float = 1.1,
+    days: int = 3650
+) -> None:
+    """Fill an empty database (already initialised with init_db) with a synthetic library"""
+    from sqlalchemy import select, func, text
+    from app.database import SessionLocal, engine
+    from app.crud import stats as stats_crud
+    from app.models.book import Book
+    from app.models.borrowing import Borrowing
+    from app.models.user import User
+
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(User)).scalar():
+            raise SystemExit("datagen needs an empty database")
+
+    rng = random.Random(seed)
+    with without_indexes(engine, User.__table__):
+        generate_users(engine, users, rng)
+    with without_indexes(engine, Book.__table__), without_search_index(engine):
+        quantities = generate_books(engine, books, rng)
+    with without_indexes(engine, Borrowing.__table__):
+        generate_borrowings(engine, borrowings, users, quantities, rng, days=days, skew=skew)
+
+    db = SessionLocal()
+    try:
+        stats_crud.rebuild_stats(db)
+    finally:
+        db.close()
+    # Fresh planner statistics, as a long-running database would have
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--books", type=int, default=200_000)
+    parser.add_argument("--borrowings", type=int, default=2_000_000)
+    parser.add_argument("--days", type=int, default=3650, help="length of the borrowing history")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of book popularity")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database", help="SQLite file to create (default: a scratch file), or a database URL")
+    args = parser.parse_args()
+
+    path = configure_database(args.database)
+    from app.database import init_db
+
+    init_db()
+    started = time.perf_counter()
+    generate(args.users, args.books, args.borrowings, seed=args.seed, skew=args.skew, days=args.days)
+    elapsed = time.perf_counter() - started
+    total = args.users + args.books + args.borrowings
+    print(f"Generated {args.users} users, {args.books} books, {args.borrowings} borrowings "
+          f"in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    print(f"   DATABASE_URL={os.environ['DATABASE_URL']}")
+
+
+if __name__ == "__main__":
+    main()
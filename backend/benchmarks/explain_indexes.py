@@ -0,0 +1,122 @@
+"""
+Check with EXPLAIN QUERY PLAN that every borrowings list query is served by an index (SQLite)
+Usage: python -m benchmarks.explain_indexes [--rows 50000]
+
+Covers the overdue list and the overdue job's updates too. Exits with
+status 1 if any query scans the borrowings table without an index.
+tests/test_indexes.py runs the same cases on a small dataset.
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from benchmarks.common import configure_database
+
+
+def capture_statements(engine, action) -> list:
+    """Run action and return the (statement, parameters) it sent to the database"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        action()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def query_cases(db, user_id: int, book_id: int) -> dict:
+    """Every borrowings list/filter/export/cascade query, by name, as a callable running it"""
+    from app.crud import borrowing as borrowing_crud
+    from app.models.book import Book
+    from app.models.user import User
+
+    return {
+        "admin list, keyset": lambda: borrowing_crud.get_borrowings(db, after="", limit=50, as_rows=True),
+        "admin list, status filter": lambda: borrowing_crud.get_borrowings(
+            db, status="borrowed", limit=50, as_rows=True
+        ),
+        "admin list, status filter, keyset": lambda: borrowing_crud.get_borrowings(
+            db, status="borrowed", after="", limit=50, as_rows=True
+        ),
+        "user list": lambda: borrowing_crud.get_borrowings(db, user_id=user_id, limit=50, as_rows=True),
+        "user list, status filter": lambda: borrowing_crud.get_borrowings(
+            db, user_id=user_id, status="borrowed", limit=50, as_rows=True
+        ),
+        "my borrowings, keyset with details": lambda: borrowing_crud.get_borrowings(
+            db, user_id=user_id, after="", limit=50, with_details=True, as_rows=True
+        ),
+        "export, date range": lambda: borrowing_crud.export_borrowings(
+            db, date_from=date(2020, 1, 1), date_to=date(2020, 3, 31)
+        ).close(),
+        "overdue list": lambda: borrowing_crud.get_overdue_borrowings(db, limit=50),
+        "overdue list, keyset": lambda: borrowing_crud.get_overdue_borrowings(db, after="", limit=50),
+        "overdue job, first run": lambda: borrowing_crud.mark_overdue(db),
+        "overdue job, next day": lambda: borrowing_crud.mark_overdue(db, today=date.today() + timedelta(days=1)),
+        "book delete cascade": lambda: db.get(Book, book_id).borrowings,
+        "user delete cascade": lambda: db.get(User, user_id).borrowings,
+    }
+
+
+def borrowings_plans(db, engine, action) -> list:
+    """(statement, EXPLAIN QUERY PLAN steps) of each borrowings query `action` runs"""
+    db.expunge_all()
+    statements = [
+        (statement, parameters)
+        for statement, parameters in capture_statements(engine, action)
+        if "FROM borrowings" in statement or statement.startswith("UPDATE borrowings")
+    ]
+    return [
+        (statement, [row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)])
+        for statement, parameters in statements
+    ]
+
+
+def full_scans(plan: list) -> list:
+    """Steps of a plan that scan the borrowings table without an index"""
+    return [step for step in plan if step.startswith("SCAN borrowings") and "INDEX" not in step]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    configure_database()
+
+    from app.database import SessionLocal, engine, init_db
+    from benchmarks.datagen import generate
+
+    init_db()
+    generate(users=1000, books=10000, borrowings=args.rows)
+
+    db = SessionLocal()
+    failures = []
+    for name, action in query_cases(db, user_id=7, book_id=42).items():
+        plans = borrowings_plans(db, engine, action)
+        for statement, plan in plans:
+            failed = full_scans(plan)
+            print(f"{'FAIL' if failed else 'ok  '} {name}")
+            for step in plan:
+                print(f"       {step}")
+            if failed:
+                failures.append(name)
+        if not plans:
+            print(f"FAIL {name}: no borrowings query was issued")
+            failures.append(name)
+    db.close()
+
+    if failures:
+        print(f"\n{len(failures)} quer{'y' if len(failures) == 1 else 'ies'} without an index: {', '.join(failures)}")
+        sys.exit(1)
+    print("\nAll borrowings list queries use an index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Stream a large borrowing history through the export endpoint vs paging the list endpoint
+Usage: python -m benchmarks.export [--rows 2000000] [--paged-rows 50000]
+
+Peak RSS includes SQLite's memory-mapped pages and page cache; run with
+SQLITE_MMAP_SIZE=0 SQLITE_CACHE_SIZE=-2000 to see the Python-side footprint alone.
+"""
+
+import argparse
+import asyncio
+import resource
+import time
+
+from benchmarks.common import auth_headers, configure_database
+from benchmarks.datagen import generate
+
+
+def max_rss_mb() -> float:
+    """Peak resident set size of this process (Linux reports KiB)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def drain(app, path: str, headers: dict) -> tuple:
+    """Call the ASGI app directly and discard the body as it arrives (no client-side buffering)"""
+    raw_path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": raw_path, "raw_path": raw_path.encode(), "query_string": query.encode(),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("bench", 1), "server": ("bench", 80), "root_path": "",
+    }
+    stats = {"status": None, "bytes": 0, "lines": 0, "headers": {}}
+    requested = asyncio.Event()
+
+    async def receive():
+        # Deliver the empty request body once, then never report a disconnect
+        if requested.is_set():
+            await asyncio.Event().wait()
+        requested.set()
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            stats["status"] = message["status"]
+            stats["headers"] = {k.decode(): v.decode() for k, v in message["headers"]}
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            stats["bytes"] += len(body)
+            stats["lines"] += body.count(b"\n")
+
+    await app(scope, receive, send)
+    return stats
+
+
+async def run(args) -> None:
+    from app.main import app
+
+    headers = auth_headers("reader0")
+    rss_before = max_rss_mb()
+
+    for format in ("csv", "ndjson"):
+        started = time.perf_counter()
+        stats = await drain(app, f"/borrowings/export?format={format}", headers)
+        elapsed = time.perf_counter() - started
+        assert stats["status"] == 200, stats
+        rows = stats["lines"] - (1 if format == "csv" else 0)
+        print(f"   export {format:<7} {rows} rows, {stats['bytes'] / 1e6:.0f} MB in {elapsed:.1f}s "
+              f"({rows / elapsed:,.0f} rows/s), peak RSS +{max_rss_mb() - rss_before:.0f} MB")
+
+    # The old way: keyset-page the JSON list endpoint 100 rows at a time
+    fetched, pages, cursor = 0, 0, ""
+    started = time.perf_counter()
+    while fetched < args.paged_rows:
+        stats = await drain(app, f"/borrowings/?limit=100&after={cursor}", headers)
+        assert stats["status"] == 200, stats
+        fetched += 100
+        pages += 1
+        cursor = stats["headers"].get("x-next-cursor")
+        if not cursor:
+            break
+    elapsed = time.perf_counter() - started
+    print(f"   paged list   {fetched} rows in {pages} requests, {elapsed:.1f}s "
+          f"({fetched / elapsed:,.0f} rows/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--paged-rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    configure_database()
+    from app.database import init_db
+
+    init_db()
+    started = time.perf_counter()
+    generate(users=1000, books=10000, borrowings=args.rows)
+    print(f"Seeded {args.rows} borrowings in {time.perf_counter() - started:.0f}s")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
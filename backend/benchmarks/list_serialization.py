@@ -0,0 +1,134 @@
+"""
+List endpoint serialization: ORM objects through response_model vs plain rows through orjson
+Usage: python -m benchmarks.list_serialization [--rows 50000] [--limit 1000] [--repeat 30]
+
+For each list endpoint this times the query plus serialization of one page
+both ways, checks the two bodies are byte-identical, then times the whole
+request through the app.
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import auth_headers, configure_database, report
+
+
+async def compare(name, schema, orm_page, row_page, repeat) -> None:
+    from typing import List
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+
+    # What FastAPI does with a returned list when the route has response_model=List[schema]
+    field = create_response_field(name=f"Response_{name}", type_=List[schema])
+
+    async def old():
+        return JSONResponse(await serialize_response(field=field, response_content=orm_page())).body
+
+    async def new():
+        return ORJSONResponse(row_page()).body
+
+    old_body, new_body = await old(), await new()
+    assert old_body == new_body, f"{name}: bodies differ"
+
+    for label, path in (("response_model", old), ("rows + orjson", new)):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await path()
+            samples.append(time.perf_counter() - started)
+        report(f"{name} {label}", samples)
+
+
+async def run(args) -> None:
+    import httpx
+    from sqlalchemy import select, func
+    from app.main import app
+    from app.database import SessionLocal
+    from app.crud import book as book_crud, user as user_crud, borrowing as borrowing_crud
+    from app.models.borrowing import Borrowing as BorrowingModel
+    from app.models.user import User as UserModel
+    from app.schemas.book import Book
+    from app.schemas.user import User
+    from app.schemas.borrowing import Borrowing, BorrowingWithDetails
+
+    limit = args.limit
+    db = SessionLocal()
+    try:
+        # A reader with a long history, so "my borrowings" has a full page
+        heavy_user = db.execute(
+            select(BorrowingModel.user_id)
+            .group_by(BorrowingModel.user_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        ).scalar()
+        cases = {
+            "books": (
+                Book,
+                lambda: book_crud.get_books(db, limit=limit),
+                lambda: book_crud.get_books(db, limit=limit, as_rows=True)
+            ),
+            "users": (
+                User,
+                lambda: user_crud.get_users(db, limit=limit),
+                lambda: user_crud.get_users(db, limit=limit, as_rows=True)
+            ),
+            "borrowings": (
+                Borrowing,
+                lambda: borrowing_crud.get_borrowings(db, limit=limit),
+                lambda: borrowing_crud.get_borrowings(db, limit=limit, as_rows=True)
+            ),
+            "my borrowings": (
+                BorrowingWithDetails,
+                lambda: borrowing_crud.get_borrowings(db, user_id=heavy_user, limit=limit, with_details=True),
+                lambda: borrowing_crud.get_borrowings(
+                    db, user_id=heavy_user, limit=limit, with_details=True, as_rows=True
+                )
+            ),
+        }
+        print(f"Query + serialize one page of {limit}:")
+        for name, (schema, orm_page, row_page) in cases.items():
+            await compare(name, schema, lambda: (db.expunge_all(), orm_page())[1], row_page, args.repeat)
+        heavy_username = db.get(UserModel, heavy_user).username
+    finally:
+        db.close()
+
+    admin = auth_headers("reader0")
+    reader = auth_headers(heavy_username)
+    transport = httpx.ASGITransport(app=app)
+    print(f"Full request, limit={limit}:")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, path, headers in (
+            ("GET /books/", f"/books/?limit={limit}", admin),
+            ("GET /users/", f"/users/?limit={limit}", admin),
+            ("GET /borrowings/", f"/borrowings/?limit={limit}", admin),
+            ("GET /borrowings/my", f"/borrowings/my?limit={limit}", reader),
+        ):
+            samples = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                samples.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+            report(name, samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    configure_database()
+    from app.database import init_db
+    from benchmarks.datagen import generate
+
+    init_db()
+    generate(users=1000, books=10000, borrowings=args.rows)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
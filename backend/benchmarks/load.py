@@ -0,0 +1,284 @@
+"""
+Scripted load scenarios against the ASGI app, with throughput and latency percentiles per request
+Usage: python -m benchmarks.load [--scenario all] [--clients 32] [--seconds 10]
+                                 [--database PATH|URL | --users 10000 --books 20000 --borrowings 200000]
+                                 [--json results.json] [--baseline results.json] [--tolerance 0.25]
+
+Scenarios:
+  browse  catalog list pages (offset and keyset) and popular books' details
+  search  full-text catalog search with search-as-you-type prefixes
+  login   a storm of password logins from many readers
+  borrow  borrow and return popular titles, competing for their copies
+  mixed   a weighted blend of the above, roughly a day at the library
+
+The database must come from benchmarks.datagen; without --database a fresh
+SQLite one is generated, and an empty database given by URL (e.g.
+postgresql://localhost/library_bench) is filled first. --json saves the results, and --baseline compares them
+with a saved run: the exit status is 1 if any request's p95 grew, or any
+scenario's throughput fell, by more than --tolerance, or if any request
+failed unexpectedly. All virtual users share one client address, so the
+per-IP limit on /auth/* is off unless AUTH_RATE_LIMIT_IP_BURST is set;
+logins shed with 429 count as refused, not failed.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+from benchmarks.common import auth_headers, configure_database, report, summarize
+from benchmarks.datagen import DEFAULT_PASSWORD, WORDS, zipf_weights, generate
+
+SCENARIO_WEIGHTS = {"browse": 60, "search": 25, "borrow": 10, "login": 5}
+
+
+class Recorder:
+    """Latency samples, failures and expected refusals per request"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = Counter()
+        self.error_statuses = defaultdict(Counter)
+        self.rejected = Counter()
+
+    async def call(self, label: str, request, expected=(200,), rejected=()):
+        started = time.perf_counter()
+        response = await request
+        self.samples[label].append(time.perf_counter() - started)
+        if response.status_code in rejected:
+            self.rejected[label] += 1
+        elif response.status_code not in expected:
+            self.errors[label] += 1
+            self.error_statuses[label][response.status_code] += 1
+        return response
+
+    def requests(self) -> int:
+        return sum(len(samples) for samples in self.samples.values())
+
+
+class Library:
+    """What the scenarios know about the generated data: readers and how popular each book is"""
+
+    def __init__(self, db, skew: float):
+        from sqlalchemy import select, func
+        from app.models.book import Book
+        from app.models.stats import DailyBookStats
+        from app.models.user import User
+
+        self.users = db.execute(select(func.count()).select_from(User)).scalar()
+        # Rank books by past borrows so the scenarios hit the same titles readers actually want
+        borrows = func.coalesce(func.sum(DailyBookStats.borrows), 0)
+        ranked = db.execute(
+            select(Book.id, Book.available)
+            .outerjoin(DailyBookStats, DailyBookStats.book_id == Book.id)
+            .group_by(Book.id)
+            .order_by(borrows.desc(), Book.id)
+        ).all()
+        self.books = [row.id for row in ranked]
+        self.book_weights = zipf_weights(len(self.books), skew)
+        # The most popular titles are all out; borrowers go for the most popular ones left on the shelf
+        self.on_shelf = [row.id for row in ranked if row.available > 0]
+        self.on_shelf_weights = zipf_weights(len(self.on_shelf), skew)
+        self._tokens = {}
+
+    def popular_book(self, rng: random.Random) -> int:
+        return rng.choices(self.books, cum_weights=self.book_weights)[0]
+
+    def book_on_shelf(self, rng: random.Random) -> int:
+        return rng.choices(self.on_shelf, cum_weights=self.on_shelf_weights)[0]
+
+    def reader(self, rng: random.Random) -> str:
+        return f"reader{rng.randrange(1, self.users)}"
+
+    def auth(self, username: str) -> dict:
+        if username not in self._tokens:
+            self._tokens[username] = auth_headers(username)
+        return self._tokens[username]
+
+
+async def browse(client, library: Library, rng: random.Random, recorder: Recorder) -> None:
+    """Look through the catalog: an offset page, two keyset pages and a popular book"""
+    page = min(int(rng.paretovariate(1.5)) - 1, 50)
+    await recorder.call("GET /books/ offset", client.get("/books/", params={"skip": page * 20, "limit": 20}))
+    response = await recorder.call("GET /books/ keyset", client.get("/books/", params={"limit": 20, "after": ""}))
+    cursor = response.headers.get("x-next-cursor")
+    if cursor:
+        await recorder.call("GET /books/ keyset", client.get("/books/", params={"limit": 20, "after": cursor}))
+    await recorder.call("GET /books/{id}", client.get(f"/books/{library.popular_book(rng)}"))
+
+
+async def search(client, library: Library, rng: random.Random, recorder: Recorder) -> None:
+    """Type a one- or two-word query, a few letters of each word"""
+    terms = [rng.choice(WORDS)[:rng.randint(3, 6)] for _ in range(rng.choice((1, 1, 2)))]
+    await recorder.call("GET /books/ search", client.get("/books/", params={"search": " ".join(terms), "limit": 20}))
+
+
+async def login(client, library: Library, rng: random.Random, recorder: Recorder) -> None:
+    """Log in with a password"""
+    await recorder.call(
+        "POST /auth/login",
+        client.post("/auth/login", json={"username": library.reader(rng), "password": DEFAULT_PASSWORD}),
+        rejected=(429,)
+    )
+
+
+async def borrow(client, library: Library, rng: random.Random, recorder: Recorder) -> None:
+    """Borrow a popular title on the shelf (if nobody took the last copy), check my borrowings, return it"""
+    headers = library.auth(library.reader(rng))
+    response = await recorder.call(
+        "POST /borrowings/",
+        client.post(
+            "/borrowings/",
+            json={"book_id": library.book_on_shelf(rng), "borrow_date": time.strftime("%Y-%m-%d")},
+            headers=headers
+        ),
+        expected=(201,),
+        rejected=(400,)
+    )
+    await recorder.call("GET /borrowings/my", client.get("/borrowings/my", params={"limit": 20}, headers=headers))
+    if response.status_code == 201:
+        await recorder.call(
+            "PUT /borrowings/{id}",
+            client.put(f"/borrowings/{response.json()['id']}", json={"status": "returned"}, headers=headers)
+        )
+
+
+async def mixed(client, library: Library, rng: random.Random, recorder: Recorder) -> None:
+    """One visit picked by SCENARIO_WEIGHTS"""
+    scenario = rng.choices(list(SCENARIO_WEIGHTS), weights=list(SCENARIO_WEIGHTS.values()))[0]
+    await SCENARIOS[scenario](client, library, rng, recorder)
+
+
+SCENARIOS = {"browse": browse, "search": search, "login": login, "borrow": borrow, "mixed": mixed}
+
+
+async def drive(client, library: Library, scenario, clients: int, seconds: float, seed: int) -> tuple:
+    """Run `clients` virtual users through the scenario until the deadline"""
+    recorder = Recorder()
+    deadline = time.perf_counter() + seconds
+
+    async def virtual_user(rng):
+        while time.perf_counter() < deadline:
+            await scenario(client, library, rng, recorder)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(random.Random(seed + i)) for i in range(clients)))
+    return recorder, time.perf_counter() - started
+
+
+async def run(args) -> dict:
+    import httpx
+    from app.main import app
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        library = Library(db, args.skew)
+    finally:
+        db.close()
+
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    results = {}
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for name in names:
+            # Untimed warm-up fills caches and the connection pool, as in a running server
+            await drive(client, library, SCENARIOS[name], args.clients, args.warmup, args.seed)
+            recorder, elapsed = await drive(client, library, SCENARIOS[name], args.clients, args.seconds, args.seed)
+
+            throughput = recorder.requests() / elapsed
+            print(f"{name}: {recorder.requests()} requests in {elapsed:.1f}s ({throughput:.1f} req/s), "
+                  f"{sum(recorder.errors.values())} failed")
+            requests = {}
+            for label, samples in sorted(recorder.samples.items()):
+                report(label, samples)
+                requests[label] = {
+                    **summarize(samples),
+                    "errors": recorder.errors[label],
+                    "rejected": recorder.rejected[label],
+                }
+                if recorder.rejected[label]:
+                    reason = "shed" if label == "POST /auth/login" else "no copies left"
+                    print(f"   {'':<28} {recorder.rejected[label]} refused ({reason})")
+                for status, count in sorted(recorder.error_statuses[label].items()):
+                    print(f"   {'':<28} {count} failed with HTTP {status}")
+            results[name] = {"requests_per_second": throughput, "requests": requests}
+    return results
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    """Describe every slowdown beyond `tolerance` compared with a saved run"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        if result["requests_per_second"] < before["requests_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {result['requests_per_second']:.1f} req/s, was {before['requests_per_second']:.1f}"
+            )
+        for label, summary in result["requests"].items():
+            previous = before["requests"].get(label)
+            if previous and summary["p95"] > previous["p95"] * (1 + tolerance):
+                regressions.append(f"{name} {label}: p95 {summary['p95']:.1f}ms, was {previous['p95']:.1f}ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=["all", *SCENARIOS], default="all")
+    parser.add_argument("--clients", type=int, default=32, help="concurrent virtual users")
+    parser.add_argument("--seconds", type=float, default=10, help="measured time per scenario")
+    parser.add_argument("--warmup", type=float, default=2, help="unmeasured time before each scenario")
+    parser.add_argument("--database", help="SQLite file or database URL from benchmarks.datagen (generated if empty)")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--books", type=int, default=20_000)
+    parser.add_argument("--borrowings", type=int, default=200_000)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of book popularity")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, as a fraction")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AUTH_RATE_LIMIT_IP_BURST", "0")
+    configure_database(args.database)
+    from sqlalchemy import select, func
+    from app.database import engine, init_db
+    from app.models.user import User
+
+    init_db()
+    with engine.connect() as conn:
+        empty = not conn.execute(select(func.count()).select_from(User)).scalar()
+    if empty:
+        started = time.perf_counter()
+        generate(args.users, args.books, args.borrowings, seed=args.seed, skew=args.skew)
+        print(f"Generated {args.users} users, {args.books} books, {args.borrowings} borrowings "
+              f"in {time.perf_counter() - started:.0f}s")
+
+    print(f"{args.clients} clients, {args.seconds}s per scenario:")
+    results = asyncio.run(run(args))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failed = any(summary["errors"] for result in results.values() for summary in result["requests"].values())
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if not regressions:
+            print(f"No regressions beyond {args.tolerance:.0%} of the baseline")
+    if failed or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Measure catalog read latency while a storm of concurrent logins runs
+Usage: python -m benchmarks.login_storm [--logins 64] [--seconds 5]
+
+The storm runs twice: with the hashing pool's backlog unbounded, and
+bounded by PASSWORD_HASH_QUEUE_SIZE so excess logins are shed with 429.
+The per-IP and per-username token buckets are off (every client here
+shares one address and one account) unless set in the environment.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.common import configure_database, report
+
+
+async def read_catalog(client, seconds: float, samples: list) -> None:
+    """Issue sequential GET /books/ requests, recording latency"""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get("/books/", params={"limit": 20})
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+
+
+async def login_loop(client, seconds: float, samples: list, shed: list) -> None:
+    """Log in repeatedly until the deadline, recording latency of accepted logins"""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.post(
+            "/auth/login", json={"username": "storm", "password": "storm-password"}
+        )
+        if response.status_code == 429:
+            shed.append(1)
+            # A well-behaved client backs off as told
+            await asyncio.sleep(float(response.headers.get("retry-after", 1)))
+            continue
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+
+
+async def run(args) -> None:
+    import httpx
+    from app.main import app
+    from app.database import SessionLocal
+    from app.core.security import hash_admission
+    from app.crud import user as user_crud, book as book_crud
+    from app.schemas.user import UserCreate
+    from app.schemas.book import BookCreate
+
+    db = SessionLocal()
+    try:
+        user_crud.create_user(db, UserCreate(
+            username="storm", email="storm@example.com", password="storm-password"
+        ))
+        for i in range(50):
+            book_crud.create_book(db, BookCreate(title=f"Book {i}", author="Author", quantity=1))
+    finally:
+        db.close()
+
+    queue_size = hash_admission.limit
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        baseline = []
+        await read_catalog(client, args.seconds, baseline)
+        print("Catalog GET /books/ latency:")
+        report("idle", baseline)
+
+        for label, limit in (("unbounded", 10 ** 9), (f"queue of {queue_size}", queue_size)):
+            hash_admission.limit = limit
+            under_storm, logins, shed = [], [], []
+            started = time.perf_counter()
+            await asyncio.gather(
+                read_catalog(client, args.seconds, under_storm),
+                *(login_loop(client, args.seconds, logins, shed) for _ in range(args.logins))
+            )
+            print(f"{args.logins} concurrent logins, hash backlog {label}:")
+            report("GET /books/", under_storm)
+            report("POST /auth/login (accepted)", logins)
+            # Logins admitted before the deadline still finish, so the storm may outlast it
+            elapsed = time.perf_counter() - started
+            print(
+                f"   logins completed: {len(logins)} in {elapsed:.1f}s ({len(logins) / elapsed:.1f}/s), "
+                f"shed with 429: {len(shed)}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=64, help="concurrent login clients")
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault("AUTH_RATE_LIMIT_IP_BURST", "0")
+    os.environ.setdefault("AUTH_RATE_LIMIT_USERNAME_BURST", "0")
+    configure_database()
+    from app.database import init_db
+
+    init_db()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Cost of the /metrics instrumentation: the same requests with METRICS_ENABLED off and on
+Usage: python -m benchmarks.metrics_overhead [--requests 2000] [--rounds 3]
+
+Requests are sent one at a time, so the difference in latency is the
+middleware and engine-event overhead itself rather than queueing noise.
+Each setting runs in a fresh interpreter (the middleware is added at
+import), alternating for --rounds; the median round is reported.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import auth_headers, configure_database, summarize
+
+PATHS = {
+    "GET /health": "/health",
+    "GET /books/": "/books/?limit=20",
+    "GET /books/{id}": "/books/1",
+    "GET /borrowings/my": "/borrowings/my?limit=20",
+}
+
+
+async def run_mode(args) -> dict:
+    import httpx
+    from app.main import app
+
+    headers = auth_headers("reader1")
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, path in PATHS.items():
+            for _ in range(args.requests // 10):
+                await client.get(path, headers=headers)
+            samples = []
+            for _ in range(args.requests):
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                samples.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+            results[label] = summarize(samples)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="timed requests per path and round")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--metrics", choices=["off", "on"], help=argparse.SUPPRESS)
+    parser.add_argument("--database", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.metrics:
+        os.environ["METRICS_ENABLED"] = "true" if args.metrics == "on" else "false"
+        configure_database(args.database)
+        print(json.dumps(asyncio.run(run_mode(args))))
+        return
+
+    path = configure_database()
+    from app.database import init_db
+    from benchmarks.datagen import generate
+
+    init_db()
+    generate(users=1000, books=10000, borrowings=50000)
+
+    rounds = {"off": [], "on": []}
+    for i in range(args.rounds):
+        # Alternate which setting goes first so warm-up effects cancel out
+        for setting in (("off", "on") if i % 2 == 0 else ("on", "off")):
+            child = subprocess.run(
+                [sys.executable, "-m", "benchmarks.metrics_overhead", "--metrics", setting,
+                 "--requests", str(args.requests), "--database", path],
+                check=True, capture_output=True, text=True
+            )
+            rounds[setting].append(json.loads(child.stdout.splitlines()[-1]))
+
+    print(f"Sequential requests, median p50 / mean of {args.rounds} rounds x {args.requests}:")
+    for label in PATHS:
+        off_p50, on_p50 = (statistics.median(r[label]["p50"] for r in rounds[s]) for s in ("off", "on"))
+        off_mean, on_mean = (statistics.median(r[label]["mean"] for r in rounds[s]) for s in ("off", "on"))
+        print(
+            f"   {label:<20} p50 {off_p50:6.3f}ms -> {on_p50:6.3f}ms ({(on_p50 - off_p50) * 1000:+5.0f}us)   "
+            f"mean {off_mean:6.3f}ms -> {on_mean:6.3f}ms ({(on_mean - off_mean) / off_mean:+.1%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
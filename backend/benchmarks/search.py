@@ -0,0 +1,58 @@
+"""
+Compare full-text catalog search against the old LIKE '%x%' scan
+Usage: python -m benchmarks.search [--books 200000] [--repeat 20]
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.common import configure_database, report, timed
+from benchmarks.datagen import generate_books, without_indexes, without_search_index
+
+QUERIES = ["kal", "karenal", "sunost", "tols", "kafka", "mardra bel", "orwell shel"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    path = configure_database()
+
+    from app.database import SessionLocal, engine, init_db
+    from app.crud import book as book_crud
+    from app.models.book import Book
+
+    init_db()
+    db = SessionLocal()
+    try:
+        print(f"Generating {args.books} books in {path}...")
+        started = time.perf_counter()
+        with without_indexes(engine, Book.__table__), without_search_index(engine):
+            generate_books(engine, args.books, random.Random(42))
+        print(f"   done in {time.perf_counter() - started:.1f}s\n")
+
+        like_samples, fts_samples = [], []
+        for _ in range(args.repeat):
+            for search in QUERIES:
+                elapsed, _ = timed(
+                    lambda: db.query(Book)
+                    .filter(Book.title.contains(search) | Book.author.contains(search))
+                    .limit(100)
+                    .all()
+                )
+                like_samples.append(elapsed)
+                elapsed, _ = timed(book_crud.get_books, db, limit=100, search=search)
+                fts_samples.append(elapsed)
+
+        print("Search latency (first page, limit=100):")
+        report("LIKE scan", like_samples)
+        report("full-text index", fts_samples)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Mixed read/write throughput with SQLite defaults vs the tuned connection pragmas
+Usage: python -m benchmarks.sqlite_pragmas [--readers 8] [--writers 4] [--seconds 5]
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import date
+
+from benchmarks.common import configure_database
+
+# SQLite's own defaults, i.e. behaviour before the connect hook existed
+DEFAULT_PRAGMAS = {
+    "SQLITE_JOURNAL_MODE": "delete",
+    "SQLITE_SYNCHRONOUS": "full",
+    "SQLITE_MMAP_SIZE": "0",
+    "SQLITE_CACHE_SIZE": "-2000",
+}
+
+
+def run_workload(args) -> None:
+    from app.database import SessionLocal, engine, Base
+    from app.config import settings
+    from app.crud import book as book_crud, borrowing as borrowing_crud
+    from app.models.user import User
+    from app.models.borrowing import BorrowingStatus
+    from app.schemas.book import BookCreate
+    from app.schemas.borrowing import BorrowingCreate, BorrowingUpdate
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(username="bench", email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    book_ids = [
+        book_crud.create_book(db, BookCreate(title=f"Book {i}", author="Author", quantity=1000)).id
+        for i in range(500)
+    ]
+    db.close()
+
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def reader():
+        session = SessionLocal()
+        rng = random.Random()
+        while time.perf_counter() < deadline:
+            try:
+                book_crud.get_books(session, skip=rng.randrange(0, 400), limit=50)
+                session.rollback()
+                key = "reads"
+            except Exception:
+                session.rollback()
+                key = "errors"
+            with lock:
+                counts[key] += 1
+        session.close()
+
+    def writer():
+        session = SessionLocal()
+        rng = random.Random()
+        while time.perf_counter() < deadline:
+            try:
+                borrowing = borrowing_crud.create_borrowing(
+                    session, BorrowingCreate(book_id=rng.choice(book_ids), borrow_date=date.today()),
+                    user_id=user_id
+                )
+                borrowing_crud.update_borrowing(
+                    session, borrowing.id, BorrowingUpdate(status=BorrowingStatus.RETURNED)
+                )
+                key = "writes"
+            except Exception:
+                session.rollback()
+                key = "errors"
+            with lock:
+                counts[key] += 1
+        session.close()
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer) for _ in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    label = f"journal={settings.SQLITE_JOURNAL_MODE} synchronous={settings.SQLITE_SYNCHRONOUS}"
+    print(
+        f"   {label:<36} reads={counts['reads'] / args.seconds:7.0f}/s "
+        f"writes={counts['writes'] / args.seconds:6.0f}/s errors={counts['errors']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--defaults", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        if args.defaults:
+            os.environ.update(DEFAULT_PRAGMAS)
+        configure_database()
+        run_workload(args)
+        return
+
+    print(f"{args.readers} readers + {args.writers} writers (borrow+return) for {args.seconds}s:")
+    for extra in (["--defaults"], []):
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.sqlite_pragmas", "--child", *extra,
+             "--readers", str(args.readers), "--writers", str(args.writers),
+             "--seconds", str(args.seconds)],
+            check=True
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Script to prepare the database before the app starts: create a fresh schema or migrate an existing one
+Usage: python bootstrap.py
+
+Run it once per deployment, before starting the workers. They no longer
+create tables themselves, since several workers running DDL at boot race.
+An empty database gets every table from the models and is stamped with the
+latest Alembic revision. An existing one is upgraded to it; databases that
+predate migrations are stamped with the baseline first.
+"""
+
+import os
+import time
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from app.database import engine, init_db
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def alembic_config() -> Config:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    return config
+
+
+def bootstrap() -> None:
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        inspector = inspect(connection)
+        has_tables = inspector.has_table("users")
+        versioned = inspector.has_table("alembic_version")
+
+    config = alembic_config()
+    if not has_tables:
+        print("Creating tables...")
+        init_db()
+        command.stamp(config, "head")
+    else:
+        if not versioned:
+            command.stamp(config, "0001")
+        print("Applying migrations...")
+        command.upgrade(config, "head")
+        # Catalog state row and search index, in case the migrations predate them
+        init_db()
+    print(f"Database ready in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    bootstrap()
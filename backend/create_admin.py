@@ -3,11 +3,16 @@ Script to create first admin in the system
 Usage: python create_admin.py
 """
 
-from app.database import SessionLocal
+import sys
+
+from app.database import SessionLocal, schema_exists
 from app.crud import user as user_crud
 from app.schemas.user import UserCreate
 
 def create_admin():
+    if not schema_exists():
+        print("Database has no tables; run `python bootstrap.py` first")
+        sys.exit(1)
     db = SessionLocal()
     
     try:
@@ -0,0 +1,49 @@
+"""
+Script to bulk import books from a CSV or NDJSON file
+Usage: python import_books.py catalog.csv [--format ndjson] [--chunk-size 5000]
+"""
+
+import argparse
+import sys
+import time
+from app.database import SessionLocal, schema_exists
+from app.crud import book as book_crud
+from app.core.importing import IMPORT_FORMATS, iter_rows, detect_format
+
+
+def import_file(path: str, format: str, chunk_size: int):
+    if not schema_exists():
+        print("Database has no tables; run `python bootstrap.py` first")
+        sys.exit(1)
+    db = SessionLocal()
+    
+    try:
+        start = time.perf_counter()
+        with open(path, "rb") as stream:
+            result = book_crud.import_books(db, iter_rows(stream, format), chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+
+        total = result.created + result.skipped + result.failed
+        print(f"Processed {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} rows/s)")
+        print(f"   Created: {result.created}")
+        print(f"   Skipped (duplicate ISBN): {result.skipped}")
+        print(f"   Failed: {result.failed}")
+        for error in result.errors[:20]:
+            print(f"   Row {error.row}: {error.error}")
+        if len(result.errors) > 20:
+            print(f"   ... and {result.skipped + result.failed - 20} more")
+        
+    except Exception as e:
+        print(f"Error importing books: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import books")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+    
+    import_file(args.path, args.format or detect_format(args.path), args.chunk_size)
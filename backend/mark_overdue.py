@@ -0,0 +1,33 @@
+"""
+Script to mark borrowings past their due date as overdue, e.g. from cron
+when the app's own periodic check is off (OVERDUE_CHECK_INTERVAL_SECONDS=0)
+Usage: python mark_overdue.py
+
+Runs alongside the app's workers, so it never creates tables; bootstrap
+the database first with `python bootstrap.py`.
+"""
+
+import sys
+
+from app.database import SessionLocal, schema_exists
+from app.crud import borrowing as borrowing_crud
+
+
+def mark():
+    if not schema_exists():
+        print("Database has no tables; run `python bootstrap.py` first")
+        sys.exit(1)
+    db = SessionLocal()
+    
+    try:
+        marked = borrowing_crud.mark_overdue(db)
+        print(f"Marked {marked} borrowings overdue")
+    except Exception as e:
+        db.rollback()
+        print(f"Error marking overdue borrowings: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    mark()
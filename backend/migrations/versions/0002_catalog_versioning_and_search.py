@@ -0,0 +1,70 @@
+"""Catalog versioning, book updated_at, borrow_date index and full-text search
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+Steps are skipped when the object already exists, because databases
+stamped at 0001 may have been partly created by `create_all` since.
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.book import create_search_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+POSTGRES_SEARCH_INDEX = """
+CREATE INDEX IF NOT EXISTS ix_books_search ON books
+USING gin (to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(author, '')))
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if "updated_at" not in {column["name"] for column in inspector.get_columns("books")}:
+        op.add_column("books", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+        op.execute("UPDATE books SET updated_at = created_at WHERE updated_at IS NULL")
+
+    if "ix_borrowings_borrow_date" not in {index["name"] for index in inspector.get_indexes("borrowings")}:
+        op.create_index("ix_borrowings_borrow_date", "borrowings", ["borrow_date"])
+
+    if not inspector.has_table("catalog_state"):
+        catalog_state = op.create_table(
+            "catalog_state",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("version", sa.Integer(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.bulk_insert(catalog_state, [{"id": 1, "version": 0, "updated_at": datetime.now(timezone.utc)}])
+
+    if bind.dialect.name == "postgresql":
+        op.execute(POSTGRES_SEARCH_INDEX)
+    else:
+        create_search_index(bind)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_books_search")
+    elif bind.dialect.name == "sqlite":
+        for trigger in ("books_fts_ai", "books_fts_ad", "books_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS books_fts")
+
+    op.drop_table("catalog_state")
+    op.drop_index("ix_borrowings_borrow_date", table_name="borrowings")
+    with op.batch_alter_table("books") as batch_op:
+        batch_op.drop_column("updated_at")
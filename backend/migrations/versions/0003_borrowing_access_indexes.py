@@ -0,0 +1,35 @@
+"""Composite indexes on borrowings for list filters and cascades
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    "ix_borrowings_user_status_date": ["user_id", "status", "borrow_date"],
+    "ix_borrowings_status_date": ["status", "borrow_date"],
+    "ix_borrowings_book_status": ["book_id", "status"],
+}
+
+
+def upgrade() -> None:
+    existing = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("borrowings")}
+    for name, columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, "borrowings", columns)
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name="borrowings")
@@ -0,0 +1,61 @@
+"""Daily circulation summary tables
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+Newly created tables are filled from the existing borrowings, so the
+statistics cover the history from before the upgrade.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.crud.stats import fill_summaries
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    created = False
+
+    if not inspector.has_table("daily_circulation"):
+        created = True
+        op.create_table(
+            "daily_circulation",
+            sa.Column("day", sa.Date(), nullable=False),
+            sa.Column("borrows", sa.Integer(), nullable=False),
+            sa.Column("returns", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("day"),
+        )
+
+    for table, key in (("daily_book_stats", "book_id"), ("daily_user_stats", "user_id")):
+        if inspector.has_table(table):
+            continue
+        created = True
+        op.create_table(
+            table,
+            sa.Column("day", sa.Date(), nullable=False),
+            sa.Column(key, sa.Integer(), nullable=False),
+            sa.Column("borrows", sa.Integer(), nullable=False),
+            sa.Column("returns", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("day", key),
+        )
+        op.create_index(f"ix_{table}_{key}", table, [key])
+
+    if created:
+        fill_summaries(bind)
+
+
+def downgrade() -> None:
+    op.drop_table("daily_user_stats")
+    op.drop_table("daily_book_stats")
+    op.drop_table("daily_circulation")
@@ -0,0 +1,59 @@
+"""Borrowing due dates and the overdue job's watermark
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+
+Existing loans get a due date LOAN_PERIOD_DAYS after they were borrowed.
+They stay 'borrowed' until the overdue job's first run, which checks every
+open loan (or run `python mark_overdue.py`).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if "due_date" not in {column["name"] for column in inspector.get_columns("borrowings")}:
+        op.add_column("borrowings", sa.Column("due_date", sa.Date(), nullable=True))
+        if bind.dialect.name == "sqlite":
+            due = "date(borrow_date, '+' || :days || ' days')"
+        else:
+            due = "borrow_date + :days"
+        op.execute(
+            sa.text(f"UPDATE borrowings SET due_date = {due}").bindparams(days=settings.LOAN_PERIOD_DAYS)
+        )
+
+    if "ix_borrowings_status_due" not in {index["name"] for index in inspector.get_indexes("borrowings")}:
+        op.create_index("ix_borrowings_status_due", "borrowings", ["status", "due_date"])
+
+    if not inspector.has_table("overdue_scan"):
+        overdue_scan = op.create_table(
+            "overdue_scan",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("due_before", sa.Date(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.bulk_insert(overdue_scan, [{"id": 1}])
+
+
+def downgrade() -> None:
+    op.drop_table("overdue_scan")
+    op.drop_index("ix_borrowings_status_due", table_name="borrowings")
+    op.execute("UPDATE borrowings SET status = 'borrowed' WHERE status = 'overdue'")
+    with op.batch_alter_table("borrowings") as batch_op:
+        batch_op.drop_column("due_date")
@@ -0,0 +1,43 @@
+"""Never reuse user ids on SQLite
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+
+Tokens identify their user by id. Without AUTOINCREMENT SQLite hands the
+highest id out again after that user is deleted, so the deleted user's
+tokens would pass for the next one. The users table is rebuilt with
+AUTOINCREMENT; its counter starts at the highest existing id. PostgreSQL
+sequences never reuse ids, so nothing changes there.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_autoincrement(bind) -> bool:
+    sql = bind.exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'users'").scalar()
+    return "AUTOINCREMENT" in (sql or "").upper()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite" or _has_autoincrement(bind):
+        return
+    with op.batch_alter_table("users", recreate="always", table_kwargs={"sqlite_autoincrement": True}):
+        pass
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite" or not _has_autoincrement(bind):
+        return
+    with op.batch_alter_table("users", recreate="always", table_kwargs={"sqlite_autoincrement": False}):
+        pass
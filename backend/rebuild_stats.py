@@ -0,0 +1,31 @@
+"""
+Script to recompute the circulation summary tables from the borrowings table
+Usage: python rebuild_stats.py
+"""
+
+import sys
+import time
+from app.database import SessionLocal, schema_exists
+from app.crud import stats as stats_crud
+
+
+def rebuild():
+    if not schema_exists():
+        print("Database has no tables; run `python bootstrap.py` first")
+        sys.exit(1)
+    db = SessionLocal()
+    
+    try:
+        print("Rebuilding circulation statistics...")
+        started = time.perf_counter()
+        stats_crud.rebuild_stats(db)
+        print(f"Done in {time.perf_counter() - started:.1f}s")
+    except Exception as e:
+        db.rollback()
+        print(f"Error rebuilding statistics: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild()
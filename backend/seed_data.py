@@ -3,14 +3,18 @@ Script to populate database with test data
 Usage: python seed_data.py
 """
 
+import sys
 from datetime import date, timedelta
-from app.database import SessionLocal
+from app.database import SessionLocal, schema_exists
 from app.crud import user as user_crud, book as book_crud, borrowing as borrowing_crud
 from app.schemas.user import UserCreate
 from app.schemas.book import BookCreate
 from app.schemas.borrowing import BorrowingCreate
 
 def seed_database():
+    if not schema_exists():
+        print("Database has no tables; run `python bootstrap.py` first")
+        sys.exit(1)
     db = SessionLocal()
     
     try:
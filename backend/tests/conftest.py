@@ -0,0 +1,73 @@
+import os
+import tempfile
+
+# Settings are read from the environment on first use, so this must come before any app import.
+# TEST_DATABASE_URL runs the suite against another database, e.g. an empty PostgreSQL one
+# (its tables are dropped and recreated); by default a temporary SQLite file is used
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-at-least-32-chars")
+os.environ["OVERDUE_CHECK_INTERVAL_SECONDS"] = "0"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["AUTH_RATE_LIMIT_IP_BURST"] = "0"
+os.environ["AUTH_RATE_LIMIT_USERNAME_BURST"] = "0"
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def database():
+    from app.database import Base, engine, init_db
+
+    if os.environ.get("TEST_DATABASE_URL"):
+        import app.models  # noqa: F401
+
+        Base.metadata.drop_all(bind=engine)
+    init_db()
+
+
+@pytest.fixture
+def db(database):
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def client(database):
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def admin(database):
+    """Username and password of an admin account"""
+    from app.database import SessionLocal
+    from app.crud import user as user_crud
+    from app.schemas.user import UserCreate
+
+    db = SessionLocal()
+    try:
+        user_crud.create_user(
+            db, UserCreate(username="admin", email="admin@example.com", password="admin123", role="admin")
+        )
+    finally:
+        db.close()
+    return "admin", "admin123"
+
+
+def login(client, username: str, password: str) -> dict:
+    response = client.post("/auth/login", json={"username": username, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client, admin):
+    return login(client, *admin)
@@ -0,0 +1,135 @@
+from datetime import date
+
+import pytest
+
+from tests.conftest import login
+
+
+@pytest.fixture(scope="module")
+def reader(client):
+    """Username and password of a freshly registered reader"""
+    response = client.post(
+        "/auth/register",
+        json={"username": "api-reader", "email": "api-reader@example.com", "password": "reader123"},
+    )
+    assert response.status_code == 201, response.text
+    assert response.json()["role"] == "user"
+    return "api-reader", "reader123"
+
+
+@pytest.fixture(scope="module")
+def reader_headers(client, reader):
+    return login(client, *reader)
+
+
+def test_register_rejects_taken_username(client, reader):
+    response = client.post(
+        "/auth/register",
+        json={"username": reader[0], "email": "someone-else@example.com", "password": "reader123"},
+    )
+    assert response.status_code == 400
+
+
+def test_login_with_wrong_password(client, reader):
+    response = client.post("/auth/login", json={"username": reader[0], "password": "wrong-password"})
+    assert response.status_code == 401
+
+
+def test_me_requires_a_token(client):
+    assert client.get("/users/me").status_code in (401, 403)
+    response = client.get("/users/me", headers={"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 401
+
+
+def test_refresh_issues_working_tokens(client, reader):
+    tokens = client.post("/auth/login", json={"username": reader[0], "password": reader[1]}).json()
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200, response.text
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    me = client.get("/users/me", headers=headers)
+    assert me.status_code == 200, me.text
+    assert me.json()["username"] == reader[0]
+
+    # An access token is not a refresh token
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["access_token"]})
+    assert response.status_code == 401
+
+
+def test_book_crud(client, admin_headers, reader_headers):
+    book = {"title": "API Book", "author": "API Author", "isbn": "api-crud-1", "published_year": 2001, "quantity": 2}
+    assert client.post("/books/", json=book, headers=reader_headers).status_code == 403
+
+    response = client.post("/books/", json=book, headers=admin_headers)
+    assert response.status_code == 201, response.text
+    created = response.json()
+    assert (created["title"], created["quantity"], created["available"]) == ("API Book", 2, 2)
+    book_id = created["id"]
+
+    response = client.get(f"/books/{book_id}", headers=reader_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["isbn"] == "api-crud-1"
+
+    response = client.get("/books/", params={"search": "API Book"}, headers=reader_headers)
+    assert response.status_code == 200, response.text
+    assert book_id in [each["id"] for each in response.json()]
+
+    response = client.put(f"/books/{book_id}", json={"title": "API Book, 2nd ed."}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["title"] == "API Book, 2nd ed."
+    assert client.get(f"/books/{book_id}", headers=reader_headers).json()["title"] == "API Book, 2nd ed."
+
+    assert client.delete(f"/books/{book_id}", headers=admin_headers).status_code == 204
+    assert client.get(f"/books/{book_id}", headers=reader_headers).status_code == 404
+
+
+def test_borrow_and_return(client, admin_headers, reader_headers):
+    response = client.post(
+        "/books/", json={"title": "Loan Book", "author": "Author", "isbn": "api-loan-1", "quantity": 1},
+        headers=admin_headers,
+    )
+    assert response.status_code == 201, response.text
+    book_id = response.json()["id"]
+    today = date.today().isoformat()
+
+    response = client.post("/borrowings/", json={"book_id": book_id, "borrow_date": today}, headers=reader_headers)
+    assert response.status_code == 201, response.text
+    loan = response.json()
+    assert loan["status"] == "borrowed"
+    assert loan["due_date"] is not None
+    assert client.get(f"/books/{book_id}", headers=reader_headers).json()["available"] == 0
+
+    # The only copy is out
+    response = client.post("/borrowings/", json={"book_id": book_id, "borrow_date": today}, headers=admin_headers)
+    assert response.status_code == 400
+
+    mine = client.get("/borrowings/my", headers=reader_headers)
+    assert mine.status_code == 200, mine.text
+    assert [each["id"] for each in mine.json() if each["book_id"] == book_id] == [loan["id"]]
+
+    response = client.put(
+        f"/borrowings/{loan['id']}", json={"status": "returned", "return_date": today}, headers=reader_headers
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "returned"
+    assert client.get(f"/books/{book_id}", headers=reader_headers).json()["available"] == 1
+
+    # Open loans only become overdue through the overdue job
+    response = client.put(f"/borrowings/{loan['id']}", json={"status": "overdue"}, headers=admin_headers)
+    assert response.status_code == 400
+
+
+def test_keyset_pages_follow_the_cursor_header(client, admin_headers):
+    for i in range(3):
+        response = client.post(
+            "/books/", json={"title": f"Cursor book {i}", "author": "Author", "isbn": f"api-cursor-{i}"},
+            headers=admin_headers,
+        )
+        assert response.status_code == 201, response.text
+
+    seen, cursor = [], ""
+    while cursor is not None:
+        response = client.get("/books/", params={"limit": 2, "after": cursor, "search": "Cursor book"})
+        assert response.status_code == 200, response.text
+        seen += [book["title"] for book in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+    assert seen == ["Cursor book 0", "Cursor book 1", "Cursor book 2"]
@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+
+
+def test_importing_the_app_reads_no_settings_and_opens_no_database():
+    code = (
+        "import app.main, app.config, app.database\n"
+        "assert app.config.get_settings.cache_info().currsize == 0\n"
+        "assert app.database.get_databases.cache_info().currsize == 0\n"
+    )
+    # Without SECRET_KEY reading the settings would fail outright
+    env = {key: value for key, value in os.environ.items() if key not in ("SECRET_KEY", "DATABASE_URL")}
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=backend_dir, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_openapi_schema(client):
+    response = client.get("/openapi.json")
+    assert response.status_code == 200, response.text
+    assert [tag["name"] for tag in response.json()["tags"]][:2] == ["Authentication", "Users"]
@@ -0,0 +1,113 @@
+import itertools
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from app.crud import borrowing as borrowing_crud
+from app.models.book import Book
+from app.models.borrowing import Borrowing, BorrowingStatus
+from app.models.user import User
+from app.schemas.borrowing import BorrowingUpdate
+
+
+_names = itertools.count()
+
+
+@pytest.fixture
+def loan(db):
+    name = f"return-race-{next(_names)}"
+    user = User(username=name, email=f"{name}@example.com", hashed_password="x")
+    book = Book(title=name, author="Author", isbn=name, quantity=1, available=0)
+    db.add_all([user, book])
+    db.flush()
+    loan = Borrowing(user_id=user.id, book_id=book.id, borrow_date=date(2026, 9, 20), status=BorrowingStatus.BORROWED)
+    db.add(loan)
+    db.commit()
+    return loan.id
+
+
+def test_losing_concurrent_return_changes_nothing(loan):
+    from app.database import SessionLocal
+
+    loser, winner = SessionLocal(), SessionLocal()
+    try:
+        # The endpoint loads the loan before calling update_borrowing; it is still open then
+        assert loser.get(Borrowing, loan).status == BorrowingStatus.BORROWED
+
+        returned = borrowing_crud.update_borrowing(
+            winner, loan, BorrowingUpdate(status="returned", return_date=date(2026, 10, 1))
+        )
+        assert returned.status == BorrowingStatus.RETURNED
+
+        with pytest.raises(ValueError, match="already returned"):
+            borrowing_crud.update_borrowing(
+                loser, loan, BorrowingUpdate(status="returned", return_date=date(2026, 10, 5))
+            )
+
+        row = SessionLocal()
+        try:
+            stored = row.get(Borrowing, loan)
+            assert (stored.status, stored.return_date) == (BorrowingStatus.RETURNED, date(2026, 10, 1))
+            assert row.get(Book, stored.book_id).available == 1
+        finally:
+            row.close()
+    finally:
+        loser.close()
+        winner.close()
+
+
+def test_returning_a_returned_loan_is_rejected(client, admin_headers, loan):
+    body = {"status": "returned", "return_date": "2026-10-01"}
+    assert client.put(f"/borrowings/{loan}", json=body, headers=admin_headers).status_code == 200
+    response = client.put(f"/borrowings/{loan}", json=body, headers=admin_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Borrowing is already returned"
+
+
+def count_statements(action) -> int:
+    """Statements `action` runs, besides the new loans' INSERTs (one per row on some drivers)"""
+    from app.database import engine
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        action()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return sum(1 for statement in statements if not statement.startswith("INSERT INTO borrowings"))
+
+
+def test_batch_statements_do_not_grow_with_the_batch(db):
+
+    name = f"batch-{next(_names)}"
+    user = User(username=name, email=f"{name}@example.com", hashed_password="x")
+    books = [Book(title=f"{name}-{i}", author="Author", isbn=f"{name}-{i}", quantity=3, available=3) for i in range(6)]
+    db.add(user)
+    db.add_all(books)
+    db.commit()
+    today = date.today()
+
+    counts = {}
+    for size in (1, 5):
+        book_ids = [book.id for book in books[:size]] + [books[-1].id]
+        borrowed = []
+        borrow_count = count_statements(
+            lambda: borrowed.append(borrowing_crud.create_borrowings(db, book_ids, today, user.id))
+        )
+        ids = [item.borrowing.id for item in borrowed[0].items]
+        returned = []
+        return_count = count_statements(
+            lambda: returned.append(borrowing_crud.return_borrowings(db, ids, user_id=user.id))
+        )
+        assert returned[0].succeeded == len(ids)
+        assert all(item.borrowing.status == BorrowingStatus.RETURNED for item in returned[0].items)
+        counts[size] = (borrow_count, return_count)
+    assert counts[1] == counts[5], counts
+
+    db.expire_all()
+    assert [db.get(Book, book.id).available for book in books] == [3, 3, 3, 3, 3, 3]
@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.crud import borrowing as borrowing_crud
+from app.models.book import Book
+from app.models.borrowing import Borrowing, BorrowingStatus
+from app.models.user import User
+
+PAGE_SIZES = (1, 10, 100)
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def count_statements(action) -> int:
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        action()
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    return counter.count
+
+
+@pytest.fixture(scope="module")
+def reader(database):
+    """A reader with more borrowings than the largest page, each of a different book"""
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        user = User(username="query-reader", email="query-reader@example.com", hashed_password="x")
+        books = [
+            Book(title=f"Query book {i}", author="Author", isbn=f"query-{i}", quantity=1, available=0)
+            for i in range(max(PAGE_SIZES) + 5)
+        ]
+        db.add(user)
+        db.add_all(books)
+        db.flush()
+        start = date.today() - timedelta(days=len(books))
+        db.add_all(
+            Borrowing(
+                user_id=user.id,
+                book_id=book.id,
+                borrow_date=start + timedelta(days=i),
+                status=BorrowingStatus.BORROWED
+            )
+            for i, book in enumerate(books)
+        )
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("as_rows", [False, True], ids=["objects", "rows"])
+@pytest.mark.parametrize("after", [None, ""], ids=["offset", "keyset"])
+def test_borrowings_with_details_page_query_count_is_fixed(db, reader, as_rows, after):
+    counts = {}
+    for limit in PAGE_SIZES:
+        db.expunge_all()
+
+        def fetch_page():
+            page = borrowing_crud.get_borrowings(
+                db, user_id=reader, limit=limit, after=after, with_details=True, as_rows=as_rows
+            )
+            assert len(page) == limit
+            # Read what BorrowingWithDetails serializes, through the association proxies for objects
+            for borrowing in page:
+                if as_rows:
+                    borrowing["book_title"], borrowing["user_username"]
+                else:
+                    borrowing.book_title, borrowing.book_author, borrowing.book_isbn, borrowing.user_username
+
+        counts[limit] = count_statements(fetch_page)
+    assert len(set(counts.values())) == 1, counts
+
+
+def test_my_borrowings_query_count_is_fixed(client, reader):
+    from app.core.security import create_access_token, token_claims
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        user = db.get(User, reader)
+        headers = {"Authorization": f"Bearer {create_access_token(token_claims(user))}"}
+    finally:
+        db.close()
+
+    # Warm up: the first request also loads the token revocation lists
+    client.get("/borrowings/my", params={"limit": 1}, headers=headers)
+    counts = {}
+    for limit in PAGE_SIZES:
+        response = None
+
+        def fetch_page():
+            nonlocal response
+            response = client.get("/borrowings/my", params={"limit": limit}, headers=headers)
+
+        counts[limit] = count_statements(fetch_page)
+        assert response.status_code == 200, response.text
+        assert len(response.json()) == limit
+        assert all(row["book_title"] and row["user_username"] for row in response.json())
+    assert len(set(counts.values())) == 1, counts
@@ -0,0 +1,66 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from app.crud import borrowing as borrowing_crud
+from app.models.book import Book
+from app.models.user import User
+from app.schemas.borrowing import BorrowingCreate, BorrowingUpdate
+
+
+@pytest.fixture(scope="module")
+def patron(database):
+    """A user and a book with plenty of copies"""
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        user = User(username="catalog-bump", email="catalog-bump@example.com", hashed_password="x")
+        book = Book(title="Catalog bump", author="Author", isbn="catalog-bump", quantity=50, available=50)
+        db.add_all([user, book])
+        db.commit()
+        return user.id, book.id
+    finally:
+        db.close()
+
+
+def statements_of(db, action) -> list:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0:2])
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        action()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return [" ".join(words) for words in statements]
+
+
+def assert_bumped_last(statements):
+    bumps = [i for i, statement in enumerate(statements) if statement == "UPDATE catalog_state"]
+    assert bumps == [len(statements) - 1], statements
+
+
+def test_catalog_version_is_bumped_once_just_before_commit(db, patron):
+    user_id, book_id = patron
+    today = date.today()
+    loans = []
+
+    assert_bumped_last(statements_of(db, lambda: loans.append(
+        borrowing_crud.create_borrowing(db, BorrowingCreate(book_id=book_id, borrow_date=today), user_id)
+    )))
+    assert_bumped_last(statements_of(db, lambda: borrowing_crud.update_borrowing(
+        db, loans[0].id, BorrowingUpdate(status="returned")
+    )))
+
+    batch = []
+    assert_bumped_last(statements_of(db, lambda: batch.append(
+        borrowing_crud.create_borrowings(db, [book_id] * 3, today, user_id)
+    )))
+    ids = [item.borrowing.id for item in batch[0].items]
+    assert_bumped_last(statements_of(db, lambda: borrowing_crud.return_borrowings(db, ids[:2])))
+    assert_bumped_last(statements_of(db, lambda: borrowing_crud.delete_borrowing(db, ids[2])))
@@ -0,0 +1,63 @@
+from app.core.importing import iter_rows
+from app.crud import book as book_crud
+from app.models.book import Book
+
+
+def upload(client, headers, content: bytes, filename: str = "books.csv", **params):
+    response = client.post(
+        "/books/import", files={"file": (filename, content)}, params=params, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_errors_are_listed_in_row_order(client, admin_headers):
+    content = (
+        "title,author,isbn,quantity\n"
+        "Order one,A,order-1,1\n"
+        "Order dup,A,order-1,1\n"
+        ",A,order-3,1\n"
+        "Order four,A,order-1,1\n"
+        "Order five,A,order-5,x\n"
+    ).encode()
+    result = upload(client, admin_headers, content)
+    assert (result["created"], result["skipped"], result["failed"]) == (1, 2, 2)
+    assert [error["row"] for error in result["errors"]] == [2, 3, 4, 5]
+
+
+def test_non_utf8_upload_is_reported(client, admin_headers):
+    content = "title,author,isbn,quantity\nLatin one,A,latin-1,1\n".encode() + "Café,A,latin-2,1\n".encode("latin-1")
+    result = upload(client, admin_headers, content)
+    assert result["failed"] == 1
+    assert "UTF-8" in result["errors"][0]["error"]
+
+
+def test_rows_inserted_concurrently_count_as_skipped(db, monkeypatch):
+    from app.database import SessionLocal
+
+    insert = book_crud._insert_ignoring_isbn_conflicts
+
+    def insert_after_another_import(session):
+        other = SessionLocal()
+        try:
+            other.add(Book(title="Raced", author="B", isbn="race-2", quantity=1, available=1))
+            other.commit()
+        finally:
+            other.close()
+        return insert(session)
+
+    monkeypatch.setattr(book_crud, "_insert_ignoring_isbn_conflicts", insert_after_another_import)
+    rows = [
+        {"title": "Race one", "author": "A", "isbn": "race-1", "quantity": 1},
+        {"title": "Race two", "author": "A", "isbn": "race-2", "quantity": 1},
+    ]
+    result = book_crud.import_books(db, rows)
+    assert (result.created, result.skipped) == (1, 1)
+    assert [(error.row, error.isbn) for error in result.errors] == [(2, "race-2")]
+
+
+def test_iter_rows_stops_at_decode_error():
+    import io
+
+    rows = list(iter_rows(io.BytesIO(b'{"title": "ok"}\n\xff\xfe\n'), "ndjson"))
+    assert isinstance(rows[-1], ValueError)
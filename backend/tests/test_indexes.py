@@ -0,0 +1,56 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.models.book import Book
+from app.models.borrowing import Borrowing, BorrowingStatus
+from app.models.overdue import OverdueScan, OVERDUE_SCAN_ID
+from app.models.user import User
+from benchmarks.explain_indexes import borrowings_plans, full_scans, query_cases
+
+
+@pytest.fixture(scope="module")
+def borrowers(database):
+    """(user id, book id) of a small catalog with open, overdue and returned loans"""
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        users = [User(username=f"plan-user-{i}", email=f"plan-user-{i}@example.com", hashed_password="x") for i in range(5)]
+        books = [Book(title=f"Plan book {i}", author="Author", isbn=f"plan-{i}", quantity=5, available=5) for i in range(10)]
+        db.add_all(users + books)
+        db.flush()
+        start = date(2020, 1, 1)
+        for i in range(60):
+            borrow_date = start + timedelta(days=i * 10)
+            returned = i % 3 == 0
+            db.add(Borrowing(
+                user_id=users[i % len(users)].id,
+                book_id=books[i % len(books)].id,
+                borrow_date=borrow_date,
+                due_date=borrow_date + timedelta(days=14),
+                return_date=borrow_date + timedelta(days=7) if returned else None,
+                status=BorrowingStatus.RETURNED if returned else BorrowingStatus.BORROWED
+            ))
+        # The overdue job's first run checks every open loan
+        db.execute(update(OverdueScan).where(OverdueScan.id == OVERDUE_SCAN_ID).values(due_before=None))
+        db.commit()
+        return users[1].id, books[2].id
+    finally:
+        db.close()
+
+
+def test_borrowings_queries_use_an_index(db, borrowers):
+    """EXPLAIN QUERY PLAN of every borrowings list/filter/export/cascade query (SQLite)"""
+    from app.database import engine
+
+    if engine.dialect.name != "sqlite":
+        pytest.skip("checks SQLite query plans")
+
+    user_id, book_id = borrowers
+    for name, action in query_cases(db, user_id, book_id).items():
+        plans = borrowings_plans(db, engine, action)
+        assert plans, f"{name}: no borrowings query was issued"
+        for statement, plan in plans:
+            assert not full_scans(plan), f"{name}: {plan}\n{statement}"
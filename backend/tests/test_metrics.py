@@ -0,0 +1,24 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core import metrics
+
+
+def test_failed_statements_leave_no_timing_state_behind():
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(engine)
+    stats = metrics.QueryStats()
+    token = metrics.current_queries.set(stats)
+    try:
+        with engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM no_such_table"))
+            conn.execute(text("SELECT 1"))
+            assert not any(isinstance(value, list) for value in conn.info.values())
+    finally:
+        metrics.current_queries.reset(token)
+        engine.dispose()
+    assert stats.count == 1
+    assert 0 <= stats.seconds < 1
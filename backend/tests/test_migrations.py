@@ -0,0 +1,37 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def alembic(database_url: str, *args: str) -> None:
+    env = {**os.environ, "DATABASE_URL": database_url}
+    result = subprocess.run(
+        [sys.executable, "-m", "alembic", *args], cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_summary_tables_are_backfilled_on_upgrade(tmp_path):
+    path = tmp_path / "upgrade.db"
+    alembic(f"sqlite:///{path}", "upgrade", "0003")
+    with sqlite3.connect(path) as connection:
+        connection.executescript("""
+            INSERT INTO users (id, username, email, hashed_password, role, is_active, created_at)
+            VALUES (1, 'reader', 'reader@example.com', 'x', 'user', 1, '2020-01-01');
+            INSERT INTO books (id, title, author, quantity, available, created_at)
+            VALUES (1, 'Book', 'Author', 3, 1, '2020-01-01');
+            INSERT INTO borrowings (user_id, book_id, borrow_date, return_date, status, created_at) VALUES
+                (1, 1, '2020-01-01', '2020-01-05', 'returned', '2020-01-01'),
+                (1, 1, '2020-01-01', NULL, 'borrowed', '2020-01-01'),
+                (1, 1, '2020-01-03', NULL, 'borrowed', '2020-01-03');
+        """)
+
+    alembic(f"sqlite:///{path}", "upgrade", "head")
+    with sqlite3.connect(path) as connection:
+        circulation = connection.execute("SELECT day, borrows, returns FROM daily_circulation ORDER BY day").fetchall()
+        by_user = connection.execute("SELECT SUM(borrows), SUM(returns) FROM daily_user_stats").fetchone()
+    assert circulation == [("2020-01-01", 2, 0), ("2020-01-03", 1, 0), ("2020-01-05", 0, 1)]
+    assert by_user == (3, 1)
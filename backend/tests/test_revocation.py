@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from app.core.revocation import TokenRevocations
+
+
+def test_requests_wait_for_the_first_load():
+    revocations = TokenRevocations(refresh_seconds=60)
+    started = threading.Event()
+
+    def slow_load(seen):
+        started.set()
+        time.sleep(0.2)
+        return [(1, 3, True), (2, 0, False)], set()
+
+    first = threading.Thread(target=revocations.refresh, args=(slow_load,))
+    first.start()
+    started.wait()
+    # A second request arriving during the first load must not check against empty sets
+    revocations.refresh(lambda seen: pytest.fail("loaded twice"))
+    first.join()
+
+    assert revocations.check(1, 2) == "revoked"
+    assert revocations.check(2, 0) == "deactivated"
+    assert revocations.check(3, 0) is None
+
+
+def test_a_failing_first_load_fails_closed():
+    revocations = TokenRevocations(refresh_seconds=60)
+
+    def broken_load(seen):
+        raise RuntimeError("database unavailable")
+
+    with pytest.raises(RuntimeError):
+        revocations.refresh(broken_load)
+    assert not revocations.loaded()
+    assert revocations.needs_refresh()
+
+
+def test_later_reloads_do_not_block():
+    revocations = TokenRevocations(refresh_seconds=0)
+    revocations.refresh(lambda seen: ([], set()))
+    revocations._refreshing.acquire()
+    try:
+        # Someone else is reloading: keep the current snapshot instead of waiting
+        revocations.refresh(lambda seen: pytest.fail("should not wait for the lock"))
+    finally:
+        revocations._refreshing.release()
+
+
+def test_deleted_ids_stay_deleted():
+    revocations = TokenRevocations(refresh_seconds=0)
+    revocations.refresh(lambda seen: ([], set()))
+    assert revocations.check(7, 0) is None
+    # Another worker deleted user 7: the reload finds the id gone
+    revocations.refresh(lambda seen: ([], set()))
+    assert revocations.check(7, 0) == "revoked"
+    # Even if a row with that id shows up again, tokens issued to the deleted user stay revoked
+    revocations.refresh(lambda seen: ([], {7}))
+    assert revocations.check(7, 0) == "revoked"
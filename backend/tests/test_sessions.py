@@ -0,0 +1,24 @@
+import threading
+
+import anyio
+
+from app import database as app_database
+
+
+def test_request_sessions_close_off_the_event_loop(database, monkeypatch):
+    closed_on = []
+    close = app_database.PrimarySession.close
+
+    def recording_close(self):
+        closed_on.append(threading.current_thread())
+        close(self)
+
+    monkeypatch.setattr(app_database.PrimarySession, "close", recording_close)
+
+    async def request():
+        async with app_database.session_scope() as db:
+            db.connection()
+        return threading.current_thread()
+
+    loop_thread = anyio.run(request)
+    assert closed_on and closed_on[0] is not loop_thread
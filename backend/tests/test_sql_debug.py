@@ -0,0 +1,25 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core import sql_debug
+
+
+def test_query_budget_counts_only_completed_statements():
+    engine = create_engine("sqlite://")
+    sql_debug.instrument_engine(engine)
+    try:
+        with engine.connect() as conn:
+            with sql_debug.query_budget(2) as log:
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM no_such_table"))
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+            assert not any(isinstance(value, list) for value in conn.info.values())
+            with pytest.raises(sql_debug.QueryBudgetExceeded):
+                with sql_debug.query_budget(1):
+                    conn.execute(text("SELECT 1"))
+                    conn.execute(text("SELECT 1"))
+    finally:
+        engine.dispose()
+    assert log.count == 2
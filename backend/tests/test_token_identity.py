@@ -0,0 +1,27 @@
+from app.api.deps import _load_revocations
+from app.core.revocation import get_token_revocations
+
+
+def register_and_login(client, username: str) -> dict:
+    response = client.post(
+        "/auth/register", json={"username": username, "email": f"{username}@example.com", "password": "secret1"}
+    )
+    assert response.status_code == 201, response.text
+    tokens = client.post("/auth/login", json={"username": username, "password": "secret1"}).json()
+    return {"id": response.json()["id"], **tokens}
+
+
+def test_deleted_users_tokens_do_not_pass_for_the_next_user(client, admin_headers):
+    bob = register_and_login(client, "identity-bob")
+    bob_headers = {"Authorization": f"Bearer {bob['access_token']}"}
+    assert client.get("/users/me", headers=bob_headers).status_code == 200
+
+    assert client.delete(f"/users/{bob['id']}", headers=admin_headers).status_code == 204
+    carol = register_and_login(client, "identity-carol")
+    assert carol["id"] != bob["id"], "user ids must not be reused"
+
+    # Also after a worker reloads its revocation snapshot from the database
+    get_token_revocations().refresh(_load_revocations)
+    assert client.get("/users/me", headers=bob_headers).status_code == 401
+    response = client.post("/auth/refresh", json={"refresh_token": bob["refresh_token"]})
+    assert response.status_code == 401
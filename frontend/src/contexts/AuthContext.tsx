@@ -1,5 +1,5 @@
 import React, { createContext, useContext, useState, useEffect, ReactNode } from 'react';
-import { apiService } from '@/services/api';
+import { apiService, clearTokens, storeTokens } from '@/services/api';
 import type { User, LoginRequest, RegisterRequest } from '@/types';
 
 interface AuthContextType {
@@ -42,7 +42,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
       const userData = await apiService.getCurrentUser();
       setUser(userData);
     } catch (error) {
-      localStorage.removeItem('access_token');
+      clearTokens();
       setUser(null);
     } finally {
       setIsLoading(false);
@@ -55,7 +55,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
 
   const login = async (data: LoginRequest) => {
     const response = await apiService.login(data);
-    localStorage.setItem('access_token', response.access_token);
+    storeTokens(response);
     await loadUser();
   };
 
@@ -65,7 +65,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   };
 
   const logout = () => {
-    localStorage.removeItem('access_token');
+    clearTokens();
     setUser(null);
   };
 
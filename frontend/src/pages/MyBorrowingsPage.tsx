@@ -16,7 +16,16 @@ import {
   TextField,
 } from '@mui/material';
 import { apiService } from '@/services/api';
-import type { Borrowing } from '@/types';
+import type { Borrowing, BorrowingStatus } from '@/types';
+
+const STATUS_CHIPS: Record<
+  BorrowingStatus,
+  { label: string; color: 'primary' | 'error' | 'success' }
+> = {
+  borrowed: { label: 'Забронована', color: 'primary' },
+  overdue: { label: 'Прострочена', color: 'error' },
+  returned: { label: 'Повернена', color: 'success' },
+};
 
 const MyBorrowingsPage: React.FC = () => {
   const [borrowings, setBorrowings] = useState<Borrowing[]>([]);
@@ -107,14 +116,8 @@ const MyBorrowingsPage: React.FC = () => {
                       {borrowing.book_title || 'Невідома книга'}
                     </Typography>
                     <Chip
-                      label={
-                        borrowing.status === 'borrowed'
-                          ? 'Забронована'
-                          : 'Повернена'
-                      }
-                      color={
-                        borrowing.status === 'borrowed' ? 'primary' : 'success'
-                      }
+                      label={STATUS_CHIPS[borrowing.status].label}
+                      color={STATUS_CHIPS[borrowing.status].color}
                       size="small"
                     />
                   </Box>
@@ -129,6 +132,16 @@ const MyBorrowingsPage: React.FC = () => {
                     Дата бронювання:{' '}
                     {new Date(borrowing.borrow_date).toLocaleDateString('uk-UA')}
                   </Typography>
+                  {borrowing.due_date && !borrowing.return_date && (
+                    <Typography
+                      variant="body2"
+                      color={borrowing.status === 'overdue' ? 'error' : 'text.secondary'}
+                      gutterBottom
+                    >
+                      Повернути до:{' '}
+                      {new Date(borrowing.due_date).toLocaleDateString('uk-UA')}
+                    </Typography>
+                  )}
                   {borrowing.return_date && (
                     <Typography
                       variant="body2"
@@ -142,7 +155,7 @@ const MyBorrowingsPage: React.FC = () => {
                     </Typography>
                   )}
 
-                  {borrowing.status === 'borrowed' && (
+                  {borrowing.status !== 'returned' && (
                     <Box sx={{ mt: 2 }}>
                       <Button
                         variant="contained"
@@ -1,4 +1,4 @@
-import axios, { AxiosError, AxiosInstance } from 'axios';
+import axios, { AxiosError, AxiosInstance, InternalAxiosRequestConfig } from 'axios';
 import type {
   LoginRequest,
   LoginResponse,
@@ -15,8 +15,24 @@ import type {
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || '/api';
 
+export const storeTokens = (tokens: LoginResponse) => {
+  localStorage.setItem('access_token', tokens.access_token);
+  if (tokens.refresh_token) {
+    localStorage.setItem('refresh_token', tokens.refresh_token);
+  }
+};
+
+export const clearTokens = () => {
+  localStorage.removeItem('access_token');
+  localStorage.removeItem('refresh_token');
+};
+
+type RetriableRequest = InternalAxiosRequestConfig & { _retried?: boolean };
+
 class ApiService {
   private api: AxiosInstance;
+  // Shared by the requests that fail together when the access token expires
+  private refreshing: Promise<string> | null = null;
 
   constructor() {
     this.api = axios.create({
@@ -36,25 +52,63 @@ class ApiService {
 
     this.api.interceptors.response.use(
       (response) => response,
-      (error: AxiosError<ApiError>) => {
-        if (error.response?.status === 401) {
-          const currentPath = window.location.pathname;
-          localStorage.removeItem('access_token');
-          if (currentPath !== '/login' && currentPath !== '/register') {
-            window.location.href = '/login';
+      async (error: AxiosError<ApiError>) => {
+        const request = error.config as RetriableRequest | undefined;
+        if (error.response?.status !== 401) {
+          return Promise.reject(error);
+        }
+
+        // Access tokens are short-lived: renew once with the refresh token and retry
+        const isAuthRequest = request?.url?.startsWith('/auth/');
+        if (request && !isAuthRequest && !request._retried && localStorage.getItem('refresh_token')) {
+          request._retried = true;
+          try {
+            const accessToken = await this.refreshAccessToken();
+            request.headers.Authorization = `Bearer ${accessToken}`;
+            return this.api(request);
+          } catch {
+            // Fall through to signing out
           }
         }
+
+        const currentPath = window.location.pathname;
+        clearTokens();
+        if (currentPath !== '/login' && currentPath !== '/register') {
+          window.location.href = '/login';
+        }
         return Promise.reject(error);
       }
     );
   }
 
+  private refreshAccessToken(): Promise<string> {
+    if (!this.refreshing) {
+      const refreshToken = localStorage.getItem('refresh_token');
+      this.refreshing = this.refresh(refreshToken ?? '')
+        .then((tokens) => {
+          storeTokens(tokens);
+          return tokens.access_token;
+        })
+        .finally(() => {
+          this.refreshing = null;
+        });
+    }
+    return this.refreshing;
+  }
+
   // AUTH
   async login(data: LoginRequest): Promise<LoginResponse> {
     const response = await this.api.post<LoginResponse>('/auth/login', data);
     return response.data;
   }
 
+  async refresh(refreshToken: string): Promise<LoginResponse> {
+    const response = await this.api.post<LoginResponse>('/auth/refresh', {
+      refresh_token: refreshToken,
+    });
+    return response.data;
+  }
+
   async register(data: RegisterRequest): Promise<User> {
     const response = await this.api.post<User>('/auth/register', data);
     return response.data;
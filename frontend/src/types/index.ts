@@ -19,13 +19,17 @@ export interface Book {
   created_at: string;
 }
 
+// Open loans turn 'overdue' once past their due date; either can be returned
+export type BorrowingStatus = 'borrowed' | 'overdue' | 'returned';
+
 export interface Borrowing {
   id: number;
   user_id: number;
   book_id: number;
   borrow_date: string;
+  due_date: string | null;
   return_date: string | null;
-  status: 'borrowed' | 'returned';
+  status: BorrowingStatus;
   created_at: string;
   book?: Book;
   user?: User;
@@ -43,6 +47,7 @@ export interface LoginRequest {
 export interface LoginResponse {
   access_token: string;
   token_type: string;
+  refresh_token?: string;
 }
 
 export interface RegisterRequest {
@@ -77,7 +82,7 @@ export interface CreateBorrowingRequest {
 
 export interface UpdateBorrowingRequest {
   return_date?: string;
-  status?: 'borrowed' | 'returned';
+  status?: 'returned';
 }
 
 export interface ApiError {